@@ -0,0 +1,3 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Device Discovery benchmarks namespace."""
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""
+Policy parsing benchmark.
+
+Measures parse + validate time of a policy by scope size, for YAML and JSON bodies,
+against the former pure-Python `yaml.safe_load` + `resolve_env_vars` path.
+
+    python -m benchmarks.policy_parse
+    python -m benchmarks.policy_parse -s 1000 20000 -o /tmp/policy_parse.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import yaml
+
+from device_discovery.policy.manager import PolicyManager, resolve_env_vars
+from device_discovery.policy.models import PolicyRequest
+
+PASSWORD_VARIABLE = "POLICY_PARSE_BENCH_PASSWORD"
+
+
+def policy_document(size: int, env_vars: bool) -> dict:
+    """
+    Build a policy document with `size` scope entries.
+
+    Args:
+    ----
+        size (int): Number of scope entries.
+        env_vars (bool): Reference the password through an environment variable.
+
+    Returns:
+    -------
+        dict: The policy request document.
+
+    """
+    password = f"${{{PASSWORD_VARIABLE}}}" if env_vars else "password"
+    scope = [
+        {
+            "driver": "ios" if i % 2 else "eos",
+            "hostname": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            "username": "admin",
+            "password": password,
+            "optional_args": {"transport": "ssh", "port": 22},
+        }
+        for i in range(size)
+    ]
+    return {
+        "policies": {
+            "bench": {
+                "config": {"schedule": "0 * * * *", "defaults": {"site": "Benchmark"}},
+                "scope": scope,
+            }
+        }
+    }
+
+
+def legacy_parse(config_data: bytes) -> PolicyRequest:
+    """Parse a YAML policy the way it was done before the libyaml loader."""
+    config = yaml.load(config_data, Loader=yaml.SafeLoader)
+    config = resolve_env_vars(config)
+    return PolicyRequest(**config)
+
+
+def best_of(func, repeats: int) -> float:
+    """Return the fastest of `repeats` calls of `func`, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes: list[int], repeats: int) -> dict:
+    """
+    Run the benchmark.
+
+    Args:
+    ----
+        sizes (list[int]): Scope sizes.
+        repeats (int): Timed repetitions per case, the fastest one is reported.
+
+    Returns:
+    -------
+        dict: Machine-readable results, keyed by `<size>/<case>`.
+
+    """
+    os.environ.setdefault(PASSWORD_VARIABLE, "password")
+    manager = PolicyManager()
+    results = {}
+    for size in sizes:
+        for env_vars in (False, True):
+            document = policy_document(size, env_vars)
+            yaml_body = yaml.dump(document, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper)).encode()
+            json_body = json.dumps(document).encode()
+            suffix = "+env" if env_vars else ""
+            cases = {
+                f"yaml_legacy{suffix}": lambda b=yaml_body: legacy_parse(b),
+                f"yaml{suffix}": lambda b=yaml_body: manager.parse_policy(b),
+                f"json{suffix}": lambda b=json_body: manager.parse_policy(b, "application/json"),
+            }
+            for name, case in cases.items():
+                seconds = best_of(case, repeats)
+                results[f"{size}/{name}"] = {
+                    "seconds": seconds,
+                    "seconds_per_scope": seconds / size,
+                }
+                print(f"{size:>7} {name:18} {seconds:10.4f}s", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "libyaml": yaml.__with_libyaml__,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def main():
+    """Benchmark command line."""
+    parser = argparse.ArgumentParser(description="Policy parse + validate benchmark")
+    parser.add_argument("-s", "--sizes", nargs="+", default=[100, 1000, 5000, 20000], type=int, help="Scope sizes")
+    parser.add_argument("-r", "--repeats", default=3, type=int, help="Timed repetitions per case")
+    parser.add_argument("-o", "--output", help="Write results to this file instead of stdout", type=str)
+    args = parser.parse_args()
+
+    output = json.dumps(run(args.sizes, args.repeats), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""
+Scope memory benchmark.
+
+Measures the memory held per scope item by a policy runner once its scopes are
+scheduled (scope store and scheduler jobs), compared to keeping one `Napalm` model and
+one trigger per job as the runner formerly did.
+
+    python -m benchmarks.scope_memory
+    python -m benchmarks.scope_memory -n 100000 --credentials 10 -o /tmp/scope_memory.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+import uuid
+from unittest.mock import patch
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from device_discovery.policy.models import Config, Defaults, Napalm
+from device_discovery.policy.runner import PolicyRunner
+
+# Far away in the future, so that no job runs during the measurement.
+SCHEDULE = "0 0 1 1 *"
+
+
+def scopes(hosts: int, credentials: int) -> list[Napalm]:
+    """
+    Build the scope items of a policy.
+
+    Args:
+    ----
+        hosts (int): Number of devices.
+        credentials (int): Number of distinct credential sets.
+
+    Returns:
+    -------
+        list[Napalm]: The scope items.
+
+    """
+    return [
+        Napalm(
+            driver="ios",
+            hostname=f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            username=f"admin{i % credentials}",
+            password=f"password{i % credentials}",
+            optional_args={"transport": "ssh", "port": 22, "secret": f"enable{i % credentials}"},
+        )
+        for i in range(hosts)
+    ]
+
+
+def traced(build) -> tuple[int, object]:
+    """Return the memory still allocated by `build()` once it returns, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return after - before, result
+
+
+def measure_runner(hosts: int, credentials: int) -> int:
+    """Return the bytes held by a runner scheduling `hosts` devices, parsed scopes included."""
+    runner = PolicyRunner()
+
+    def build():
+        with patch("device_discovery.policy.runner.get_supported_drivers", return_value=["ios"]):
+            runner.setup("bench", Config(schedule=SCHEDULE, defaults=Defaults()), scopes(hosts, credentials))
+        return runner
+
+    try:
+        size, _ = traced(build)
+    finally:
+        runner.stop()
+    return size
+
+
+def measure_legacy(hosts: int, credentials: int) -> int:
+    """Return the bytes held when keeping one model, UUID job id and trigger per device."""
+    config = Config(schedule=SCHEDULE, defaults=Defaults())
+    scheduler = BackgroundScheduler()
+    scheduler.start()
+
+    def build():
+        store = {}
+        for scope in scopes(hosts, credentials):
+            id = str(uuid.uuid4())
+            store[id] = scope
+            scheduler.add_job(
+                print, id=id, trigger=CronTrigger.from_crontab(SCHEDULE), args=[id, scope, config]
+            )
+        return store
+
+    try:
+        size, _ = traced(build)
+    finally:
+        scheduler.shutdown()
+    return size
+
+
+def main():
+    """Benchmark command line."""
+    parser = argparse.ArgumentParser(description="Memory held per scope item")
+    parser.add_argument("-n", "--hosts", default=100000, type=int, help="Devices in the policy")
+    parser.add_argument("--credentials", default=10, type=int, help="Distinct credential sets")
+    parser.add_argument("-o", "--output", help="Write results to this file instead of stdout", type=str)
+    args = parser.parse_args()
+
+    logging.getLogger("device_discovery").setLevel(logging.WARNING)
+    logging.getLogger("apscheduler").setLevel(logging.WARNING)
+
+    runner = measure_runner(args.hosts, args.credentials)
+    print(f"runner: {runner / args.hosts:.0f} bytes/scope", file=sys.stderr)
+    legacy = measure_legacy(args.hosts, args.credentials)
+    print(f"one model and trigger per job: {legacy / args.hosts:.0f} bytes/scope", file=sys.stderr)
+
+    output = json.dumps(
+        {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            "hosts": args.hosts,
+            "credentials": args.credentials,
+            "runner_bytes_per_scope": round(runner / args.hosts, 1),
+            "legacy_bytes_per_scope": round(legacy / args.hosts, 1),
+        },
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""
+Translate microbenchmarks.
+
+Measures time and memory allocations per produced entity for the functions of
+`device_discovery.translate`, over the device profiles of the synthetic NAPALM driver
+(`tests/napalm-synthetic`, which must be installed).
+
+    python -m benchmarks.translate run -o benchmarks/baselines/translate.json
+    python -m benchmarks.translate run -o /tmp/current.json
+    python -m benchmarks.translate compare benchmarks/baselines/translate.json /tmp/current.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from napalm_synthetic import generate
+
+from device_discovery.policy.models import Defaults, ObjectParameters
+from device_discovery.translate import (
+    translate_data,
+    translate_device,
+    translate_interface,
+    translate_interface_ips,
+)
+
+DEFAULTS = Defaults(
+    site="Benchmark Site",
+    role="Benchmark Role",
+    tags=["discovered"],
+    device=ObjectParameters(tags=["device"], description="device", comments="device"),
+    interface=ObjectParameters(tags=["interface"], description="interface"),
+    ipaddress=ObjectParameters(tags=["ip"], description="ip", comments="ip"),
+    prefix=ObjectParameters(tags=["prefix"], description="prefix", comments="prefix"),
+)
+
+# Number of timed repetitions per case, the fastest one is reported.
+REPEATS = {"access": 50, "aggregation": 10, "pe": 3}
+
+
+def _cases(profile: str) -> dict[str, tuple[Callable[[], list], int]]:
+    """
+    Build the benchmark cases of a profile.
+
+    Returns
+    -------
+        dict: case name -> (callable returning the produced entities, repeats).
+
+    """
+    data = generate.payload(f"bench-{profile}", profile)
+    data["driver"] = "synthetic"
+    data["defaults"] = DEFAULTS
+    facts = data["device"]
+    interfaces = data["interface"]
+    interfaces_ip = data["interface_ip"]
+    device = translate_device(dict(facts, driver="synthetic"), DEFAULTS)
+    translated = [translate_interface(device, name, info, DEFAULTS) for name, info in interfaces.items()]
+
+    def device_case():
+        return [translate_device(dict(facts, driver="synthetic"), DEFAULTS)]
+
+    def interface_case():
+        return [translate_interface(device, name, info, DEFAULTS) for name, info in interfaces.items()]
+
+    def interface_ips_case():
+        entities = []
+        for interface in translated:
+            entities.extend(translate_interface_ips(interface, interfaces_ip, DEFAULTS))
+        return entities
+
+    def data_case():
+        return translate_data(dict(data, device=dict(facts)))
+
+    repeats = REPEATS.get(profile, 3)
+    return {
+        "translate_device": (device_case, repeats * 10),
+        "translate_interface": (interface_case, repeats),
+        "translate_interface_ips": (interface_ips_case, repeats),
+        "translate_data": (data_case, repeats),
+    }
+
+
+def measure(case: Callable[[], list], repeats: int) -> dict:
+    """
+    Time a case and measure its Python allocations.
+
+    Allocations are the peak traced memory and the number of memory blocks still held
+    once the case returns, including the produced entities themselves.
+
+    Args:
+    ----
+        case (Callable[[], list]): Function returning the produced entities.
+        repeats (int): Timed repetitions.
+
+    Returns:
+    -------
+        dict: entities, seconds/entity (best and median), peak bytes/entity and allocated blocks/entity.
+
+    """
+    timings = []
+    entities = 0
+    for _ in range(max(repeats, 1)):
+        start = time.perf_counter()
+        entities = len(case())
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        produced = case()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del produced
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    entities = max(entities, 1)
+    return {
+        "entities": entities,
+        "seconds_per_entity": min(timings) / entities,
+        "median_seconds_per_entity": statistics.median(timings) / entities,
+        "peak_bytes_per_entity": peak / entities,
+        "blocks_per_entity": blocks / entities,
+    }
+
+
+def run(profiles: list[str]) -> dict:
+    """
+    Run every case of the given profiles.
+
+    Args:
+    ----
+        profiles (list[str]): Synthetic device profiles.
+
+    Returns:
+    -------
+        dict: Machine-readable results, keyed by `<profile>/<function>`.
+
+    """
+    results = {}
+    for profile in profiles:
+        for name, (case, repeats) in _cases(profile).items():
+            results[f"{profile}/{name}"] = measure(case, repeats)
+            print(f"{profile}/{name}: {results[f'{profile}/{name}']}", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, time_threshold: float, alloc_threshold: float) -> list[str]:
+    """
+    Compare two result files.
+
+    Args:
+    ----
+        baseline (dict): Baseline results.
+        current (dict): Current results.
+        time_threshold (float): Tolerated relative increase of seconds/entity.
+        alloc_threshold (float): Tolerated relative increase of bytes and blocks/entity.
+
+    Returns:
+    -------
+        list[str]: One line per regression, empty if there is none.
+
+    """
+    regressions = []
+    metrics = (
+        ("seconds_per_entity", time_threshold),
+        ("peak_bytes_per_entity", alloc_threshold),
+        ("blocks_per_entity", alloc_threshold),
+    )
+    for key, base in sorted(baseline["results"].items()):
+        cur = current["results"].get(key)
+        if cur is None:
+            regressions.append(f"{key}: missing from current results")
+            continue
+        for metric, threshold in metrics:
+            before, after = base[metric], cur[metric]
+            change = (after - before) / before if before else 0.0
+            status = "REGRESSION" if change > threshold else "ok"
+            print(f"{key:45} {metric:22} {before:12.4g} -> {after:12.4g} ({change:+7.1%}) {status}")
+            if change > threshold:
+                regressions.append(f"{key}: {metric} {change:+.1%}")
+    return regressions
+
+
+def main():
+    """Benchmark command line."""
+    parser = argparse.ArgumentParser(description="device_discovery.translate microbenchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("-o", "--output", help="Write results to this file instead of stdout", type=str)
+    run_parser.add_argument(
+        "-p", "--profiles", nargs="+", default=list(generate.PROFILES), help="Device profiles to benchmark"
+    )
+
+    compare_parser = commands.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument("baseline", help="Baseline results file", type=str)
+    compare_parser.add_argument("current", help="Current results file", type=str)
+    compare_parser.add_argument("--time-threshold", default=0.2, help="Tolerated time increase", type=float)
+    compare_parser.add_argument("--alloc-threshold", default=0.1, help="Tolerated allocation increase", type=float)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        output = json.dumps(run(args.profiles), indent=2, sort_keys=True)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(output + "\n")
+        else:
+            print(output)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.time_threshold, args.alloc_threshold)
+    if regressions:
+        sys.exit("translate regressions:\n" + "\n".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
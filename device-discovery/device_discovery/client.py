@@ -4,9 +4,17 @@
 
 import logging
 import threading
+import time
 
 from netboxlabs.diode.sdk import DiodeClient
 
+from device_discovery.metrics import (
+    ENTITIES,
+    ERRORS,
+    INGEST_BYTES,
+    INGEST_DURATION,
+    TRANSLATE_DURATION,
+)
 from device_discovery.translate import translate_data
 from device_discovery.version import version_semver
 
@@ -73,7 +81,9 @@ class Client:
                 api_key=api_key,
             )
 
-    def ingest(self, hostname: str, data: dict):
+    def ingest(
+        self, hostname: str, data: dict, policy: str = "", timings: dict | None = None
+    ) -> tuple[int, list]:
         """
         Ingest data using the Diode client after translating it.
 
@@ -81,6 +91,12 @@ class Client:
         ----
             hostname (str): The device hostname.
             data (dict): The data to be ingested.
+            policy (str): The policy the data was collected for, used to label metrics.
+            timings (dict | None): Filled with the "translate" and "ingest" durations.
+
+        Returns:
+        -------
+            tuple[int, list]: The number of entities sent and the ingestion errors.
 
         Raises:
         ------
@@ -90,10 +106,26 @@ class Client:
         if self.diode_client is None:
             raise ValueError("Diode client not initialized")
 
+        driver = data.get("driver") or ""
+        start = time.perf_counter()
+        entities = translate_data(data)
+        translate = time.perf_counter() - start
+        TRANSLATE_DURATION.labels(policy, driver).observe(translate)
+
+        start = time.perf_counter()
         with self._lock:
-            response = self.diode_client.ingest(translate_data(data))
+            response = self.diode_client.ingest(entities)
+        ingest = time.perf_counter() - start
+        INGEST_DURATION.labels(policy, driver).observe(ingest)
+        if timings is not None:
+            timings["translate"] = translate
+            timings["ingest"] = ingest
+        ENTITIES.labels(policy, driver).inc(len(entities))
+        INGEST_BYTES.labels(policy, driver).inc(sum(entity.ByteSize() for entity in entities))
 
         if response.errors:
+            ERRORS.labels(policy, "ingest", "IngestError").inc()
             logger.error(f"ERROR ingestion failed for {hostname} : {response.errors}")
         else:
             logger.info(f"Hostname {hostname}: Successful ingestion")
+        return len(entities), list(response.errors)
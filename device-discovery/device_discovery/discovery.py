@@ -2,20 +2,55 @@
 # Copyright 2024 NetBox Labs Inc
 """Discover the correct NAPALM Driver."""
 
+import hashlib
 import inspect
+import json
 import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from importlib import import_module
-from importlib.metadata import packages_distributions
+from importlib.metadata import PackageNotFoundError, packages_distributions, version
+from pathlib import Path
 from pkgutil import walk_packages
 from typing import Any
 
-from napalm import get_network_driver
-from napalm.base.base import NetworkDriver
+from device_discovery.metrics import DRIVER_IMPORT_DURATION
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CACHE_DIR_ENV = "DEVICE_DISCOVERY_CACHE_DIR"
+DRIVERS_CACHE_FILE = "napalm_drivers.json"
+
+_supported_drivers = None
+_supported_drivers_lock = threading.Lock()
+
+_discovered_drivers = dict[str, str]()
+
+
+def get_network_driver(name: str):
+    """
+    Return the NAPALM driver class for the given name.
+
+    NAPALM imports every bundled driver when it is first imported, so the import is
+    deferred until a driver is actually needed.
+
+    Args:
+    ----
+        name (str): The driver name.
+
+    Returns:
+    -------
+        type[NetworkDriver]: The driver class.
+
+    """
+    from napalm import get_network_driver as napalm_get_network_driver
+
+    return napalm_get_network_driver(name)
+
 
 def walk_napalm_packages(module: Any, prefix: str, packages: list[str]) -> list[str]:
     """
@@ -35,6 +70,8 @@ def walk_napalm_packages(module: Any, prefix: str, packages: list[str]) -> list[
         list[str]: A list of package names that contain napalm network driver classes.
 
     """
+    from napalm.base.base import NetworkDriver
+
     for package in walk_packages(module.__path__, module.__name__ + "."):
         try:
             submodule = import_module(package.name)
@@ -65,6 +102,8 @@ def napalm_driver_list() -> list[str]:
                    discovered driver names from the installed packages.
 
     """
+    from napalm.base.base import NetworkDriver
+
     napalm_packages = ["eos", "ios", "iosxr_netconf", "junos", "nxos", "nxos_ssh"]
     prefix = "napalm_"
     for dist in packages_distributions():
@@ -85,7 +124,188 @@ def napalm_driver_list() -> list[str]:
     return napalm_packages
 
 
-supported_drivers = napalm_driver_list()
+def drivers_cache_path() -> Path:
+    """
+    Return the path of the on-disk driver list cache.
+
+    Returns
+    -------
+        Path: `$DEVICE_DISCOVERY_CACHE_DIR`, `$XDG_CACHE_HOME/device-discovery` or
+              `~/.cache/device-discovery`, joined with the cache file name.
+
+    """
+    cache_dir = os.getenv(CACHE_DIR_ENV)
+    if not cache_dir:
+        base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        cache_dir = os.path.join(base, "device-discovery")
+    return Path(cache_dir) / DRIVERS_CACHE_FILE
+
+
+def installed_napalm_distributions() -> list[str]:
+    """
+    List the distributions providing NAPALM and its drivers, with their versions.
+
+    Drivers are found by import name, so the distributions are those providing the
+    `napalm` package or a `napalm_*` one, whatever their own name (e.g.
+    `netboxlabs-napalm-synthetic` for `napalm_synthetic`). Only their metadata is
+    read, which is much cheaper than importing the drivers.
+
+    Returns
+    -------
+        list[str]: Sorted `name==version` of each distribution.
+
+    """
+    names = set()
+    for package, distributions in packages_distributions().items():
+        if package == "napalm" or package.startswith("napalm_"):
+            names.update(distributions)
+    found = []
+    for name in sorted(names):
+        try:
+            found.append(f"{name}=={version(name)}")
+        except PackageNotFoundError:
+            continue
+    return found
+
+
+def _load_cached_drivers(path: Path, key: str) -> list[str] | None:
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("key") != key or not isinstance(cached.get("drivers"), list):
+        return None
+    return cached["drivers"]
+
+
+def _store_cached_drivers(path: Path, key: str, drivers: list[str]):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"key": key, "drivers": drivers}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Unable to write NAPALM driver cache '{path}': {e}")
+
+
+def get_supported_drivers() -> list[str]:
+    """
+    Return the available NAPALM drivers, computing them at most once per process.
+
+    The list is also cached on disk, keyed by the installed NAPALM distributions and
+    their versions, so that restarts do not import every driver again.
+
+    Returns
+    -------
+        list[str]: The available NAPALM driver names.
+
+    """
+    global _supported_drivers
+    if _supported_drivers is not None:
+        return _supported_drivers
+    with _supported_drivers_lock:
+        if _supported_drivers is not None:
+            return _supported_drivers
+        key = hashlib.sha256(
+            "\n".join(installed_napalm_distributions()).encode()
+        ).hexdigest()
+        path = drivers_cache_path()
+        drivers = _load_cached_drivers(path, key)
+        if drivers is None:
+            drivers = napalm_driver_list()
+            _store_cached_drivers(path, key, drivers)
+        _supported_drivers = drivers
+        return drivers
+
+
+def remember_discovered_driver(hostname: str, driver: str):
+    """
+    Remember the driver discovered for a host, for later policies targeting it.
+
+    Args:
+    ----
+        hostname (str): The device hostname.
+        driver (str): The discovered driver name.
+
+    """
+    _discovered_drivers[hostname] = driver
+
+
+def get_discovered_driver(hostname: str) -> str | None:
+    """
+    Return the driver previously discovered for a host.
+
+    Args:
+    ----
+        hostname (str): The device hostname.
+
+    Returns:
+    -------
+        str | None: The driver name, or None if the host was never discovered.
+
+    """
+    return _discovered_drivers.get(hostname)
+
+
+class DriverPrewarmer:
+    """
+    Imports NAPALM driver modules in the background.
+
+    Importing a driver (and its dependencies, e.g. ncclient/lxml for Junos or pyeapi
+    for EOS) can take seconds. Doing it ahead of the first collection keeps that cost
+    out of the device timeouts.
+    """
+
+    def __init__(self):
+        """Initialize the prewarmer with a single background thread."""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="napalm-prewarm")
+        self._pending = dict[str, Future]()
+        self._lock = threading.Lock()
+        self.timings = dict[str, float]()
+
+    def prewarm(self, drivers: set[str]) -> list[Future]:
+        """
+        Schedule the import of the given drivers, skipping those already imported or queued.
+
+        Args:
+        ----
+            drivers (set[str]): Driver names.
+
+        Returns:
+        -------
+            list[Future]: One future per newly scheduled import.
+
+        """
+        scheduled = []
+        with self._lock:
+            for driver in sorted(drivers):
+                if driver in self._pending:
+                    continue
+                future = self._executor.submit(self._import, driver)
+                self._pending[driver] = future
+                scheduled.append(future)
+        return scheduled
+
+    def _import(self, driver: str) -> float:
+        start = time.perf_counter()
+        try:
+            get_network_driver(driver)
+        except Exception as e:
+            logger.warning(f"Unable to pre-import NAPALM driver '{driver}': {e}")
+            with self._lock:
+                del self._pending[driver]
+            return 0.0
+        elapsed = time.perf_counter() - start
+        self.timings[driver] = elapsed
+        DRIVER_IMPORT_DURATION.labels(driver).observe(elapsed)
+        logger.info(f"Pre-imported NAPALM driver '{driver}' in {elapsed:.3f}s")
+        return elapsed
+
+    def shutdown(self):
+        """Stop the background thread, dropping imports that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
 
 def set_napalm_logs_level(level: int):
@@ -126,7 +346,7 @@ def discover_device_driver(info: dict) -> str | None:
 
     """
     set_napalm_logs_level(logging.CRITICAL)
-    for driver in supported_drivers:
+    for driver in get_supported_drivers():
         try:
             logger.info(f"Hostname {info.hostname}: Trying '{driver}' driver")
             np_driver = get_network_driver(driver)
@@ -7,11 +7,9 @@ import os
 import sys
 from importlib.metadata import version
 
-import netboxlabs.diode.sdk.version as SdkVersion
 import uvicorn
 
-from device_discovery.client import Client
-from device_discovery.server import app
+from device_discovery.policy.pool import DEFAULT_MAX_WORKERS, configure_pool
 from device_discovery.version import version_semver
 
 
@@ -19,7 +17,9 @@ def main():
     """
     Main entry point for the Agent CLI.
 
-    Parses command-line arguments and starts the backend.
+    Parses command-line arguments and starts the backend. The Diode client and the
+    server are imported once the arguments are parsed, so that `--version` and
+    `--help` do not pay for importing them.
     """
     parser = argparse.ArgumentParser(description="Orb Device Discovery Backend")
     parser.add_argument(
@@ -27,7 +27,7 @@ def main():
         "--version",
         action="version",
         version=f"Device Discovery version: {version_semver()}, NAPALM version: {version('napalm')}, "
-        f"Diode SDK version: {SdkVersion.version_semver()}",
+        f"Diode SDK version: {version('netboxlabs-diode-sdk')}",
         help="Display Device Discovery, NAPALM and Diode SDK versions",
     )
     parser.add_argument(
@@ -70,8 +70,45 @@ def main():
         required=False,
     )
 
+    parser.add_argument(
+        "-w",
+        "--workers",
+        default=DEFAULT_MAX_WORKERS,
+        help="Maximum number of devices collected concurrently, across all policies",
+        type=int,
+        required=False,
+    )
+
+    parser.add_argument(
+        "-l",
+        "--late-threshold",
+        help="Seconds after their scheduled time above which runs are counted as late and "
+        "logged (default: 30)",
+        type=float,
+        required=False,
+    )
+    parser.add_argument(
+        "-d",
+        "--state-db",
+        help="SQLite file the policies are saved to, and restored from at startup",
+        type=str,
+        required=False,
+    )
+
     try:
         args = parser.parse_args()
+        configure_pool(args.workers)
+        if args.late_threshold is not None:
+            from device_discovery.policy.executor import set_late_threshold
+
+            set_late_threshold(args.late_threshold)
+        if args.state_db:
+            from device_discovery.policy.store import configure_store
+
+            configure_store(args.state_db)
+        from device_discovery.client import Client
+        from device_discovery.server import app
+
         api_key = args.diode_api_key
         if api_key.startswith("${") and api_key.endswith("}"):
             env_var = api_key[2:-1]
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""Device Discovery Prometheus metrics."""
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Device interactions range from sub-second to several minutes for large routers.
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+# Dispatch lag is expected to stay well under a second on a healthy collector.
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+COLLECTION_DURATION = Histogram(
+    "device_discovery_collection_duration_seconds",
+    "Time spent connecting to a device and running the NAPALM getters",
+    ["policy", "driver"],
+    buckets=DURATION_BUCKETS,
+)
+DRIVER_DISCOVERY_DURATION = Histogram(
+    "device_discovery_driver_discovery_duration_seconds",
+    "Time spent discovering the NAPALM driver of a device",
+    ["policy", "driver"],
+    buckets=DURATION_BUCKETS,
+)
+DRIVER_IMPORT_DURATION = Histogram(
+    "device_discovery_driver_import_duration_seconds",
+    "Time spent importing a NAPALM driver module ahead of its first use",
+    ["driver"],
+    buckets=DURATION_BUCKETS,
+)
+TRANSLATE_DURATION = Histogram(
+    "device_discovery_translate_duration_seconds",
+    "Time spent translating NAPALM data into Diode entities",
+    ["policy", "driver"],
+    buckets=DURATION_BUCKETS,
+)
+INGEST_DURATION = Histogram(
+    "device_discovery_ingest_duration_seconds",
+    "Time spent sending entities to Diode",
+    ["policy", "driver"],
+    buckets=DURATION_BUCKETS,
+)
+ENTITIES = Counter(
+    "device_discovery_entities",
+    "Entities sent to Diode",
+    ["policy", "driver"],
+)
+INGEST_BYTES = Counter(
+    "device_discovery_ingest_bytes",
+    "Serialized size of the entities sent to Diode",
+    ["policy", "driver"],
+)
+ERRORS = Counter(
+    "device_discovery_errors",
+    "Errors by stage (discovery, collection, ingest) and type",
+    ["policy", "stage", "type"],
+)
+EXECUTOR_MAX_WORKERS = Gauge(
+    "device_discovery_executor_max_workers",
+    "Threads available to run a policy's jobs",
+    ["policy"],
+)
+EXECUTOR_RUNNING = Gauge(
+    "device_discovery_executor_running_jobs",
+    "Jobs currently running in a policy's executor",
+    ["policy"],
+)
+EXECUTOR_QUEUED = Gauge(
+    "device_discovery_executor_queued_jobs",
+    "Jobs submitted to a policy's executor and waiting for a thread",
+    ["policy"],
+)
+SCHEDULER_LAG = Histogram(
+    "device_discovery_scheduler_lag_seconds",
+    "Delay between a job's scheduled fire time and the moment it starts running",
+    ["policy"],
+    buckets=LAG_BUCKETS,
+)
+LATE_RUNS = Counter(
+    "device_discovery_late_runs",
+    "Jobs that started later than the late run threshold after their scheduled fire time",
+    ["policy"],
+)
+
+
+def forget_policy(policy: str):
+    """
+    Drop the gauges of a stopped policy, so they are not reported forever.
+
+    Args:
+    ----
+        policy (str): Policy name.
+
+    """
+    for gauge in (EXECUTOR_MAX_WORKERS, EXECUTOR_RUNNING, EXECUTOR_QUEUED):
+        try:
+            gauge.remove(policy)
+        except KeyError:
+            pass
+
+
+def latest() -> tuple[bytes, str]:
+    """
+    Render the metrics in the Prometheus text format.
+
+    Returns
+    -------
+        tuple[bytes, str]: The payload and its content type.
+
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
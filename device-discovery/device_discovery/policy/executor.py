@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""Device Discovery instrumented job executor."""
+
+import logging
+from datetime import datetime, timezone
+
+from apscheduler.executors.base import run_job
+from apscheduler.executors.pool import ThreadPoolExecutor
+
+from device_discovery.metrics import (
+    EXECUTOR_MAX_WORKERS,
+    EXECUTOR_QUEUED,
+    EXECUTOR_RUNNING,
+    LATE_RUNS,
+    SCHEDULER_LAG,
+)
+from device_discovery.policy.pool import PriorityPool
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATE_THRESHOLD = 30.0
+# Dispatch lag, in seconds, above which a run is counted as late and logged
+late_threshold = DEFAULT_LATE_THRESHOLD
+
+
+def set_late_threshold(seconds: float):
+    """
+    Set the dispatch lag above which a run is late.
+
+    Args:
+    ----
+        seconds (float): The threshold, in seconds.
+
+    """
+    global late_threshold
+    if seconds <= 0:
+        raise ValueError("the late run threshold must be greater than 0")
+    late_threshold = seconds
+
+
+class InstrumentedThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    APScheduler thread pool executor reporting saturation and dispatch lag.
+
+    Jobs are wrapped so that the lag is measured when a pool thread actually picks
+    the job up, which includes the time spent waiting for a free thread. Runs starting
+    more than `late_threshold` seconds late are counted and logged.
+
+    When given a shared `PriorityPool`, jobs are submitted to it with the routine
+    priority instead of a pool of its own.
+    """
+
+    def __init__(
+        self, max_workers: int = 10, policy: str = "", pool: PriorityPool | None = None
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+        ----
+            max_workers (int): The maximum number of threads, when not using a shared pool.
+            policy (str): Policy name used to label the metrics.
+            pool (PriorityPool | None): Shared pool to run the jobs in.
+
+        """
+        super().__init__(max_workers)
+        self.max_workers = int(pool.max_workers if pool else max_workers)
+        self.policy = policy
+        self.shared_pool = pool
+        if pool is not None:
+            self._pool = pool
+
+    def shutdown(self, wait=True):
+        """Shut down the executor, leaving a shared pool running."""
+        if self.shared_pool is None:
+            super().shutdown(wait)
+
+    def start(self, scheduler, alias):
+        """Start the executor and publish its size."""
+        super().start(scheduler, alias)
+        EXECUTOR_MAX_WORKERS.labels(self.policy).set(self.max_workers)
+
+    def _do_submit_job(self, job, run_times):
+        policy = self.policy
+        logger_name = self._logger.name
+        EXECUTOR_QUEUED.labels(policy).inc()
+
+        def execute():
+            EXECUTOR_QUEUED.labels(policy).dec()
+            EXECUTOR_RUNNING.labels(policy).inc()
+            lag = (datetime.now(timezone.utc) - run_times[0]).total_seconds()
+            # A run past its misfire grace time is dropped by run_job, not started
+            grace = job.misfire_grace_time
+            if grace is None or lag <= grace:
+                SCHEDULER_LAG.labels(policy).observe(max(lag, 0.0))
+                if lag > late_threshold:
+                    LATE_RUNS.labels(policy).inc()
+                    logger.warning(
+                        f"Policy {policy}: Job {job.id} started {lag:.1f}s after its scheduled "
+                        f"time, the executor may be undersized"
+                    )
+            try:
+                return run_job(job, job._jobstore_alias, run_times, logger_name)
+            finally:
+                EXECUTOR_RUNNING.labels(policy).dec()
+
+        def callback(f):
+            exc = f.exception()
+            if exc:
+                self._run_job_error(job.id, exc, exc.__traceback__)
+            else:
+                self._run_job_success(job.id, f.result())
+
+        f = self._pool.submit(execute)
+        f.add_done_callback(callback)
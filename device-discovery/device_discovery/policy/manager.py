@@ -2,13 +2,31 @@
 # Copyright 2024 NetBox Labs Inc
 """Device Discovery Policy Manager."""
 
+import heapq
+import json
 import logging
 import os
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from collections.abc import Iterable
 
 import yaml
 
-from device_discovery.policy.models import Policy, PolicyRequest
+from device_discovery.discovery import (
+    DriverPrewarmer,
+    get_discovered_driver,
+    remember_discovered_driver,
+)
+from device_discovery.policy.models import (
+    Napalm,
+    Policy,
+    PolicyRequest,
+    PolicyStreamHeader,
+)
 from device_discovery.policy.runner import PolicyRunner
+from device_discovery.policy.scopes import scope_fingerprint
+from device_discovery.policy.state import RunHandle, paginate
+from device_discovery.policy.store import PolicyStore
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -37,12 +55,56 @@ def resolve_env_vars(config):
         return os.getenv(env_var, config)
     return config
 
+
+class PolicyLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+    """
+    Safe YAML loader resolving `${VAR}` values while the document is constructed.
+
+    Mapping keys are left as written. Uses the libyaml parser when PyYAML was built
+    with it.
+    """
+
+    def construct_mapping(self, node: yaml.MappingNode, deep: bool = False) -> dict:
+        """Construct a mapping, its string keys not resolving environment variables."""
+        self.flatten_mapping(node)
+        for key_node, _ in node.value:
+            if key_node.tag == "tag:yaml.org,2002:str":
+                self.constructed_objects.setdefault(key_node, self.construct_scalar(key_node))
+        return super().construct_mapping(node, deep)
+
+
+def _construct_str(loader: PolicyLoader, node: yaml.ScalarNode) -> str:
+    value = loader.construct_scalar(node)
+    if value.startswith("${") and value.endswith("}"):
+        return os.getenv(value[2:-1], value)
+    return value
+
+
+PolicyLoader.add_constructor("tag:yaml.org,2002:str", _construct_str)
+
+
+# Number of on-demand run handles kept, the oldest ones are forgotten first
+MAX_RUN_HANDLES = 1000
+
+
 class PolicyManager:
     """Policy Manager class."""
 
-    def __init__(self):
-        """Initialize the PolicyManager instance with an empty list of policies."""
+    def __init__(self, store: PolicyStore | None = None):
+        """
+        Initialize the PolicyManager instance with an empty list of policies.
+
+        Args:
+        ----
+            store: Store the policies are saved to, None to keep them in memory only.
+
+        """
+        self.store = store
         self.runners = dict[str, PolicyRunner]()
+        # Sorted policy names, replaced rather than modified so readers need no lock
+        self.policy_names = list[str]()
+        self.prewarmer = DriverPrewarmer()
+        self.run_handles = OrderedDict[str, RunHandle]()
 
     def start_policy(self, name: str, policy: Policy):
         """
@@ -57,27 +119,261 @@ class PolicyManager:
         if self.policy_exists(name):
             raise ValueError(f"policy '{name}' already exists")
 
+        runner = self._setup_runner(name, policy)
+        if self.store is not None:
+            self.store.save_policy(runner)
+        self._add_runner(name, runner)
+        self.prewarmer.prewarm(self.referenced_drivers(policy.scope))
+
+    def _setup_runner(self, name: str, policy: Policy) -> PolicyRunner:
         runner = PolicyRunner()
+        runner.store = self.store
         runner.setup(name, policy.config, policy.scope)
+        return runner
+
+    def _add_runner(self, name: str, runner: PolicyRunner):
         self.runners[name] = runner
+        names = list(self.policy_names)
+        insort(names, name)
+        self.policy_names = names
 
-    def parse_policy(self, config_data: bytes) -> PolicyRequest:
+    def restore(self):
+        """Restore the policies saved in the store, if any."""
+        if self.store is None:
+            return
+        for name, config, rows in self.store.load():
+            if self.policy_exists(name):
+                continue
+            runner = PolicyRunner()
+            runner.store = self.store
+            try:
+                runner.restore(name, config, rows)
+            except Exception as e:
+                logger.error(f"Policy {name}: Unable to restore: {e}")
+                continue
+            self._add_runner(name, runner)
+            drivers = set()
+            for _, record in runner.scopes.items():
+                if record.driver:
+                    drivers.add(record.driver)
+                    remember_discovered_driver(record.hostname, record.driver)
+            self.prewarmer.prewarm(drivers)
+
+    def upsert_policy(self, name: str, policy: Policy) -> dict:
         """
-        Parse the YAML configuration data into a Policy object.
+        Start a policy, or apply the changes of a new version of a running policy.
 
         Args:
         ----
-            config_data (str): The YAML configuration data as a string.
+            name: Policy name
+            policy: Policy configuration
+
+        Returns:
+        -------
+            dict: "status" ("started", "updated" or "unchanged"), plus the changes
+                  made to an updated policy.
+
+        """
+        return self.upsert_policies({name: policy})[name]
+
+    def upsert_policies(self, policies: dict[str, Policy]) -> dict:
+        """
+        Start policies, or apply the changes of new versions of running policies.
+
+        Every new policy is set up, and every update validated, before any is applied,
+        so when one fails the running policies are left untouched. Updates already
+        applied when one fails unexpectedly are reverted.
+
+        Args:
+        ----
+            policies: Policy configurations, by name.
+
+        Returns:
+        -------
+            dict: By name, "status" ("started", "updated" or "unchanged"), plus the
+                  changes made to an updated policy.
+
+        """
+        results = {}
+        started = dict[str, PolicyRunner]()
+        updates = dict[str, list[bytes]]()
+        try:
+            self._prepare_policies(policies, started, updates, results)
+            self._apply_updates(policies, updates, results)
+        except Exception:
+            for runner in started.values():
+                runner.stop()
+            raise
+
+        for name, runner in started.items():
+            if self.store is not None:
+                self.store.save_policy(runner)
+            self._add_runner(name, runner)
+        for name in updates:
+            if self.store is not None:
+                self.store.save_policy(self.runners[name])
+        for name in (*started, *updates):
+            self.prewarmer.prewarm(self.referenced_drivers(policies[name].scope))
+        return {name: results[name] for name in policies}
+
+    def _prepare_policies(
+        self,
+        policies: dict[str, Policy],
+        started: dict[str, PolicyRunner],
+        updates: dict[str, list[bytes]],
+        results: dict,
+    ):
+        for name, policy in policies.items():
+            runner = self.runners.get(name)
+            if runner is None:
+                started[name] = self._setup_runner(name, policy)
+                results[name] = {"status": "started"}
+                continue
+            fingerprints = [scope_fingerprint(scope) for scope in policy.scope]
+            if runner.matches(policy.config, fingerprints):
+                results[name] = {"status": "unchanged"}
+                continue
+            runner.validate(policy.config, policy.scope)
+            updates[name] = fingerprints
+
+    def _apply_updates(
+        self, policies: dict[str, Policy], updates: dict[str, list[bytes]], results: dict
+    ):
+        applied = []
+        try:
+            for name, fingerprints in updates.items():
+                runner = self.runners[name]
+                applied.append((name, runner.snapshot()))
+                policy = policies[name]
+                changes = runner.update(policy.config, policy.scope, fingerprints)
+                results[name] = {"status": "updated", **changes}
+        except Exception:
+            for name, snapshot in reversed(applied):
+                try:
+                    self.runners[name].update(*snapshot)
+                except Exception as e:
+                    logger.error(f"Policy {name}: Unable to revert the update: {e}")
+            raise
+
+    def add_scope(self, name: str, scope: Napalm):
+        """
+        Add a scope item to a started policy.
+
+        Args:
+        ----
+            name: Policy name
+            scope: scope data for the device
+
+        """
+        self.add_scopes(name, [scope])
+
+    def add_scopes(self, name: str, scopes: Iterable[Napalm]) -> int:
+        """
+        Add scope items to a started policy, saving them in a single transaction.
+
+        Args:
+        ----
+            name: Policy name
+            scopes: scope data for the devices, scheduled one at a time as they are
+                    iterated
+
+        Returns:
+        -------
+            int: Number of scope items added.
+
+        """
+        if not self.policy_exists(name):
+            raise ValueError(f"policy '{name}' not found")
+        runner = self.runners[name]
+        added = []
+        ids = []
+        for scope in scopes:
+            ids.append(runner.add_scope(scope))
+            added.append(scope)
+        if self.store is not None and ids:
+            self.store.save_scopes(runner, ids)
+        self.prewarmer.prewarm(self.referenced_drivers(added))
+        return len(ids)
+
+    def referenced_drivers(self, scopes: list[Napalm]) -> set[str]:
+        """
+        Collect the drivers scope items are expected to use.
+
+        Args:
+        ----
+            scopes: scope data for the devices
+
+        Returns:
+        -------
+            set[str]: Drivers set in the scopes, plus the drivers previously
+                      discovered for the scopes that do not set one.
+
+        """
+        drivers = set()
+        for scope in scopes:
+            driver = scope.driver or get_discovered_driver(scope.hostname)
+            if driver:
+                drivers.add(driver)
+        return drivers
+
+    def parse_policy(
+        self, config_data: bytes, content_type: str = "application/x-yaml"
+    ) -> PolicyRequest:
+        """
+        Parse the YAML or JSON configuration data into a Policy object.
+
+        Args:
+        ----
+            config_data (bytes): The configuration data.
+            content_type (str): "application/x-yaml" or "application/json".
 
         Returns:
         -------
             Config: The configuration object.
 
         """
-        config = yaml.safe_load(config_data)
-        config = resolve_env_vars(config)
+        if content_type == "application/json":
+            if b"${" not in config_data:
+                return PolicyRequest.model_validate_json(config_data)
+            config = resolve_env_vars(json.loads(config_data))
+        else:
+            config = yaml.load(config_data, Loader=PolicyLoader)
         return PolicyRequest(**config)
 
+    def parse_stream_header(self, line: bytes) -> PolicyStreamHeader:
+        """
+        Parse the first line of a streamed policy.
+
+        Args:
+        ----
+            line (bytes): JSON object with the policy name and config.
+
+        Returns:
+        -------
+            PolicyStreamHeader: The policy name and config.
+
+        """
+        if b"${" not in line:
+            return PolicyStreamHeader.model_validate_json(line)
+        return PolicyStreamHeader(**resolve_env_vars(json.loads(line)))
+
+    def parse_scope_line(self, line: bytes) -> Napalm:
+        """
+        Parse a scope item of a streamed policy.
+
+        Args:
+        ----
+            line (bytes): JSON object with the scope data of a device.
+
+        Returns:
+        -------
+            Napalm: The scope item.
+
+        """
+        if b"${" not in line:
+            return Napalm.model_validate_json(line)
+        return Napalm(**resolve_env_vars(json.loads(line)))
+
     def policy_exists(self, name: str) -> bool:
         """
         Check if the policy exists.
@@ -106,6 +402,136 @@ class PolicyManager:
             raise ValueError(f"policy '{name}' not found")
         self.runners[name].stop()
         del self.runners[name]
+        if self.store is not None:
+            self.store.delete_policy(name)
+        names = list(self.policy_names)
+        index = bisect_left(names, name)
+        if names[index : index + 1] == [name]:
+            del names[index]
+        self.policy_names = names
+
+    def list_policies(self, cursor: str | None = None, limit: int = 100) -> dict:
+        """
+        List the policies, sorted by name.
+
+        Args:
+        ----
+            cursor: Last policy name of the previous page, None for the first page.
+            limit: Maximum number of policies.
+
+        Returns:
+        -------
+            dict: The summary of each policy of the page, and the next page cursor.
+
+        """
+        names, next_cursor = paginate(self.policy_names, cursor, limit)
+        policies = []
+        for name in names:
+            runner = self.runners.get(name)
+            if runner is not None:
+                policies.append(runner.summary())
+        return {"policies": policies, "next_cursor": next_cursor}
+
+    def get_policy(self, name: str, cursor: int | None = None, limit: int = 100) -> dict:
+        """
+        Describe a policy, with the outcome of the last run of each scope item.
+
+        Args:
+        ----
+            name: Policy name.
+            cursor: Last scope ID of the previous page, None for the first page.
+            limit: Maximum number of scope items.
+
+        Returns:
+        -------
+            dict: The policy summary, a page of its scope items and the next page cursor.
+
+        """
+        runner = self.runners.get(name)
+        if runner is None:
+            raise ValueError(f"policy '{name}' not found")
+        hosts, next_cursor = runner.hosts(cursor, limit)
+        return {**runner.summary(), "hosts": hosts, "next_cursor": next_cursor}
+
+    def get_host(self, name: str, id: int) -> dict:
+        """
+        Describe a scope item of a policy, with its recent runs.
+
+        Args:
+        ----
+            name: Policy name.
+            id: Scope ID.
+
+        Returns:
+        -------
+            dict: The scope item, the outcome of its last run and its run history.
+
+        """
+        runner = self.runners.get(name)
+        if runner is None:
+            raise ValueError(f"policy '{name}' not found")
+        return runner.host(id)
+
+    def top_hosts(self, by: str = "slowest", limit: int = 10) -> list[dict]:
+        """
+        Return the slowest or most failing scope items, across all policies.
+
+        Args:
+        ----
+            by: "slowest" for the longest last runs, "failing" for the most
+                consecutive failures.
+            limit: Maximum number of scope items.
+
+        Returns:
+        -------
+            list[dict]: The scope items with their last run, worst first.
+
+        """
+        candidates = []
+        for runner in list(self.runners.values()):
+            candidates.extend(runner.top(by, limit))
+        return [host for _, host in heapq.nlargest(limit, candidates, key=lambda c: c[0])]
+
+    def run_policy(self, name: str, hostnames: list[str] | None = None) -> RunHandle:
+        """
+        Queue an immediate run of a policy, ahead of the scheduled runs.
+
+        Args:
+        ----
+            name: Policy name.
+            hostnames: Hostnames of the scope items to run, all of them when None.
+
+        Returns:
+        -------
+            RunHandle: The handle to follow the progress of the run.
+
+        """
+        runner = self.runners.get(name)
+        if runner is None:
+            raise ValueError(f"policy '{name}' not found")
+        handle = runner.run_now(hostnames)
+        self.run_handles[handle.id] = handle
+        while len(self.run_handles) > MAX_RUN_HANDLES:
+            self.run_handles.popitem(last=False)
+        return handle
+
+    def get_run(self, run_id: str) -> dict:
+        """
+        Report the progress of an on-demand run.
+
+        Args:
+        ----
+            run_id: The run handle ID.
+
+        Returns:
+        -------
+            dict: The progress of the run.
+
+        """
+        handle = self.run_handles.get(run_id)
+        if handle is None:
+            raise ValueError(f"run '{run_id}' not found")
+        return handle.progress()
 
     def stop(self):
         """Stop all running policies."""
@@ -113,3 +539,7 @@ class PolicyManager:
             logger.info(f"Stopping policy '{name}'")
             runner.stop()
         self.runners = []
+        self.policy_names = []
+        self.prewarmer.shutdown()
+        if self.store is not None:
+            self.store.close()
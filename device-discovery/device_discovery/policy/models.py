@@ -87,3 +87,16 @@ class PolicyRequest(BaseModel):
     """Model for a policy request."""
 
     policies: dict[str, Policy]
+
+
+class PolicyStreamHeader(BaseModel):
+    """Model for the first line of a streamed policy."""
+
+    name: str
+    config: Config | None = Field(default=None, description="Configuration data")
+
+
+class RunRequest(BaseModel):
+    """Model for an on-demand run of a policy."""
+
+    hostnames: list[str] | None = Field(default=None, min_length=1)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""Device Discovery shared priority worker pool."""
+
+import itertools
+import queue
+import sys
+import threading
+from concurrent.futures import Future
+
+# Lower values run first
+HIGH = 0
+ROUTINE = 1
+_SHUTDOWN = sys.maxsize
+
+DEFAULT_MAX_WORKERS = 50
+
+
+class PriorityPool:
+    """
+    Fixed-size thread pool serving the highest priority task first.
+
+    Every policy submits its scheduled runs to the same pool, which bounds the number
+    of devices collected concurrently. On-demand runs are submitted with a higher
+    priority and go ahead of the queued routine runs, never beyond `max_workers`.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Initialize the pool, threads are started on demand.
+
+        Args:
+        ----
+            max_workers (int): Maximum number of threads.
+
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+        self.max_workers = max_workers
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads = list[threading.Thread]()
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn, *args, priority: int = ROUTINE) -> Future:
+        """
+        Queue a task.
+
+        Args:
+        ----
+            fn: The callable to run.
+            *args: Its arguments.
+            priority (int): HIGH or ROUTINE.
+
+        Returns:
+        -------
+            Future: The future of the task.
+
+        """
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit to a pool that was shut down")
+            self._queue.put((priority, next(self._sequence), future, fn, args))
+            if not self._idle.acquire(blocking=False) and len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"discovery-worker-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def queued(self) -> int:
+        """Return the number of tasks waiting for a thread."""
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            priority, _, future, fn, args = self._queue.get()
+            if priority == _SHUTDOWN:
+                return
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            del future, fn, args
+            self._idle.release()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop the threads once the queued tasks are done.
+
+        Args:
+        ----
+            wait (bool): Wait for the threads to exit.
+
+        """
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+            for _ in threads:
+                self._queue.put((_SHUTDOWN, next(self._sequence), None, None, None))
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure_pool(max_workers: int):
+    """
+    Set the size of the shared pool, before it is first used.
+
+    Args:
+    ----
+        max_workers (int): Maximum number of devices collected concurrently.
+
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            raise RuntimeError("the worker pool is already in use")
+        _pool = PriorityPool(max_workers)
+
+
+def get_pool() -> PriorityPool:
+    """Return the pool shared by every policy, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PriorityPool()
+        return _pool
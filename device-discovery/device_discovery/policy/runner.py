@@ -2,23 +2,50 @@
 # Copyright 2024 NetBox Labs Inc
 """Device Discovery Policy Runner."""
 
+import json
 import logging
-import uuid
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
 
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
-from napalm import get_network_driver
 
 from device_discovery.client import Client
-from device_discovery.discovery import discover_device_driver, supported_drivers
+from device_discovery.discovery import (
+    discover_device_driver,
+    get_network_driver,
+    get_supported_drivers,
+    remember_discovered_driver,
+)
+from device_discovery.metrics import (
+    COLLECTION_DURATION,
+    DRIVER_DISCOVERY_DURATION,
+    ERRORS,
+    forget_policy,
+)
+from device_discovery.policy.executor import InstrumentedThreadPoolExecutor
 from device_discovery.policy.models import Config, Defaults, Napalm, Status
+from device_discovery.policy.pool import HIGH, get_pool
+from device_discovery.policy.scopes import ScopeStore, combine_fingerprints
+from device_discovery.policy.state import (
+    HostState,
+    RunHandle,
+    RunHistory,
+    TopIndex,
+    isoformat,
+    paginate,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EMPTY_STATE = HostState()
+
 
 class PolicyRunner:
     """Policy Runner class."""
@@ -26,10 +53,32 @@ class PolicyRunner:
     def __init__(self):
         """Initialize the PolicyRunner."""
         self.name = ""
-        self.scopes = dict[str, Napalm]()
+        self.scopes = ScopeStore()
+        self.states = dict[int, HostState]()
+        self.history = dict[int, RunHistory]()
+        # Scope ids by duration of their last run, and by consecutive failures
+        self.slowest = TopIndex()
+        self.most_failing = TopIndex()
+        self._state_lock = threading.Lock()
+        # Futures of the runs in progress, by scope id
+        self._runs = dict[int, Future]()
+        self._runs_lock = threading.Lock()
+        self.failing = 0
+        self.runs = 0
+        self.last_run = None
         self.config = None
+        self.trigger = None
+        self.supported_drivers = []
         self.status = Status.NEW
-        self.scheduler = BackgroundScheduler()
+        # PolicyStore saving the outcome of the runs, when policies are persisted
+        self.store = None
+        self.executor = InstrumentedThreadPoolExecutor(pool=get_pool())
+        # Runs waiting in the shared pool, behind on-demand runs or other policies, are
+        # delayed, never dropped as misfired
+        self.scheduler = BackgroundScheduler(
+            executors={"default": self.executor},
+            job_defaults={"misfire_grace_time": None, "coalesce": True},
+        )
 
     def setup(self, name: str, config: Config, scopes: list[Napalm]):
         """
@@ -41,83 +90,521 @@ class PolicyRunner:
             config: Configuration data containing site information.
             scopes: scope data for the devices.
 
+        """
+        self.configure(name, config)
+        try:
+            for scope in scopes:
+                self.add_scope(scope)
+        except Exception:
+            self.scheduler.shutdown()
+            raise
+
+    def configure(self, name: str, config: Config):
+        """
+        Configure the policy and start its scheduler, without any scope.
+
+        Args:
+        ----
+            name: Policy name.
+            config: Configuration data containing site information.
+
         """
         self.name = name.replace('\r\n', '').replace('\n', '')
-        self.config = config
+        self.config = self.normalize_config(config)
 
-        if self.config is None:
-            self.config = Config(defaults={})
-        elif self.config.defaults is None:
-            self.config.defaults = {}
+        if self.config.schedule is not None:
+            # Cron triggers are stateless, a single one is shared by every job
+            self.trigger = CronTrigger.from_crontab(self.config.schedule)
 
+        self.executor.policy = self.name
         self.scheduler.start()
-        for scope in scopes:
-            sanitized_hostname = scope.hostname.replace('\r\n', '').replace('\n', '')
-            if scope.driver and scope.driver not in supported_drivers:
-                self.scheduler.shutdown()
-                raise Exception(
-                    f"Policy {self.name}, Hostname {sanitized_hostname}: specified driver '{scope.driver}' "
-                    f"was not found in the current installed drivers list: {supported_drivers}."
-                )
+        self.supported_drivers = get_supported_drivers()
+
+    def restore(self, name: str, config: Config, rows: list):
+        """
+        Restore a saved policy and start its scheduler.
+
+        Scheduled scope items keep their saved next run time. One-time runs that were
+        missed while the backend was down are run as soon as possible, keeping the
+        intervals between them, and one-time runs already done are not repeated.
+
+        Args:
+        ----
+            name: Policy name.
+            config: Configuration data containing site information.
+            rows: Saved scope items, sorted by id, as returned by `PolicyStore.load`.
 
+        """
+        self.name = name.replace('\r\n', '').replace('\n', '')
+        self.config = self.normalize_config(config)
+        if self.config.schedule is not None:
+            self.trigger = CronTrigger.from_crontab(self.config.schedule)
+        self.executor.policy = self.name
+        self.supported_drivers = get_supported_drivers()
+
+        now = datetime.now(timezone.utc)
+        next_runs = [
+            datetime.fromisoformat(row["next_run"]) if row["next_run"] else None
+            for row in rows
+        ]
+        missed = min((t for t in next_runs if t is not None and t <= now), default=now)
+        for row, next_run in zip(rows, next_runs):
+            scope = Napalm(**json.loads(row["scope"]), driver=row["driver"])
+            self.check_driver(scope)
+            id = self.scopes.add(scope, row["fingerprint"], id=row["id"])
+            if row["last_run"]:
+                state = self.states[id] = HostState()
+                state.last_run = datetime.fromisoformat(row["last_run"])
+                state.duration = row["duration"]
+                state.driver = row["driver"]
+                state.entities = row["entities"]
+                state.last_error = row["last_error"]
+                state.failures = int(state.last_error is not None)
+                self.failing += state.failures
+                self.slowest.set(id, state.duration or 0.0)
+                self.most_failing.set(id, state.failures)
             if self.config.schedule is not None:
-                logger.info(
-                    f"Policy {self.name}, Hostname {sanitized_hostname}: Scheduled to run with '{self.config.schedule}'"
-                )
-                trigger = CronTrigger.from_crontab(self.config.schedule)
+                trigger = self.trigger
+            elif next_run is None:
+                continue
             else:
-                logger.info(
-                    f"Policy {self.name}, Hostname {sanitized_hostname}: One-time run"
+                if next_run <= now:
+                    next_run = now + timedelta(seconds=1) + (next_run - missed)
+                trigger = DateTrigger(run_date=next_run)
+            options = {"next_run_time": next_run} if next_run and next_run > now else {}
+            self.scheduler.add_job(
+                self.run, id=str(id), name=self.name, trigger=trigger, args=[id], **options
+            )
+
+        # Jobs added before the scheduler starts are scheduled in a single pass
+        self.scheduler.start()
+        self.status = Status.RUNNING
+        logger.info(f"Policy {self.name}: Restored {len(self.scopes)} scope items")
+
+    @staticmethod
+    def normalize_config(config: Config | None) -> Config:
+        """
+        Fill in the optional parts of a policy configuration.
+
+        Args:
+        ----
+            config: Configuration data containing site information.
+
+        Returns:
+        -------
+            Config: The configuration, with empty defaults when none were given.
+
+        """
+        if config is None:
+            return Config(defaults=Defaults())
+        if config.defaults is None:
+            config.defaults = Defaults()
+        return config
+
+    def check_driver(self, scope: Napalm):
+        """
+        Check that the driver of a scope item, if set, is installed.
+
+        Args:
+        ----
+            scope: scope data for the device.
+
+        """
+        if scope.driver and scope.driver not in self.supported_drivers:
+            sanitized_hostname = scope.hostname.replace('\r\n', '').replace('\n', '')
+            raise Exception(
+                f"Policy {self.name}, Hostname {sanitized_hostname}: specified driver '{scope.driver}' "
+                f"was not found in the current installed drivers list: {self.supported_drivers}."
+            )
+
+    def add_scope(self, scope: Napalm, fingerprint: bytes | None = None) -> int:
+        """
+        Schedule the collection of a single scope item.
+
+        Args:
+        ----
+            scope: scope data for the device.
+            fingerprint: Fingerprint of the scope item, computed when not given.
+
+        Returns:
+        -------
+            int: The scope id, also used as job id.
+
+        """
+        self.check_driver(scope)
+        sanitized_hostname = scope.hostname.replace('\r\n', '').replace('\n', '')
+        if self.config.schedule is not None:
+            logger.info(
+                f"Policy {self.name}, Hostname {sanitized_hostname}: Scheduled to run with '{self.config.schedule}'"
+            )
+            trigger = self.trigger
+        else:
+            logger.info(
+                f"Policy {self.name}, Hostname {sanitized_hostname}: One-time run"
+            )
+            trigger = DateTrigger(run_date=datetime.now() + timedelta(seconds=1))
+
+        id = self.scopes.add(scope, fingerprint)
+        self.scheduler.add_job(
+            self.run, id=str(id), name=self.name, trigger=trigger, args=[id]
+        )
+
+        self.status = Status.RUNNING
+        return id
+
+    def matches(self, config: Config | None, fingerprints: list[bytes]) -> bool:
+        """
+        Check whether a policy is identical to the one being run.
+
+        Args:
+        ----
+            config: Configuration data containing site information.
+            fingerprints: Fingerprints of the scope items.
+
+        Returns:
+        -------
+            bool: True if the configuration and the scope items are unchanged.
+
+        """
+        return (
+            self.normalize_config(config) == self.config
+            and len(fingerprints) == len(self.scopes)
+            and combine_fingerprints(fingerprints) == self.scopes.fingerprint()
+        )
+
+    def validate(self, config: Config | None, scopes: list[Napalm]):
+        """
+        Check that a new version of the policy can be applied, without applying it.
+
+        Args:
+        ----
+            config: Configuration data containing site information.
+            scopes: scope data for the devices.
+
+        """
+        for scope in scopes:
+            self.check_driver(scope)
+        if config is not None and config.schedule is not None:
+            CronTrigger.from_crontab(config.schedule)
+
+    def snapshot(self) -> tuple[Config, list[Napalm], list[bytes]]:
+        """
+        Return the current version of the policy, to restore it with `update`.
+
+        Returns
+        -------
+            tuple[Config, list[Napalm], list[bytes]]: The configuration, the scope items
+                with their discovered drivers, and their fingerprints.
+
+        """
+        scopes = []
+        fingerprints = []
+        for _, record in self.scopes.items():
+            scopes.append(
+                Napalm.model_construct(
+                    driver=record.driver,
+                    hostname=record.hostname,
+                    username=record.username,
+                    password=record.password,
+                    timeout=record.timeout,
+                    optional_args=record.optional_args,
                 )
-                trigger = DateTrigger(run_date=datetime.now() + timedelta(seconds=1))
+            )
+            fingerprints.append(record.fingerprint)
+        return self.config, scopes, fingerprints
+
+    def update(
+        self, config: Config | None, scopes: list[Napalm], fingerprints: list[bytes]
+    ) -> dict:
+        """
+        Apply a new version of the policy, only touching the scope items that changed.
 
-            id = str(uuid.uuid4())
-            self.scopes[id] = scope
+        Unchanged scope items keep their jobs and discovered drivers. A scope item whose
+        hostname is still in the policy is updated in place, the others are added or
+        removed. Jobs are only rescheduled when the schedule changes.
+
+        Args:
+        ----
+            config: Configuration data containing site information.
+            scopes: scope data for the devices.
+            fingerprints: Fingerprints of the scope items.
+
+        Returns:
+        -------
+            dict: Number of scope items added, removed and updated, and whether the
+                  jobs were rescheduled.
+
+        """
+        for scope in scopes:
+            self.check_driver(scope)
+
+        rescheduled = self._reconfigure(config)
+        changes = self._apply_scopes(scopes, fingerprints, rescheduled)
+        changes["rescheduled"] = rescheduled
+        if rescheduled:
+            for id in self.scopes:
+                self._schedule(id)
+
+        logger.info(f"Policy {self.name}: Updated {changes}")
+        return changes
+
+    def _reconfigure(self, config: Config | None) -> bool:
+        """
+        Replace the policy configuration.
+
+        Args:
+        ----
+            config: Configuration data containing site information.
+
+        Returns:
+        -------
+            bool: True if the schedule changed, the jobs having to be rescheduled.
+
+        """
+        config = self.normalize_config(config)
+        rescheduled = config.schedule != self.config.schedule
+        if rescheduled and config.schedule is not None:
+            self.trigger = CronTrigger.from_crontab(config.schedule)
+        self.config = config
+        return rescheduled
+
+    def _diff_scopes(
+        self, scopes: list[Napalm], fingerprints: list[bytes]
+    ) -> tuple[list[tuple[Napalm, bytes]], dict[str, list[int]]]:
+        """
+        Compare the scope items of a new version of the policy with the current ones.
+
+        Args:
+        ----
+            scopes: scope data for the devices.
+            fingerprints: Fingerprints of the scope items.
+
+        Returns:
+        -------
+            tuple[list[tuple[Napalm, bytes]], dict[str, list[int]]]: The new scope items
+                not currently in the policy, with their fingerprints, and the ids of the
+                current ones not in the new version, by hostname.
+
+        """
+        current = dict[bytes, list[int]]()
+        for id, record in self.scopes.items():
+            current.setdefault(record.fingerprint, []).append(id)
+
+        changed = []
+        for scope, fingerprint in zip(scopes, fingerprints):
+            ids = current.get(fingerprint)
+            if ids:
+                ids.pop()
+            else:
+                changed.append((scope, fingerprint))
+
+        leftovers = dict[str, list[int]]()
+        for ids in current.values():
+            for id in ids:
+                leftovers.setdefault(self.scopes.get(id).hostname, []).append(id)
+        return changed, leftovers
+
+    def _apply_scopes(
+        self, scopes: list[Napalm], fingerprints: list[bytes], rescheduled: bool
+    ) -> dict:
+        """
+        Add, update and remove the scope items that differ from the new version.
+
+        Args:
+        ----
+            scopes: scope data for the devices.
+            fingerprints: Fingerprints of the scope items.
+            rescheduled: Whether every job is about to be rescheduled.
+
+        Returns:
+        -------
+            dict: Number of scope items added, removed and updated.
+
+        """
+        changed, leftovers = self._diff_scopes(scopes, fingerprints)
+        changes = {"added": 0, "removed": 0, "updated": 0}
+        for scope, fingerprint in changed:
+            ids = leftovers.get(scope.hostname)
+            if ids:
+                id = ids.pop()
+                self.scopes.update(id, scope, fingerprint)
+                if not rescheduled and self.scheduler.get_job(str(id)) is None:
+                    # One-time run already done, run the new version
+                    self._schedule(id)
+                changes["updated"] += 1
+            else:
+                self.add_scope(scope, fingerprint)
+                changes["added"] += 1
+
+        for ids in leftovers.values():
+            for id in ids:
+                self._unschedule(id)
+                self.forget_scope(id)
+                changes["removed"] += 1
+        return changes
+
+    def _schedule(self, id: int):
+        if self.config.schedule is not None:
+            trigger = self.trigger
+        else:
+            trigger = DateTrigger(run_date=datetime.now() + timedelta(seconds=1))
+        try:
+            self.scheduler.reschedule_job(str(id), trigger=trigger)
+        except JobLookupError:
             self.scheduler.add_job(
-                self.run, id=id, trigger=trigger, args=[id, scope, self.config]
+                self.run, id=str(id), name=self.name, trigger=trigger, args=[id]
             )
 
-            self.status = Status.RUNNING
+    def next_run_time(self, id: int) -> datetime | None:
+        """
+        Return when a scope item runs next.
+
+        Args:
+        ----
+            id: Scope ID.
+
+        Returns:
+        -------
+            datetime | None: The next run time, None if the scope item is not scheduled.
 
-    def run(self, id: str, scope: Napalm, config: Config):
+        """
+        job = self.scheduler.get_job(str(id))
+        return getattr(job, "next_run_time", None)
+
+    def _unschedule(self, id: int):
+        try:
+            self.scheduler.remove_job(str(id))
+        except JobLookupError:
+            pass
+
+    def run_now(self, hostnames: list[str] | None = None) -> RunHandle:
+        """
+        Queue an immediate run of the scope items, ahead of the scheduled runs.
+
+        Scope items already running are not queued again, their handle following the
+        run in progress.
+
+        Args:
+        ----
+            hostnames: Hostnames of the scope items to run, all of them when None.
+
+        Returns:
+        -------
+            RunHandle: The handle to follow the progress of the run.
+
+        """
+        wanted = set(hostnames) if hostnames is not None else None
+        ids = [
+            (id, record.hostname)
+            for id, record in self.scopes.items()
+            if wanted is None or record.hostname in wanted
+        ]
+        if not ids:
+            raise ValueError(f"policy '{self.name}' has no matching scope item")
+
+        pool = get_pool()
+        with self._runs_lock:
+            running = {id: self._runs.get(id) for id, _ in ids}
+        hosts = [
+            (hostname, running[id] or pool.submit(self.run, id, priority=HIGH))
+            for id, hostname in ids
+        ]
+        queued = sum(1 for future in running.values() if future is None)
+        logger.info(f"Policy {self.name}: Queued an immediate run of {queued} scope items")
+        return RunHandle(self.name, hosts)
+
+    def run(self, id: int) -> str | None:
         """
         Run the device driver code for a single scope item.
 
+        Scheduled and on-demand runs share the scope item, a run starting while another
+        one is in progress is skipped.
+
         Args:
         ----
-            id: Job ID.
-            scope: scope data for the device.
-            config: Configuration data containing site information.
+            id: Scope ID.
+
+        Returns:
+        -------
+            str | None: The error message of a failed run.
 
         """
+        with self._runs_lock:
+            if id in self._runs:
+                logger.info(f"Policy {self.name}: Scope item {id} is already running, run skipped")
+                return None
+            future = self._runs[id] = Future()
+        future.set_running_or_notify_cancel()
+        try:
+            error = self._run(id)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(error)
+            return error
+        finally:
+            with self._runs_lock:
+                del self._runs[id]
+
+    def _run(self, id: int) -> str | None:
+        scope = self.scopes.get(id)
+        if scope is None:
+            return "scope item was removed from the policy"
+        config = self.config
+        started = datetime.now(timezone.utc)
+        run_start = time.perf_counter()
+        stages = {}
         sanitized_hostname = scope.hostname.replace('\r\n', '').replace('\n', '')
         if scope.driver is None:
             logger.info(
                 f"Policy {self.name}, Hostname {sanitized_hostname}: Driver not informed, discovering it"
             )
+            start = time.perf_counter()
             scope.driver = discover_device_driver(scope)
+            stages["discovery"] = time.perf_counter() - start
+            DRIVER_DISCOVERY_DURATION.labels(self.name, scope.driver or "").observe(
+                stages["discovery"]
+            )
             if scope.driver is None:
+                ERRORS.labels(self.name, "discovery", "DriverNotFound").inc()
                 self.status = Status.FAILED
                 logger.error(
                     f"Policy {self.name}, Hostname {sanitized_hostname}: Not able to discover device driver"
                 )
                 try:
-                    self.scheduler.remove_job(id)
+                    self.scheduler.remove_job(str(id))
                 except Exception as e:
                     logger.error(
                         f"Policy {self.name}, Hostname {sanitized_hostname}: Error removing job: {e}"
                     )
-                return
+                self.record_run(
+                    id,
+                    started,
+                    time.perf_counter() - run_start,
+                    None,
+                    None,
+                    "Not able to discover device driver",
+                    stages,
+                    "DriverNotFound",
+                )
+                return "Not able to discover device driver"
+            remember_discovered_driver(scope.hostname, scope.driver)
 
         logger.info(
             f"Policy {self.name}, Hostname {sanitized_hostname}: Get driver '{scope.driver}'"
         )
 
+        stage = "collection"
+        entities = None
+        error = None
+        error_class = None
         try:
             np_driver = get_network_driver(scope.driver)
             logger.info(
                 f"Policy {self.name}, Hostname {sanitized_hostname}: Getting information"
             )
+            start = time.perf_counter()
             with np_driver(
                 scope.hostname,
                 scope.username,
@@ -132,11 +619,206 @@ class PolicyRunner:
                     "interface_ip": device.get_interfaces_ip(),
                     "defaults": config.defaults,
                 }
-                Client().ingest(scope.hostname, data)
+            stages["collection"] = time.perf_counter() - start
+            COLLECTION_DURATION.labels(self.name, scope.driver).observe(
+                stages["collection"]
+            )
+            stage = "ingest"
+            entities, errors = Client().ingest(
+                scope.hostname, data, policy=self.name, timings=stages
+            )
+            if errors:
+                error = f"ingestion failed: {errors}"
+                error_class = "IngestError"
         except Exception as e:
+            ERRORS.labels(self.name, stage, type(e).__name__).inc()
             logger.error(f"Policy {self.name}, Hostname {sanitized_hostname}: {e}")
+            error = str(e)
+            error_class = type(e).__name__
+        self.record_run(
+            id,
+            started,
+            time.perf_counter() - run_start,
+            scope.driver,
+            entities,
+            error,
+            stages,
+            error_class,
+        )
+        return error
+
+    def record_run(
+        self,
+        id: int,
+        started: datetime,
+        duration: float,
+        driver: str | None,
+        entities: int | None,
+        error: str | None,
+        stages: dict[str, float] | None = None,
+        error_class: str | None = None,
+    ):
+        """
+        Record the outcome of a run in the policy state and the scope item history.
+
+        Args:
+        ----
+            id: Scope ID.
+            started: When the run started.
+            duration: Run duration, in seconds.
+            driver: The driver used, None if it could not be discovered.
+            entities: Number of entities ingested, None if the run failed before.
+            error: The error message of a failed run.
+            stages: Duration of each stage that ran, in seconds.
+            error_class: The class of the error of a failed run.
+
+        """
+        with self._state_lock:
+            if id not in self.scopes:
+                return
+            state = self.states.get(id)
+            if state is None:
+                state = self.states[id] = HostState()
+            history = self.history.get(id)
+            if history is None:
+                history = self.history[id] = RunHistory()
+            if error is not None and error_class is None:
+                error_class = "Error"
+            if (state.last_error is None) != (error is None):
+                self.failing += 1 if error is not None else -1
+            state.last_run = started
+            state.duration = round(duration, 6)
+            state.driver = driver
+            state.entities = entities
+            state.last_error = error
+            state.failures = state.failures + 1 if error is not None else 0
+            history.append(started, duration, stages or {}, entities, error_class)
+            self.slowest.set(id, state.duration)
+            self.most_failing.set(id, state.failures)
+            self.runs += 1
+            self.last_run = started
+        record = self.scopes.get(id)
+        if self.store is not None and record is not None:
+            self.store.save_run(self.name, id, record.driver, state, self.next_run_time(id))
+
+    def forget_scope(self, id: int):
+        """
+        Remove a scope item and its state.
+
+        Args:
+        ----
+            id: Scope ID.
+
+        """
+        with self._state_lock:
+            self.scopes.remove(id)
+            state = self.states.pop(id, None)
+            self.history.pop(id, None)
+            if state is not None and state.last_error is not None:
+                self.failing -= 1
+            self.slowest.discard(id)
+            self.most_failing.discard(id)
+
+    def summary(self) -> dict:
+        """
+        Summarize the policy, in constant time.
+
+        Returns
+        -------
+            dict: Name, status, schedule, number of scope items and of failing ones,
+                  number of runs and time of the last one.
+
+        """
+        return {
+            "name": self.name,
+            "status": self.status.value,
+            "schedule": self.config.schedule if self.config else None,
+            "scopes": len(self.scopes),
+            "failing": self.failing,
+            "runs": self.runs,
+            "last_run": isoformat(self.last_run),
+        }
+
+    def hosts(self, cursor: int | None, limit: int) -> tuple[list[dict], int | None]:
+        """
+        Return a page of the scope items with the outcome of their last run.
+
+        Args:
+        ----
+            cursor: Last scope ID of the previous page, None for the first page.
+            limit: Maximum number of scope items.
+
+        Returns:
+        -------
+            tuple[list[dict], int | None]: The scope items, and the cursor of the next page.
+
+        """
+        ids, next_cursor = paginate(self.scopes.ids(), cursor, limit)
+        hosts = []
+        for id in ids:
+            record = self.scopes.get(id)
+            if record is None:
+                continue
+            host = {"id": id, "hostname": record.hostname}
+            host.update((self.states.get(id) or EMPTY_STATE).to_dict())
+            host["driver"] = host["driver"] or record.driver
+            hosts.append(host)
+        return hosts, next_cursor
+
+    def host(self, id: int) -> dict:
+        """
+        Describe a scope item, with its recent runs.
+
+        Args:
+        ----
+            id: Scope ID.
+
+        Returns:
+        -------
+            dict: The scope item, the outcome of its last run and its run history.
+
+        """
+        record = self.scopes.get(id)
+        if record is None:
+            raise ValueError(f"scope item {id} not found in policy '{self.name}'")
+        host = {"id": id, "hostname": record.hostname}
+        host.update((self.states.get(id) or EMPTY_STATE).to_dict())
+        host["driver"] = host["driver"] or record.driver
+        history = self.history.get(id)
+        host["history"] = history.records() if history is not None else []
+        return host
+
+    def top(self, by: str, limit: int) -> list[tuple[float, dict]]:
+        """
+        Return the slowest or most failing scope items.
+
+        Args:
+        ----
+            by: "slowest" for the longest last runs, "failing" for the most
+                consecutive failures.
+            limit: Maximum number of scope items.
+
+        Returns:
+        -------
+            list[tuple[float, dict]]: The score of each scope item, highest first, and
+                                      the scope item with its last run.
+
+        """
+        index = self.slowest if by == "slowest" else self.most_failing
+        hosts = []
+        for id, score in index.top(limit):
+            record = self.scopes.get(id)
+            if record is None:
+                continue
+            host = {"policy": self.name, "id": id, "hostname": record.hostname}
+            host.update((self.states.get(id) or EMPTY_STATE).to_dict())
+            history = self.history.get(id)
+            host["last"] = history.records(1)[0] if history else None
+            hosts.append((score, host))
+        return hosts
 
     def stop(self):
         """Stop the policy runner."""
         self.scheduler.shutdown()
+        forget_policy(self.name)
         self.status = Status.FINISHED
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""Device Discovery compact scope store."""
+
+import hashlib
+import json
+import threading
+import weakref
+from bisect import bisect_left
+from collections.abc import Iterator
+from typing import Any
+
+from device_discovery.policy.models import Napalm
+
+FINGERPRINT_MODULUS = 1 << 128
+
+
+def scope_fingerprint(scope: Napalm) -> bytes:
+    """
+    Fingerprint a scope item as submitted.
+
+    Args:
+    ----
+        scope (Napalm): The scope item.
+
+    Returns:
+    -------
+        bytes: A 16 bytes digest of every field of the scope item.
+
+    """
+    return hashlib.blake2b(scope.model_dump_json().encode(), digest_size=16).digest()
+
+
+def combine_fingerprints(fingerprints: list[bytes]) -> int:
+    """
+    Combine scope fingerprints regardless of their order.
+
+    Args:
+    ----
+        fingerprints (list[bytes]): Scope fingerprints.
+
+    Returns:
+    -------
+        int: The sum of the fingerprints, modulo 2**128.
+
+    """
+    return sum(int.from_bytes(fp, "big") for fp in fingerprints) % FINGERPRINT_MODULUS
+
+
+class Credentials:
+    """Connection settings shared by every scope item using them."""
+
+    __slots__ = ("username", "password", "timeout", "optional_args", "__weakref__")
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        timeout: int,
+        optional_args: dict[str, Any] | None,
+    ):
+        """Initialize the credentials."""
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.optional_args = optional_args
+
+
+class ScopeRecord:
+    """
+    A scope item, exposing the same attributes as `Napalm`.
+
+    Only the hostname and driver are stored per device, the connection settings are
+    shared with the other devices using the same ones.
+    """
+
+    __slots__ = ("hostname", "driver", "credentials", "fingerprint")
+
+    def __init__(
+        self,
+        hostname: str,
+        driver: str | None,
+        credentials: Credentials,
+        fingerprint: bytes,
+    ):
+        """Initialize the record."""
+        self.hostname = hostname
+        self.driver = driver
+        self.credentials = credentials
+        self.fingerprint = fingerprint
+
+    @property
+    def username(self) -> str:
+        """Return the username."""
+        return self.credentials.username
+
+    @property
+    def password(self) -> str:
+        """Return the password."""
+        return self.credentials.password
+
+    @property
+    def timeout(self) -> int:
+        """Return the timeout."""
+        return self.credentials.timeout
+
+    @property
+    def optional_args(self) -> dict[str, Any] | None:
+        """Return the optional arguments."""
+        return self.credentials.optional_args
+
+
+class ScopeStore:
+    """
+    Scope items of a policy, keyed by integer id.
+
+    Credentials are interned: thousands of devices sharing a username, password,
+    timeout and optional arguments hold a reference to a single `Credentials`.
+
+    Changes are made under a lock, and the readers iterate over a snapshot, so the API
+    can list the scope items of a policy while it is updated.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._records = dict[int, ScopeRecord]()
+        # Ids are increasing, appending keeps this list sorted for pagination
+        self._ids = list[int]()
+        self._credentials = weakref.WeakValueDictionary()
+        self._next_id = 0
+        self._fingerprint = 0
+        self._lock = threading.Lock()
+
+    def _intern(self, scope: Napalm) -> Credentials:
+        key = (
+            scope.username,
+            scope.password,
+            scope.timeout,
+            json.dumps(scope.optional_args, sort_keys=True, default=str),
+        )
+        credentials = self._credentials.get(key)
+        if credentials is None:
+            credentials = Credentials(
+                scope.username, scope.password, scope.timeout, scope.optional_args
+            )
+            self._credentials[key] = credentials
+        return credentials
+
+    def add(
+        self, scope: Napalm, fingerprint: bytes | None = None, id: int | None = None
+    ) -> int:
+        """
+        Store a scope item.
+
+        Args:
+        ----
+            scope (Napalm): The scope item.
+            fingerprint (bytes | None): Its fingerprint, computed when not given.
+            id (int | None): Id to restore, greater than every stored id.
+
+        Returns:
+        -------
+            int: The id of the stored record.
+
+        """
+        if fingerprint is None:
+            fingerprint = scope_fingerprint(scope)
+        with self._lock:
+            if id is None:
+                self._next_id += 1
+            elif id > self._next_id:
+                self._next_id = id
+            else:
+                raise ValueError(f"scope id {id} is not greater than the stored ones")
+            self._records[self._next_id] = ScopeRecord(
+                scope.hostname, scope.driver, self._intern(scope), fingerprint
+            )
+            self._ids.append(self._next_id)
+            self._shift(fingerprint, 1)
+            return self._next_id
+
+    def update(self, id: int, scope: Napalm, fingerprint: bytes | None = None):
+        """
+        Replace a record with a new version of the same device.
+
+        A driver previously discovered is kept unless the new scope item sets one.
+
+        Args:
+        ----
+            id (int): The record id.
+            scope (Napalm): The new scope item.
+            fingerprint (bytes | None): Its fingerprint, computed when not given.
+
+        """
+        if fingerprint is None:
+            fingerprint = scope_fingerprint(scope)
+        with self._lock:
+            record = self._records[id]
+            self._shift(record.fingerprint, -1)
+            record.hostname = scope.hostname
+            record.driver = scope.driver or record.driver
+            record.credentials = self._intern(scope)
+            record.fingerprint = fingerprint
+            self._shift(fingerprint, 1)
+
+    def _shift(self, fingerprint: bytes, sign: int):
+        self._fingerprint = (
+            self._fingerprint + sign * int.from_bytes(fingerprint, "big")
+        ) % FINGERPRINT_MODULUS
+
+    def fingerprint(self) -> int:
+        """Return the combined fingerprint of the stored scope items."""
+        return self._fingerprint
+
+    def get(self, id: int) -> ScopeRecord | None:
+        """Return the record with the given id, or None."""
+        return self._records.get(id)
+
+    def remove(self, id: int):
+        """Remove the record with the given id, if any."""
+        with self._lock:
+            record = self._records.pop(id, None)
+            if record is not None:
+                del self._ids[bisect_left(self._ids, id)]
+                self._shift(record.fingerprint, -1)
+
+    def ids(self) -> list[int]:
+        """Return a snapshot of the sorted record ids."""
+        with self._lock:
+            return self._ids.copy()
+
+    def credentials_count(self) -> int:
+        """Return the number of distinct credentials in use."""
+        return len(self._credentials)
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over a snapshot of the record ids."""
+        with self._lock:
+            return iter(list(self._records))
+
+    def items(self) -> Iterator[tuple[int, ScopeRecord]]:
+        """Iterate over a snapshot of the record ids and records."""
+        with self._lock:
+            return iter(list(self._records.items()))
+
+    def __contains__(self, id: int) -> bool:
+        """Check if a record id is in the store."""
+        return id in self._records
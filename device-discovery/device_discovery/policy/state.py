@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""Device Discovery runtime state of the policies."""
+
+import math
+import struct
+import threading
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import Future
+from datetime import datetime, timezone
+
+# Stages of a run, in order
+STAGES = ("discovery", "collection", "translate", "ingest")
+# Number of runs kept per scope item
+HISTORY_SIZE = 10
+
+# Start time, duration and stage durations, entities (-1 if none), error class index
+RUN_RECORD = struct.Struct(f"<dd{len(STAGES)}fiH")
+
+# Error class names, indexed by their position (0 is no error)
+_error_classes = [""]
+_error_indexes = {"": 0}
+_error_lock = threading.Lock()
+
+
+def error_class_index(name: str | None) -> int:
+    """
+    Return the index of an error class name, adding it if needed.
+
+    Args:
+    ----
+        name (str | None): Error class name, None for no error.
+
+    Returns:
+    -------
+        int: The index of the error class.
+
+    """
+    if not name:
+        return 0
+    index = _error_indexes.get(name)
+    if index is None:
+        with _error_lock:
+            index = _error_indexes.get(name)
+            if index is None:
+                index = len(_error_classes)
+                _error_classes.append(name)
+                _error_indexes[name] = index
+    return index
+
+
+class HostState:
+    """Outcome of the last run of a scope item."""
+
+    __slots__ = ("last_run", "duration", "driver", "entities", "last_error", "failures")
+
+    def __init__(self):
+        """Initialize an empty state."""
+        self.last_run = None
+        self.duration = None
+        self.driver = None
+        self.entities = None
+        self.last_error = None
+        self.failures = 0
+
+    def to_dict(self) -> dict:
+        """Return the state as a JSON serializable dictionary."""
+        return {
+            "last_run": isoformat(self.last_run),
+            "duration_seconds": self.duration,
+            "driver": self.driver,
+            "entities": self.entities,
+            "last_error": self.last_error,
+            "consecutive_failures": self.failures,
+        }
+
+
+class RunHistory:
+    """
+    Ring buffer of the last runs of a scope item.
+
+    Records are packed in a preallocated `bytearray`, so the memory used per scope item
+    does not depend on the number of runs.
+    """
+
+    __slots__ = ("_buffer", "_next", "_count")
+
+    def __init__(self, size: int = HISTORY_SIZE):
+        """
+        Initialize an empty history.
+
+        Args:
+        ----
+            size (int): Number of runs kept.
+
+        """
+        self._buffer = bytearray(RUN_RECORD.size * size)
+        self._next = 0
+        self._count = 0
+
+    def append(
+        self,
+        started: datetime,
+        duration: float,
+        stages: dict[str, float],
+        entities: int | None,
+        error_class: str | None,
+    ):
+        """
+        Record a run, replacing the oldest one if the history is full.
+
+        Args:
+        ----
+            started (datetime): When the run started.
+            duration (float): Run duration, in seconds.
+            stages (dict[str, float]): Duration of the stages that ran, in seconds.
+            entities (int | None): Number of entities ingested.
+            error_class (str | None): Class of the error of a failed run.
+
+        """
+        size = len(self._buffer) // RUN_RECORD.size
+        RUN_RECORD.pack_into(
+            self._buffer,
+            self._next * RUN_RECORD.size,
+            started.timestamp(),
+            duration,
+            *(stages.get(stage, math.nan) for stage in STAGES),
+            -1 if entities is None else entities,
+            error_class_index(error_class),
+        )
+        self._next = (self._next + 1) % size
+        self._count = min(self._count + 1, size)
+
+    def records(self, limit: int | None = None) -> list[dict]:
+        """
+        Return the recorded runs, the most recent first.
+
+        Args:
+        ----
+            limit (int | None): Maximum number of runs, all of them when None.
+
+        Returns:
+        -------
+            list[dict]: Start time, duration, stage durations, entities and error class
+                        of each run.
+
+        """
+        size = len(self._buffer) // RUN_RECORD.size
+        count = self._count if limit is None else min(limit, self._count)
+        records = []
+        for i in range(1, count + 1):
+            offset = (self._next - i) % size * RUN_RECORD.size
+            started, duration, *stages, entities, error = RUN_RECORD.unpack_from(
+                self._buffer, offset
+            )
+            records.append(
+                {
+                    "started": isoformat(datetime.fromtimestamp(started, timezone.utc)),
+                    "duration_seconds": round(duration, 6),
+                    "stages": {
+                        stage: round(value, 6)
+                        for stage, value in zip(STAGES, stages)
+                        if not math.isnan(value)
+                    },
+                    "entities": entities if entities >= 0 else None,
+                    "error_class": _error_classes[error] or None,
+                }
+            )
+        return records
+
+    def __len__(self) -> int:
+        """Return the number of recorded runs."""
+        return self._count
+
+
+class TopIndex:
+    """
+    Scope ids sorted by decreasing score, updated as scores change.
+
+    Only positive scores are indexed. Reading the top K ids does not depend on the
+    number of scope items.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._keys = list[tuple[float, int]]()
+        self._scores = dict[int, float]()
+        self._lock = threading.Lock()
+
+    def set(self, id: int, score: float):
+        """
+        Set the score of a scope id.
+
+        Args:
+        ----
+            id (int): Scope id.
+            score (float): Its score, 0 or less to remove it from the index.
+
+        """
+        with self._lock:
+            self._remove(id)
+            if score > 0:
+                insort(self._keys, (-score, id))
+                self._scores[id] = score
+
+    def discard(self, id: int):
+        """Remove a scope id from the index."""
+        with self._lock:
+            self._remove(id)
+
+    def _remove(self, id: int):
+        score = self._scores.pop(id, None)
+        if score is not None:
+            del self._keys[bisect_left(self._keys, (-score, id))]
+
+    def top(self, limit: int) -> list[tuple[int, float]]:
+        """
+        Return the scope ids with the highest scores.
+
+        Args:
+        ----
+            limit (int): Maximum number of scope ids.
+
+        Returns:
+        -------
+            list[tuple[int, float]]: Scope ids and their scores, highest first.
+
+        """
+        with self._lock:
+            keys = self._keys[:limit]
+        return [(id, -score) for score, id in keys]
+
+    def __len__(self) -> int:
+        """Return the number of indexed scope ids."""
+        return len(self._scores)
+
+
+def isoformat(value: datetime | None) -> str | None:
+    """Format an optional datetime."""
+    return value.isoformat() if value is not None else None
+
+
+def paginate(keys: list, cursor, limit: int) -> tuple[list, object]:
+    """
+    Return the page of sorted keys following a cursor.
+
+    Args:
+    ----
+        keys (list): Sorted keys.
+        cursor: Last key of the previous page, None for the first page.
+        limit (int): Maximum number of keys in the page.
+
+    Returns:
+    -------
+        tuple[list, object]: The keys of the page, and the cursor of the next page
+                             (None for the last page).
+
+    """
+    start = bisect_right(keys, cursor) if cursor is not None else 0
+    page = keys[start : start + limit]
+    next_cursor = page[-1] if page and start + limit < len(keys) else None
+    return page, next_cursor
+
+
+class RunHandle:
+    """Progress of an on-demand run of some scope items of a policy."""
+
+    __slots__ = ("id", "policy", "created", "hosts")
+
+    def __init__(self, policy: str, hosts: list[tuple[str, Future]]):
+        """
+        Initialize the handle.
+
+        Args:
+        ----
+            policy (str): Policy name.
+            hosts (list[tuple[str, Future]]): Hostname and run future of each scope item.
+
+        """
+        self.id = uuid.uuid4().hex
+        self.policy = policy
+        self.created = datetime.now(timezone.utc)
+        self.hosts = hosts
+
+    def progress(self) -> dict:
+        """
+        Report the progress of the run.
+
+        Returns
+        -------
+            dict: The overall status, the number of scope items per status and the
+                  status of each scope item, with its error if it failed.
+
+        """
+        counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+        hosts = []
+        for hostname, future in self.hosts:
+            error = None
+            if not future.done():
+                status = "running" if future.running() else "queued"
+            else:
+                error = future.exception() or future.result()
+                status = "failed" if error else "succeeded"
+            counts[status] += 1
+            hosts.append(
+                {
+                    "hostname": hostname,
+                    "status": status,
+                    "error": str(error) if error else None,
+                }
+            )
+        if counts["queued"] == len(hosts):
+            status = "queued"
+        elif counts["queued"] or counts["running"]:
+            status = "running"
+        else:
+            status = "completed"
+        return {
+            "id": self.id,
+            "policy": self.policy,
+            "created": isoformat(self.created),
+            "status": status,
+            **counts,
+            "hosts": hosts,
+        }
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""Device Discovery persistent policy store."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from device_discovery.policy.models import Config
+from device_discovery.policy.runner import PolicyRunner
+from device_discovery.policy.scopes import ScopeRecord
+from device_discovery.policy.state import HostState, isoformat
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS policies (
+    name TEXT PRIMARY KEY,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scopes (
+    policy TEXT NOT NULL REFERENCES policies (name) ON DELETE CASCADE,
+    id INTEGER NOT NULL,
+    scope TEXT NOT NULL,
+    fingerprint BLOB NOT NULL,
+    driver TEXT,
+    next_run TEXT,
+    last_run TEXT,
+    duration REAL,
+    entities INTEGER,
+    last_error TEXT,
+    PRIMARY KEY (policy, id)
+) WITHOUT ROWID;
+"""
+
+
+class PolicyStore:
+    """
+    SQLite store of the running policies.
+
+    Keeps the configuration and scope items of each policy, with the next run time,
+    driver and outcome of the last run of every scope item, so that the policies can
+    be restored when the backend restarts. The file holds the device credentials and
+    is only readable by its owner.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the store, creating it if needed.
+
+        Args:
+        ----
+            path (str): Path of the SQLite database file.
+
+        """
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._closed = False
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.executescript(SCHEMA)
+
+    def _scope_row(self, runner: PolicyRunner, id: int, record: ScopeRecord) -> tuple:
+        scope = {
+            "hostname": record.hostname,
+            "username": record.username,
+            "password": record.password,
+            "timeout": record.timeout,
+            "optional_args": record.optional_args,
+        }
+        state = runner.states.get(id) or HostState()
+        return (
+            runner.name,
+            id,
+            json.dumps(scope, default=str),
+            record.fingerprint,
+            record.driver,
+            isoformat(runner.next_run_time(id)),
+            isoformat(state.last_run),
+            state.duration,
+            state.entities,
+            state.last_error,
+        )
+
+    def save_policy(self, runner: PolicyRunner):
+        """
+        Save a policy and all its scope items, replacing a previous version.
+
+        Args:
+        ----
+            runner (PolicyRunner): The runner of the policy.
+
+        """
+        rows = [self._scope_row(runner, id, record) for id, record in runner.scopes.items()]
+        config = runner.config.model_dump_json(exclude_none=True)
+        with self._lock:
+            if self._closed:
+                return
+            with self._conn:
+                self._conn.execute("DELETE FROM policies WHERE name = ?", (runner.name,))
+                self._conn.execute(
+                    "INSERT INTO policies (name, config) VALUES (?, ?)", (runner.name, config)
+                )
+                self._conn.executemany(
+                    "INSERT INTO scopes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+
+    def save_scopes(self, runner: PolicyRunner, ids: list[int]):
+        """
+        Save scope items added to a saved policy, in a single transaction.
+
+        Args:
+        ----
+            runner (PolicyRunner): The runner of the policy.
+            ids (list[int]): The scope ids.
+
+        """
+        rows = [self._scope_row(runner, id, runner.scopes.get(id)) for id in ids]
+        with self._lock:
+            if self._closed:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO scopes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+
+    def save_run(
+        self,
+        policy: str,
+        id: int,
+        driver: str | None,
+        state: HostState,
+        next_run: datetime | None,
+    ):
+        """
+        Save the outcome of a run.
+
+        Args:
+        ----
+            policy (str): Policy name.
+            id (int): The scope id.
+            driver (str | None): The driver of the scope item, once discovered.
+            state (HostState): The outcome of the run.
+            next_run (datetime | None): When the scope item runs next, if scheduled.
+
+        """
+        with self._lock:
+            if self._closed:
+                return
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE scopes SET driver = ?, next_run = ?, last_run = ?, duration = ?, "
+                    "entities = ?, last_error = ? WHERE policy = ? AND id = ?",
+                    (
+                        driver,
+                        isoformat(next_run),
+                        isoformat(state.last_run),
+                        state.duration,
+                        state.entities,
+                        state.last_error,
+                        policy,
+                        id,
+                    ),
+                )
+
+    def delete_policy(self, name: str):
+        """
+        Delete a policy and its scope items.
+
+        Args:
+        ----
+            name (str): Policy name.
+
+        """
+        with self._lock:
+            if self._closed:
+                return
+            with self._conn:
+                self._conn.execute("DELETE FROM policies WHERE name = ?", (name,))
+
+    def load(self) -> list[tuple[str, Config, list[sqlite3.Row]]]:
+        """
+        Load the saved policies.
+
+        Returns
+        -------
+            list[tuple[str, Config, list[sqlite3.Row]]]: The name, configuration and
+                scope rows of each policy, scope rows sorted by id.
+
+        """
+        with self._lock:
+            policies = self._conn.execute(
+                "SELECT name, config FROM policies ORDER BY name"
+            ).fetchall()
+            scopes = dict[str, list[sqlite3.Row]]()
+            for row in self._conn.execute("SELECT * FROM scopes ORDER BY policy, id"):
+                scopes.setdefault(row["policy"], []).append(row)
+        return [
+            (row["name"], Config.model_validate_json(row["config"]), scopes.get(row["name"], []))
+            for row in policies
+        ]
+
+    def close(self):
+        """Close the store, later writes are ignored."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._conn.close()
+
+
+_store = None
+
+
+def configure_store(path: str):
+    """
+    Open the store the policies are saved to and restored from.
+
+    Args:
+    ----
+        path (str): Path of the SQLite database file.
+
+    """
+    global _store
+    _store = PolicyStore(path)
+    logger.info(f"Saving policies to '{path}'")
+
+
+def get_store() -> PolicyStore | None:
+    """Return the configured store, None when policies are not persisted."""
+    return _store
@@ -3,19 +3,25 @@
 """Device Discovery Server."""
 
 
+import json
+import threading
 from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Literal
 
 import yaml
-from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import ValidationError
 
-from device_discovery.discovery import supported_drivers
+from device_discovery import metrics
+from device_discovery.discovery import get_supported_drivers
 from device_discovery.policy.manager import PolicyManager
-from device_discovery.policy.models import PolicyRequest
+from device_discovery.policy.models import Policy, PolicyRequest, RunRequest
+from device_discovery.policy.store import get_store
 from device_discovery.version import version_semver
 
-manager = PolicyManager()
+manager = PolicyManager(get_store())
 start_time = datetime.now()
 
 
@@ -30,6 +36,10 @@ async def lifespan(app: FastAPI):
 
     """
     # Startup
+    threading.Thread(
+        target=get_supported_drivers, name="napalm-drivers", daemon=True
+    ).start()
+    manager.restore()
     yield
     # Clean up
     manager.stop()
@@ -38,9 +48,37 @@ async def lifespan(app: FastAPI):
 app = FastAPI(lifespan=lifespan)
 
 
+POLICY_CONTENT_TYPES = ("application/x-yaml", "application/json")
+# Longest accepted line of a streamed policy.
+MAX_STREAM_LINE_BYTES = 1024 * 1024
+
+
+def validation_errors(e: ValidationError, prefix: str = "") -> list[dict]:
+    """
+    Format the errors of a validation exception.
+
+    Args:
+    ----
+        e (ValidationError): The validation exception.
+        prefix (str): Prefix of the field paths.
+
+    Returns:
+    -------
+        list[dict]: One entry per error, with its field path, type and message.
+
+    """
+    errors = []
+    for error in e.errors():
+        field_path = ".".join(str(part) for part in (prefix, *error["loc"]) if part != "")
+        errors.append({"field": field_path, "type": error["type"], "error": error["msg"]})
+    return errors
+
+
 async def parse_yaml_body(request: Request) -> PolicyRequest:
     """
-    Parse the YAML body of the request.
+    Parse the YAML or JSON body of the request.
+
+    Parsing runs in the thread pool, large policies would otherwise block the event loop.
 
     Args:
     ----
@@ -51,25 +89,23 @@ async def parse_yaml_body(request: Request) -> PolicyRequest:
         PolicyRequest: The policy request object.
 
     """
-    if request.headers.get("content-type") != "application/x-yaml":
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in POLICY_CONTENT_TYPES:
         raise HTTPException(
             status_code=400,
-            detail="invalid Content-Type. Only 'application/x-yaml' is supported",
+            detail="invalid Content-Type. Only 'application/x-yaml' and 'application/json' are supported",
         )
     body = await request.body()
     try:
-        return manager.parse_policy(body)
+        return await run_in_threadpool(manager.parse_policy, body, content_type)
     except yaml.YAMLError as e:
         raise HTTPException(status_code=400, detail="Invalid YAML format") from e
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail="Invalid JSON format") from e
     except ValidationError as e:
-        errors = []
-        for error in e.errors():
-            field_path = ".".join(str(part) for part in error["loc"])
-            message = error["msg"]
-            errors.append(
-                {"field": field_path, "type": error["type"], "error": message}
-            )
-        raise HTTPException(status_code=403, detail=errors) from e
+        if any(error["type"] == "json_invalid" for error in e.errors()):
+            raise HTTPException(status_code=400, detail="Invalid JSON format") from e
+        raise HTTPException(status_code=403, detail=validation_errors(e)) from e
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
@@ -101,7 +137,110 @@ def read_capabilities():
         dict: The supported drivers.
 
     """
-    return {"supported_drivers": supported_drivers}
+    return {"supported_drivers": get_supported_drivers()}
+
+
+@app.get("/metrics")
+def read_metrics():
+    """
+    Get the Prometheus metrics.
+
+    Returns
+    -------
+        Response: The metrics in the Prometheus text format.
+
+    """
+    content, content_type = metrics.latest()
+    return Response(content=content, media_type=content_type)
+
+
+@app.get("/api/v1/policies")
+def list_policies(
+    cursor: str | None = None, limit: int = Query(default=100, ge=1, le=1000)
+):
+    """
+    List the policies, sorted by name.
+
+    Args:
+    ----
+        cursor (str | None): The `next_cursor` of the previous page.
+        limit (int): Maximum number of policies.
+
+    Returns:
+    -------
+        dict: The summary of each policy of the page, and the next page cursor.
+
+    """
+    return manager.list_policies(cursor, limit)
+
+
+@app.get("/api/v1/policies/{policy_name}")
+def read_policy(
+    policy_name: str,
+    cursor: int | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """
+    Describe a policy, with the outcome of the last run of each scope item.
+
+    Args:
+    ----
+        policy_name (str): The policy name.
+        cursor (int | None): The `next_cursor` of the previous page of scope items.
+        limit (int): Maximum number of scope items.
+
+    Returns:
+    -------
+        dict: The policy summary, a page of its scope items and the next page cursor.
+
+    """
+    try:
+        return manager.get_policy(policy_name, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/api/v1/policies/{policy_name}/hosts/{host_id}")
+def read_host(policy_name: str, host_id: int):
+    """
+    Describe a scope item of a policy, with its recent runs.
+
+    Args:
+    ----
+        policy_name (str): The policy name.
+        host_id (int): The scope item ID, as listed by the policy.
+
+    Returns:
+    -------
+        dict: The scope item, the outcome of its last run and its run history.
+
+    """
+    try:
+        return manager.get_host(policy_name, host_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/api/v1/hosts/top")
+def read_top_hosts(
+    by: Literal["slowest", "failing"] = "slowest",
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    """
+    List the slowest or most failing scope items, across all policies.
+
+    Args:
+    ----
+        by (str): "slowest" for the longest last runs, "failing" for the most
+                  consecutive failures.
+        limit (int): Maximum number of scope items.
+
+    Returns:
+    -------
+        dict: The scope items with their last run, worst first.
+
+    """
+    return {"hosts": manager.top_hosts(by, limit)}
 
 
 @app.post("/api/v1/policies", status_code=201)
@@ -139,6 +278,253 @@ async def write_policy(request: PolicyRequest = Depends(parse_yaml_body)):
     return {"detail": f"policies {started_policies} were started"}
 
 
+@app.put("/api/v1/policies", status_code=200)
+async def upsert_policy(request: PolicyRequest = Depends(parse_yaml_body)):
+    """
+    Create or update policies, only touching the scope items that changed.
+
+    The policies are applied together: when one of them fails, none is.
+
+    Args:
+    ----
+        request (PolicyRequest): The policy request object.
+
+    Returns:
+    -------
+        dict: The result of the policy write, with the changes made per policy.
+
+    """
+    if not request.policies:
+        raise HTTPException(status_code=400, detail="no policies found in request")
+    try:
+        results = manager.upsert_policies(request.policies)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if len(results) == 1:
+        name, result = next(iter(results.items()))
+        verb = "is" if result["status"] == "unchanged" else "was"
+        return {"detail": f"policy '{name}' {verb} {result['status']}", "policies": results}
+    return {"detail": f"policies {list(results)} were applied", "policies": results}
+
+
+async def ndjson_batches(request: Request):
+    """
+    Yield the non-empty lines of a NDJSON request body as they are received.
+
+    Args:
+    ----
+        request (Request): The request object.
+
+    Yields:
+    ------
+        list[tuple[int, bytes]]: Line number and content of the lines completed by each
+                                 chunk of the body.
+
+    """
+    buffer = bytearray()
+    number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, rest = buffer.split(b"\n")
+        buffer = bytearray(rest)
+        if len(buffer) > MAX_STREAM_LINE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"line {number + len(lines) + 1} is longer than {MAX_STREAM_LINE_BYTES} bytes",
+            )
+        batch = []
+        for line in lines:
+            number += 1
+            if line.strip():
+                batch.append((number, bytes(line)))
+        if batch:
+            yield batch
+    if buffer.strip():
+        yield [(number + 1, bytes(buffer))]
+
+
+def stream_error(e: Exception, number: int, prefix: str = "") -> HTTPException:
+    """
+    Map the error raised by a streamed line to an HTTP error.
+
+    Args:
+    ----
+        e (Exception): The error.
+        number (int): Line number.
+        prefix (str): Prefix of the field paths of validation errors.
+
+    Returns:
+    -------
+        HTTPException: 400 for malformed lines and other errors, 403 for invalid ones.
+
+    """
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, json.JSONDecodeError) or (
+        isinstance(e, ValidationError) and any(error["type"] == "json_invalid" for error in e.errors())
+    ):
+        return HTTPException(status_code=400, detail=f"line {number}: Invalid JSON format")
+    if isinstance(e, ValidationError):
+        return HTTPException(status_code=403, detail=validation_errors(e, prefix))
+    return HTTPException(status_code=400, detail=f"line {number}: {e}")
+
+
+def start_streamed_policy(line: bytes, number: int) -> str:
+    """
+    Start the policy described by the first line of a stream, without scope items.
+
+    Args:
+    ----
+        line (bytes): The line holding the policy name and config.
+        number (int): Line number.
+
+    Returns:
+    -------
+        str: The policy name.
+
+    """
+    try:
+        header = manager.parse_stream_header(line)
+    except Exception as e:
+        raise stream_error(e, number) from e
+    if manager.policy_exists(header.name):
+        raise HTTPException(status_code=409, detail=f"policy '{header.name}' already exists")
+    try:
+        manager.start_policy(header.name, Policy(config=header.config, scope=[]))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return header.name
+
+
+def add_streamed_scopes(name: str, lines: list[tuple[int, bytes]], first: int) -> int:
+    """
+    Add the scope items of a batch of streamed lines to a started policy.
+
+    Args:
+    ----
+        name (str): Policy name.
+        lines (list[tuple[int, bytes]]): Line number and content of each scope item.
+        first (int): Index of the first scope item of the batch in the policy.
+
+    Returns:
+    -------
+        int: Number of scope items added.
+
+    """
+    # Line and scope item being added, to report where an error occurred
+    position = (lines[0][0], first)
+
+    def parse():
+        nonlocal position
+        for index, (number, line) in enumerate(lines, first):
+            position = (number, index)
+            yield manager.parse_scope_line(line)
+
+    try:
+        return manager.add_scopes(name, parse())
+    except Exception as e:
+        number, index = position
+        raise stream_error(e, number, f"scope.{index}") from e
+
+
+@app.post("/api/v1/policies/stream", status_code=201)
+async def stream_policy(request: Request):
+    """
+    Write a policy streamed as NDJSON.
+
+    The first line holds the policy name and config, every following line is a scope
+    item. Scope items are validated and scheduled as they are received, so the body is
+    never held in memory as a whole. Each chunk of the body is handled in a worker
+    thread, its scope items being saved in a single transaction.
+
+    Args:
+    ----
+        request (Request): The request object.
+
+    Returns:
+    -------
+        dict: The result of the policy write.
+
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type != "application/x-ndjson":
+        raise HTTPException(
+            status_code=400,
+            detail="invalid Content-Type. Only 'application/x-ndjson' is supported",
+        )
+
+    name = None
+    scopes = 0
+    number = 0
+    try:
+        async for lines in ndjson_batches(request):
+            if name is None:
+                number, line = lines.pop(0)
+                name = await run_in_threadpool(start_streamed_policy, line, number)
+            if lines:
+                number = lines[-1][0]
+                scopes += await run_in_threadpool(add_streamed_scopes, name, lines, scopes)
+    except Exception as e:
+        # The scope items received so far are dropped with the policy
+        if name is not None:
+            await run_in_threadpool(manager.delete_policy, name)
+        raise stream_error(e, number, f"scope.{scopes}") from e
+
+    if name is None:
+        raise HTTPException(status_code=400, detail="no policy found in request")
+    return {"detail": f"policy '{name}' was started with {scopes} scope items"}
+
+
+@app.post("/api/v1/policies/{policy_name}/run", status_code=202)
+def run_policy(policy_name: str, request: RunRequest | None = None):
+    """
+    Queue an immediate run of a policy, ahead of the scheduled runs.
+
+    Args:
+    ----
+        policy_name (str): The policy name.
+        request (RunRequest | None): The hostnames to run, all of them when omitted.
+
+    Returns:
+    -------
+        dict: The run ID and the URL to follow its progress.
+
+    """
+    if not manager.policy_exists(policy_name):
+        raise HTTPException(status_code=404, detail=f"policy '{policy_name}' not found")
+    hostnames = request.hostnames if request else None
+    try:
+        handle = manager.run_policy(policy_name, hostnames)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "detail": f"run of policy '{policy_name}' was queued for {len(handle.hosts)} scope items",
+        "id": handle.id,
+        "url": f"/api/v1/runs/{handle.id}",
+    }
+
+
+@app.get("/api/v1/runs/{run_id}")
+def read_run(run_id: str):
+    """
+    Report the progress of an on-demand run.
+
+    Args:
+    ----
+        run_id (str): The run ID.
+
+    Returns:
+    -------
+        dict: The run status, and the status of each of its scope items.
+
+    """
+    try:
+        return manager.get_run(run_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @app.delete("/api/v1/policies/{policy_name}", status_code=200)
 def delete_policy(policy_name: str):
     """
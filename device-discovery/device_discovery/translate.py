@@ -165,34 +165,36 @@ def translate_interface_ips(
 
     ip_entities = []
 
-    for if_ip_name, ip_info in interfaces_ip.items():
-        if interface.name == if_ip_name:
-            for ip_version, default_prefix in (("ipv4", 32), ("ipv6", 128)):
-                for ip, details in ip_info.get(ip_version, {}).items():
-                    ip_address = f"{ip}/{details.get('prefix_length', default_prefix)}"
-                    network = ipaddress.ip_network(ip_address, strict=False)
-                    ip_entities.append(
-                        Entity(
-                            prefix=Prefix(
-                                prefix=str(network),
-                                site=interface.device.site,
-                                tags=prefix_tags,
-                                comments=prefix_comments,
-                                description=prefix_description,
-                            )
-                        )
+    ip_info = interfaces_ip.get(interface.name)
+    if not ip_info:
+        return ip_entities
+
+    for ip_version, default_prefix in (("ipv4", 32), ("ipv6", 128)):
+        for ip, details in ip_info.get(ip_version, {}).items():
+            ip_address = f"{ip}/{details.get('prefix_length', default_prefix)}"
+            network = ipaddress.ip_network(ip_address, strict=False)
+            ip_entities.append(
+                Entity(
+                    prefix=Prefix(
+                        prefix=str(network),
+                        site=interface.device.site,
+                        tags=prefix_tags,
+                        comments=prefix_comments,
+                        description=prefix_description,
                     )
-                    ip_entities.append(
-                        Entity(
-                            ip_address=IPAddress(
-                                address=ip_address,
-                                interface=interface,
-                                tags=ip_tags,
-                                comments=ip_comments,
-                                description=ip_description,
-                            )
-                        )
+                )
+            )
+            ip_entities.append(
+                Entity(
+                    ip_address=IPAddress(
+                        address=ip_address,
+                        interface=interface,
+                        tags=ip_tags,
+                        comments=ip_comments,
+                        description=ip_description,
                     )
+                )
+            )
 
     return ip_entities
 
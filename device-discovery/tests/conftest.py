@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Test configuration."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_cache_dir(tmp_path_factory):
+    """Keep the on-disk caches out of the user's home directory."""
+    mp = pytest.MonkeyPatch()
+    mp.setenv("DEVICE_DISCOVERY_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+    yield
+    mp.undo()
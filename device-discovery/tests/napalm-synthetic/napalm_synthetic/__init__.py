@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Synthetic NAPALM driver namespace."""
+
+from napalm_synthetic.driver import SyntheticDriver
+
+__all__ = ["SyntheticDriver"]
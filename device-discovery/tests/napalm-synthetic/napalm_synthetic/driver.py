@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Synthetic NAPALM driver."""
+
+import random
+import threading
+import time
+from collections import defaultdict
+
+from napalm.base.base import NetworkDriver
+from napalm.base.exceptions import CommandErrorException, ConnectionException
+
+from napalm_synthetic import generate
+
+# Connection attempts per hostname, so that fault injection is reproducible for a
+# given seed without making the same host fail on every run.
+_attempts = defaultdict(int)
+_attempts_lock = threading.Lock()
+
+
+class SyntheticDriver(NetworkDriver):
+    """
+    NAPALM driver that fabricates deterministic devices.
+
+    Everything is configured through `optional_args`:
+
+    - `profile`: one of `generate.PROFILES` (default `access`), overridden key by key
+      by `ports`, `svis`, `subinterfaces`, `ipv4` and `ipv6`.
+    - `connect_latency` / `getter_latency`: seconds spent in `open()` and in each getter.
+    - `jitter`: maximum random seconds added to every latency.
+    - `failure_rate`: probability of `open()` raising `ConnectionException`.
+    - `getter_failure_rate`: probability of a getter raising `CommandErrorException`.
+    - `seed`: farm-wide seed; the generated data only depends on it and the hostname.
+    """
+
+    def __init__(self, hostname: str, username: str, password: str, timeout: int = 60, optional_args: dict | None = None):
+        """Initialize the driver."""
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        args = optional_args or {}
+        shape = dict(generate.PROFILES[args.get("profile", "access")])
+        shape.update({key: args[key] for key in shape if key in args})
+        self.shape = shape
+        self.seed = int(args.get("seed", 0))
+        self.connect_latency = float(args.get("connect_latency", 0.0))
+        self.getter_latency = float(args.get("getter_latency", 0.0))
+        self.jitter = float(args.get("jitter", 0.0))
+        self.failure_rate = float(args.get("failure_rate", 0.0))
+        self.getter_failure_rate = float(args.get("getter_failure_rate", 0.0))
+        self._names = None
+        self._connected = False
+        with _attempts_lock:
+            _attempts[hostname] += 1
+            attempt = _attempts[hostname]
+        self._faults = random.Random(generate.host_seed(f"{hostname}#{attempt}", self.seed))
+
+    def _wait(self, latency: float):
+        delay = latency + self._faults.random() * self.jitter
+        if delay > 0:
+            time.sleep(min(delay, self.timeout))
+
+    def _getter(self):
+        if not self._connected:
+            raise ConnectionException(f"{self.hostname}: not connected")
+        self._wait(self.getter_latency)
+        if self._faults.random() < self.getter_failure_rate:
+            raise CommandErrorException(f"{self.hostname}: injected getter failure")
+        if self._names is None:
+            self._names = generate.interface_names(self.shape["ports"], self.shape["svis"], self.shape["subinterfaces"])
+        return self._names
+
+    def open(self):
+        """Simulate connecting to the device."""
+        self._wait(self.connect_latency)
+        if self._faults.random() < self.failure_rate:
+            raise ConnectionException(f"{self.hostname}: injected connection failure")
+        self._connected = True
+
+    def close(self):
+        """Simulate disconnecting from the device."""
+        self._connected = False
+
+    def is_alive(self):
+        """Return the connection state."""
+        return {"is_alive": self._connected}
+
+    def get_facts(self):
+        """Return deterministic facts."""
+        names = self._getter()
+        return generate.facts(self.hostname, self.seed, names)
+
+    def get_interfaces(self):
+        """Return deterministic interfaces."""
+        names = self._getter()
+        return generate.interfaces(self.hostname, names, self.seed)
+
+    def get_interfaces_ip(self):
+        """Return deterministic interface addresses."""
+        names = self._getter()
+        return generate.interfaces_ip(self.hostname, names, self.shape["ipv4"], self.shape["ipv6"], self.seed)
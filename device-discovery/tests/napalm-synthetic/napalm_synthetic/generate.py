@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Deterministic NAPALM getter payloads."""
+
+import ipaddress
+import random
+import zlib
+
+MODELS = ["SYN-24P", "SYN-48P", "SYN-9000", "SYN-PE-X"]
+
+# Device shapes used by the load harness and the translate benchmarks.
+PROFILES = {
+    # Small access switch: 24 ports, a management SVI.
+    "access": {"ports": 24, "svis": 1, "subinterfaces": 0, "ipv4": True, "ipv6": False},
+    # 48-port switch terminating many VLANs.
+    "aggregation": {"ports": 48, "svis": 500, "subinterfaces": 0, "ipv4": True, "ipv6": True},
+    # PE router with 50k dual-stack subinterfaces.
+    "pe": {"ports": 8, "svis": 0, "subinterfaces": 50000, "ipv4": True, "ipv6": True},
+}
+
+_IPV4_BASE = int(ipaddress.IPv4Address("10.0.0.0"))
+
+
+def host_seed(hostname: str, seed: int = 0) -> int:
+    """
+    Return a seed that is stable across processes for the given hostname.
+
+    Args:
+    ----
+        hostname (str): Device hostname.
+        seed (int): Farm-wide seed.
+
+    Returns:
+    -------
+        int: The per-host seed.
+
+    """
+    return zlib.crc32(f"{seed}:{hostname}".encode())
+
+
+def interface_names(ports: int, svis: int, subinterfaces: int) -> list[str]:
+    """
+    Build the interface names of a device.
+
+    Args:
+    ----
+        ports (int): Physical ports.
+        svis (int): VLAN interfaces.
+        subinterfaces (int): Subinterfaces, spread over the physical ports.
+
+    Returns:
+    -------
+        list[str]: Physical ports first, then SVIs, then subinterfaces.
+
+    """
+    names = [f"Ethernet{i + 1}" for i in range(ports)]
+    names.extend(f"Vlan{i + 1}" for i in range(svis))
+    if ports:
+        names.extend(f"Ethernet{i % ports + 1}.{i // ports + 1}" for i in range(subinterfaces))
+    return names
+
+
+def facts(hostname: str, seed: int = 0, names: list[str] | None = None) -> dict:
+    """
+    Generate get_facts() output.
+
+    Args:
+    ----
+        hostname (str): Device hostname.
+        seed (int): Farm-wide seed.
+        names (list[str] | None): Interface names to report.
+
+    Returns:
+    -------
+        dict: NAPALM facts.
+
+    """
+    rng = random.Random(host_seed(hostname, seed))
+    return {
+        "hostname": hostname,
+        "fqdn": f"{hostname}.synthetic.local",
+        "vendor": "Synthetic",
+        "model": rng.choice(MODELS),
+        "serial_number": f"SYN{host_seed(hostname, seed):010d}",
+        "os_version": f"{rng.randint(1, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}",
+        "uptime": float(rng.randint(60, 10_000_000)),
+        "interface_list": list(names or []),
+    }
+
+
+def interfaces(hostname: str, names: list[str], seed: int = 0) -> dict:
+    """
+    Generate get_interfaces() output.
+
+    Args:
+    ----
+        hostname (str): Device hostname.
+        names (list[str]): Interface names.
+        seed (int): Farm-wide seed.
+
+    Returns:
+    -------
+        dict: NAPALM interfaces keyed by name.
+
+    """
+    base = host_seed(hostname, seed) & 0xFFFFFF
+    result = {}
+    for i, name in enumerate(names):
+        physical = "." not in name and not name.startswith("Vlan")
+        mac = (0x02 << 40) | (base << 16) | (i & 0xFFFF)
+        result[name] = {
+            "is_up": i % 7 != 0,
+            "is_enabled": i % 11 != 0,
+            "description": f"{hostname} {name}" if i % 3 == 0 else "",
+            "last_flapped": -1.0,
+            "speed": 10000.0 if physical else 0.0,
+            "mtu": 9214 if physical else 1500,
+            "mac_address": ":".join(f"{(mac >> shift) & 0xFF:02X}" for shift in range(40, -8, -8)),
+        }
+    return result
+
+
+def interfaces_ip(hostname: str, names: list[str], ipv4: bool = True, ipv6: bool = False, seed: int = 0) -> dict:
+    """
+    Generate get_interfaces_ip() output.
+
+    Every SVI and subinterface gets an address; physical ports only get one when the
+    device has neither.
+
+    Args:
+    ----
+        hostname (str): Device hostname.
+        names (list[str]): Interface names.
+        ipv4 (bool): Whether to generate IPv4 addresses.
+        ipv6 (bool): Whether to generate IPv6 addresses.
+        seed (int): Farm-wide seed.
+
+    Returns:
+    -------
+        dict: NAPALM interface addresses keyed by interface name.
+
+    """
+    host = host_seed(hostname, seed) & 0xFFFF
+    logical = [name for name in names if "." in name or name.startswith("Vlan")]
+    addressed = logical or names
+    result = {}
+    for k, name in enumerate(addressed):
+        entry = {}
+        if ipv4:
+            address = ipaddress.IPv4Address(_IPV4_BASE + ((host << 17) | (k << 1)) % (1 << 24))
+            entry["ipv4"] = {str(address): {"prefix_length": 31}}
+        if ipv6:
+            entry["ipv6"] = {f"2001:db8:{host:x}:{k:x}::1": {"prefix_length": 64}}
+        if entry:
+            result[name] = entry
+    return result
+
+
+def payload(hostname: str, profile: str | dict, seed: int = 0) -> dict:
+    """
+    Generate facts, interfaces and addresses for a device profile.
+
+    Args:
+    ----
+        hostname (str): Device hostname.
+        profile (str | dict): A PROFILES key, or a dict with the same keys.
+        seed (int): Farm-wide seed.
+
+    Returns:
+    -------
+        dict: `device`, `interface` and `interface_ip` keys, as collected by device-discovery.
+
+    """
+    shape = PROFILES[profile] if isinstance(profile, str) else profile
+    names = interface_names(shape["ports"], shape["svis"], shape["subinterfaces"])
+    return {
+        "device": facts(hostname, seed, names),
+        "interface": interfaces(hostname, names, seed),
+        "interface_ip": interfaces_ip(hostname, names, shape["ipv4"], shape["ipv6"], seed),
+    }
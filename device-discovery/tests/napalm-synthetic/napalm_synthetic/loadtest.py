@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Device discovery load harness using the synthetic driver."""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import threading
+import time
+
+from device_discovery.client import Client
+from device_discovery.policy.manager import PolicyManager
+from device_discovery.policy.models import Config, Defaults, Napalm, Policy
+from device_discovery.policy.runner import PolicyRunner
+
+
+def percentiles(values: list[float]) -> dict:
+    """
+    Compute the usual latency percentiles of a list of values.
+
+    Args:
+    ----
+        values (list[float]): The values, in seconds.
+
+    Returns:
+    -------
+        dict: p50, p90, p99 and max, rounded to microseconds.
+
+    """
+    values = sorted(values)
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    if len(values) == 1:
+        return {key: round(values[0], 6) for key in ("p50", "p90", "p99", "max")}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49], 6),
+        "p90": round(cuts[89], 6),
+        "p99": round(cuts[98], 6),
+        "max": round(values[-1], 6),
+    }
+
+
+def current_rss() -> int:
+    """Return the current resident set size in bytes, or 0 when unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class Sampler(threading.Thread):
+    """Background thread tracking peak thread count and RSS."""
+
+    def __init__(self, interval: float = 0.1):
+        """Initialize the sampler."""
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self.peak_rss = current_rss()
+        self._stopped = threading.Event()
+
+    def run(self):
+        """Sample until stopped."""
+        while not self._stopped.wait(self.interval):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def stop(self):
+        """Stop sampling."""
+        self._stopped.set()
+        self.join()
+
+
+class RunRecorder:
+    """Wraps PolicyRunner.run to time every host collection."""
+
+    def __init__(self):
+        """Initialize the recorder."""
+        self.durations = []
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._original = PolicyRunner.run
+
+    def install(self):
+        """Patch PolicyRunner.run."""
+        recorder = self
+        original = self._original
+
+        def run(runner, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(runner, *args, **kwargs)
+            finally:
+                with recorder._done:
+                    recorder.durations.append(time.perf_counter() - start)
+                    recorder._done.notify_all()
+
+        PolicyRunner.run = run
+
+    def uninstall(self):
+        """Restore PolicyRunner.run."""
+        PolicyRunner.run = self._original
+
+    def wait(self, count: int, timeout: float) -> bool:
+        """Wait until `count` runs have finished."""
+        with self._done:
+            return self._done.wait_for(lambda: len(self.durations) >= count, timeout)
+
+
+def build_policies(args: argparse.Namespace) -> dict[str, Policy]:
+    """Spread the synthetic hosts over the requested number of policies."""
+    optional_args = {
+        "profile": args.profile,
+        "connect_latency": args.connect_latency,
+        "getter_latency": args.getter_latency,
+        "jitter": args.jitter,
+        "failure_rate": args.failure_rate,
+        "getter_failure_rate": args.getter_failure_rate,
+        "seed": args.seed,
+    }
+    config = Config(defaults=Defaults(site="synthetic"))
+    if args.schedule:
+        config.schedule = args.schedule
+    policies = {}
+    for p in range(args.policies):
+        scope = [
+            Napalm(
+                driver="synthetic",
+                hostname=f"synthetic-{h:06d}",
+                username="synthetic",
+                password="synthetic",
+                optional_args=optional_args,
+            )
+            for h in range(p, args.hosts, args.policies)
+        ]
+        policies[f"load_{p}"] = Policy(config=config.model_copy(deep=True), scope=scope)
+    return policies
+
+
+def main():
+    """Run the load harness and print a JSON report."""
+    parser = argparse.ArgumentParser(description="Device discovery load harness")
+    parser.add_argument("-n", "--hosts", default=1000, help="Synthetic hosts", type=int)
+    parser.add_argument("-p", "--policies", default=10, help="Policies the hosts are spread over", type=int)
+    parser.add_argument("--profile", default="access", help="Device profile (access, aggregation, pe)", type=str)
+    parser.add_argument("--connect-latency", default=0.05, help="Seconds spent connecting", type=float)
+    parser.add_argument("--getter-latency", default=0.02, help="Seconds spent in each getter", type=float)
+    parser.add_argument("--jitter", default=0.01, help="Random extra latency (s)", type=float)
+    parser.add_argument("--failure-rate", default=0.0, help="Connection failure probability", type=float)
+    parser.add_argument("--getter-failure-rate", default=0.0, help="Getter failure probability", type=float)
+    parser.add_argument("--seed", default=0, help="Farm seed", type=int)
+    parser.add_argument("--schedule", default=None, help="Cron schedule, one-time run when omitted", type=str)
+    parser.add_argument("-t", "--diode-target", default=None, help="Diode target, an in-process stand-in when omitted", type=str)
+    parser.add_argument("--timeout", default=600.0, help="Maximum seconds to wait for the runs", type=float)
+    args = parser.parse_args()
+
+    stub = None
+    target = args.diode_target
+    if target is None:
+        from diode_stub import serve
+
+        server, port, stub = serve()
+        target = f"grpc://127.0.0.1:{port}"
+    Client().init_client(prefix="load", target=target, api_key="load")
+
+    policies = build_policies(args)
+    recorder = RunRecorder()
+    recorder.install()
+    sampler = Sampler()
+    sampler.start()
+    manager = PolicyManager()
+
+    start = time.perf_counter()
+    try:
+        for name, policy in policies.items():
+            manager.start_policy(name, policy)
+        completed = recorder.wait(args.hosts, args.timeout)
+        elapsed = time.perf_counter() - start
+    finally:
+        manager.stop()
+        sampler.stop()
+        recorder.uninstall()
+
+    report = {
+        "hosts": args.hosts,
+        "policies": args.policies,
+        "profile": args.profile,
+        "completed": completed,
+        "runs": len(recorder.durations),
+        "wall_seconds": round(elapsed, 6),
+        "hosts_per_second": round(len(recorder.durations) / elapsed, 1) if elapsed else 0.0,
+        "run_latency_seconds": percentiles(recorder.durations),
+        "peak_threads": sampler.peak_threads,
+        "peak_rss_bytes": sampler.peak_rss,
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+    if stub is not None:
+        stats = stub.stats.snapshot()
+        report["ingested_hosts"] = stats["requests"]
+        report["entities"] = stats["entities"]
+        report["entities_per_second"] = round(stats["entities"] / elapsed, 1) if elapsed else 0.0
+        server.stop(grace=1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
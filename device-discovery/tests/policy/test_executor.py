@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Instrumented Executor Unit Tests."""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from device_discovery.metrics import (
+    EXECUTOR_MAX_WORKERS,
+    EXECUTOR_QUEUED,
+    EXECUTOR_RUNNING,
+    LATE_RUNS,
+    SCHEDULER_LAG,
+)
+from device_discovery.policy.executor import (
+    DEFAULT_LATE_THRESHOLD,
+    InstrumentedThreadPoolExecutor,
+    set_late_threshold,
+)
+from device_discovery.policy.pool import PriorityPool
+
+
+def sample(metric, name, policy):
+    """Read a sample of a metric for the given policy."""
+    for collected in metric.collect():
+        for s in collected.samples:
+            if s.name == name and s.labels.get("policy") == policy:
+                return s.value
+    return None
+
+
+def wait_removed(scheduler, job, timeout: float = 5.0) -> bool:
+    """Wait for the scheduler to remove a finished one-time job, before shutting it down."""
+    for _ in range(int(timeout / 0.01)):
+        if scheduler.get_job(job.id) is None:
+            return True
+        threading.Event().wait(0.01)
+    return False
+
+
+def test_executor_records_lag_and_saturation():
+    """Test that a job run through the executor is measured."""
+    executor = InstrumentedThreadPoolExecutor(max_workers=2, policy="executor_test")
+    scheduler = BackgroundScheduler(executors={"default": executor})
+    done = threading.Event()
+    running = []
+
+    def job():
+        running.append(sample(EXECUTOR_RUNNING, "device_discovery_executor_running_jobs", "executor_test"))
+        done.set()
+
+    scheduler.start()
+    try:
+        scheduler.add_job(job, "date", run_date=datetime.now(timezone.utc) + timedelta(milliseconds=10))
+        assert done.wait(5)
+    finally:
+        scheduler.shutdown()
+
+    assert sample(EXECUTOR_MAX_WORKERS, "device_discovery_executor_max_workers", "executor_test") == 2
+    assert running == [1]
+    assert sample(EXECUTOR_RUNNING, "device_discovery_executor_running_jobs", "executor_test") == 0
+    assert sample(EXECUTOR_QUEUED, "device_discovery_executor_queued_jobs", "executor_test") == 0
+    assert sample(SCHEDULER_LAG, "device_discovery_scheduler_lag_seconds_count", "executor_test") == 1
+
+
+def test_executor_reports_job_errors():
+    """Test that a failing job is reported to the scheduler and does not leak a running slot."""
+    executor = InstrumentedThreadPoolExecutor(max_workers=1, policy="executor_error")
+    scheduler = BackgroundScheduler(executors={"default": executor})
+    errors = []
+    scheduler.add_listener(lambda event: errors.append(event.exception), mask=EVENT_JOB_ERROR)
+
+    def job():
+        raise RuntimeError("boom")
+
+    scheduler.start()
+    try:
+        scheduler.add_job(job, "date", run_date=datetime.now(timezone.utc))
+        for _ in range(50):
+            if errors:
+                break
+            threading.Event().wait(0.1)
+    finally:
+        scheduler.shutdown()
+
+    assert len(errors) == 1
+    assert sample(EXECUTOR_RUNNING, "device_discovery_executor_running_jobs", "executor_error") == 0
+
+
+def test_executor_counts_late_runs(caplog):
+    """Test that runs starting after the late threshold are counted and logged."""
+    executor = InstrumentedThreadPoolExecutor(max_workers=1, policy="executor_late")
+    scheduler = BackgroundScheduler(executors={"default": executor})
+    done = threading.Event()
+
+    scheduler.start()
+    try:
+        set_late_threshold(0.5)
+        scheduler.add_job(
+            done.set,
+            "date",
+            run_date=datetime.now(timezone.utc) - timedelta(seconds=2),
+            misfire_grace_time=60,
+        )
+        scheduler.add_job(done.set, "date", run_date=datetime.now(timezone.utc))
+        assert done.wait(5)
+        for _ in range(50):
+            if sample(SCHEDULER_LAG, "device_discovery_scheduler_lag_seconds_count", "executor_late") == 2:
+                break
+            threading.Event().wait(0.1)
+    finally:
+        set_late_threshold(DEFAULT_LATE_THRESHOLD)
+        scheduler.shutdown()
+
+    assert sample(LATE_RUNS, "device_discovery_late_runs_total", "executor_late") == 1
+    assert "started 2." in caplog.text
+
+
+def test_executor_does_not_count_missed_runs(caplog):
+    """Test that a run dropped past its misfire grace time is not counted as late."""
+    executor = InstrumentedThreadPoolExecutor(max_workers=1, policy="executor_missed")
+    scheduler = BackgroundScheduler(executors={"default": executor})
+    missed = threading.Event()
+    scheduler.add_listener(lambda event: missed.set(), mask=EVENT_JOB_MISSED)
+
+    scheduler.start()
+    try:
+        set_late_threshold(0.5)
+        scheduler.add_job(
+            missed.set,
+            "date",
+            run_date=datetime.now(timezone.utc) - timedelta(seconds=2),
+            misfire_grace_time=1,
+        )
+        assert missed.wait(5)
+    finally:
+        set_late_threshold(DEFAULT_LATE_THRESHOLD)
+        scheduler.shutdown()
+
+    assert sample(SCHEDULER_LAG, "device_discovery_scheduler_lag_seconds_count", "executor_missed") is None
+    assert sample(LATE_RUNS, "device_discovery_late_runs_total", "executor_missed") is None
+    assert "started 2." not in caplog.text
+
+
+def test_executor_uses_shared_pool():
+    """Test that jobs run in a shared pool, which outlives the scheduler."""
+    pool = PriorityPool(max_workers=3)
+    executor = InstrumentedThreadPoolExecutor(policy="executor_shared", pool=pool)
+    scheduler = BackgroundScheduler(executors={"default": executor})
+    threads = []
+    done = threading.Event()
+
+    def job():
+        threads.append(threading.current_thread().name)
+        done.set()
+
+    scheduler.start()
+    try:
+        added = scheduler.add_job(job, "date", run_date=datetime.now(timezone.utc))
+        assert done.wait(5)
+        assert wait_removed(scheduler, added)
+    finally:
+        scheduler.shutdown()
+
+    try:
+        assert threads == ["discovery-worker-0"]
+        assert sample(EXECUTOR_MAX_WORKERS, "device_discovery_executor_max_workers", "executor_shared") == 3
+        assert pool.submit(len, "abc").result(timeout=5) == 3
+    finally:
+        pool.shutdown()
@@ -48,6 +48,187 @@ def test_start_policy(policy_manager, sample_policy):
         assert "policy1" in policy_manager.runners
 
 
+def test_start_policy_prewarms_drivers(policy_manager):
+    """Test that starting a policy pre-imports set and previously discovered drivers."""
+    policy = Policy(
+        config={"defaults": {"site": "New York"}},
+        scope=[
+            {"driver": "ios", "hostname": "router1", "username": "a", "password": "b"},
+            {"hostname": "router2", "username": "a", "password": "b"},
+            {"hostname": "router3", "username": "a", "password": "b"},
+        ],
+    )
+    with (
+        patch("device_discovery.policy.manager.PolicyRunner"),
+        patch(
+            "device_discovery.policy.manager.get_discovered_driver",
+            side_effect=lambda hostname: "eos" if hostname == "router2" else None,
+        ),
+        patch.object(policy_manager.prewarmer, "prewarm") as mock_prewarm,
+    ):
+        policy_manager.start_policy("policy1", policy)
+
+    mock_prewarm.assert_called_once_with({"ios", "eos"})
+
+
+def test_add_scope(policy_manager, sample_policy):
+    """Test adding a scope item to a started policy."""
+    with pytest.raises(ValueError, match="policy 'policy1' not found"):
+        policy_manager.add_scope("policy1", sample_policy.scope[0])
+
+    mock_runner = MagicMock()
+    policy_manager.runners["policy1"] = mock_runner
+    with patch.object(policy_manager.prewarmer, "prewarm") as mock_prewarm:
+        policy_manager.add_scope("policy1", sample_policy.scope[0])
+
+    mock_runner.add_scope.assert_called_once_with(sample_policy.scope[0])
+    mock_prewarm.assert_called_once_with({"ios"})
+
+
+def test_add_scopes_saves_them_together(policy_manager, sample_policy):
+    """Test that scope items added together are saved in a single store write."""
+    mock_runner = MagicMock()
+    mock_runner.add_scope.side_effect = [1, 2]
+    policy_manager.runners["policy1"] = mock_runner
+    policy_manager.store = MagicMock()
+    scopes = [sample_policy.scope[0], sample_policy.scope[0].model_copy(update={"hostname": "r2"})]
+
+    with patch.object(policy_manager.prewarmer, "prewarm"):
+        assert policy_manager.add_scopes("policy1", iter(scopes)) == 2
+
+    policy_manager.store.save_scopes.assert_called_once_with(mock_runner, [1, 2])
+
+
+def test_upsert_policy(policy_manager, sample_policy):
+    """Test that upserting starts, skips or updates a policy."""
+    with patch("device_discovery.policy.manager.PolicyRunner") as MockPolicyRunner:
+        mock_runner = MockPolicyRunner.return_value
+        assert policy_manager.upsert_policy("policy1", sample_policy) == {"status": "started"}
+
+        mock_runner.matches.return_value = True
+        assert policy_manager.upsert_policy("policy1", sample_policy) == {"status": "unchanged"}
+        mock_runner.update.assert_not_called()
+
+        mock_runner.matches.return_value = False
+        mock_runner.update.return_value = {"added": 0, "removed": 0, "updated": 1, "rescheduled": False}
+        assert policy_manager.upsert_policy("policy1", sample_policy) == {
+            "status": "updated",
+            "added": 0,
+            "removed": 0,
+            "updated": 1,
+            "rescheduled": False,
+        }
+        mock_runner.setup.assert_called_once()
+
+
+def test_upsert_policies_applies_none_on_invalid_policy(policy_manager, sample_policy):
+    """Test that a failing policy leaves the others of the same request unapplied."""
+    with patch("device_discovery.policy.manager.PolicyRunner") as MockPolicyRunner:
+        MockPolicyRunner.side_effect = lambda: MagicMock()
+        policy_manager.start_policy("policy1", sample_policy)
+        running = policy_manager.runners["policy1"]
+        running.matches.return_value = False
+        running.validate.side_effect = ValueError("unsupported driver")
+
+        with pytest.raises(ValueError, match="unsupported driver"):
+            policy_manager.upsert_policies({"policy0": sample_policy, "policy1": sample_policy})
+
+    assert policy_manager.policy_names == ["policy1"]
+    running.update.assert_not_called()
+
+
+def test_upsert_policies_reverts_applied_updates(policy_manager, sample_policy):
+    """Test that updates applied before a failing one are reverted."""
+    with patch("device_discovery.policy.manager.PolicyRunner") as MockPolicyRunner:
+        MockPolicyRunner.side_effect = lambda: MagicMock()
+        for name in ("policy1", "policy2"):
+            policy_manager.start_policy(name, sample_policy)
+            policy_manager.runners[name].matches.return_value = False
+        first = policy_manager.runners["policy1"]
+        first.snapshot.return_value = ("config", [], [])
+        first.update.return_value = {}
+        policy_manager.runners["policy2"].update.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            policy_manager.upsert_policies(
+                {"policy3": sample_policy, "policy1": sample_policy, "policy2": sample_policy}
+            )
+
+    assert policy_manager.policy_names == ["policy1", "policy2"]
+    assert first.update.call_args_list[-1].args == ("config", [], [])
+
+
+def test_list_policies(policy_manager, sample_policy):
+    """Test listing policies one page at a time."""
+    with patch("device_discovery.policy.manager.PolicyRunner") as MockPolicyRunner:
+        MockPolicyRunner.side_effect = lambda: MagicMock()
+        for name in ("c", "a", "b"):
+            policy_manager.start_policy(name, sample_policy)
+            policy_manager.runners[name].summary.return_value = {"name": name}
+
+    page = policy_manager.list_policies(limit=2)
+    assert page == {"policies": [{"name": "a"}, {"name": "b"}], "next_cursor": "b"}
+    page = policy_manager.list_policies(cursor="b", limit=2)
+    assert page == {"policies": [{"name": "c"}], "next_cursor": None}
+
+    policy_manager.delete_policy("b")
+    assert policy_manager.policy_names == ["a", "c"]
+
+
+def test_get_policy(policy_manager):
+    """Test describing a policy."""
+    with pytest.raises(ValueError, match="policy 'policy1' not found"):
+        policy_manager.get_policy("policy1")
+
+    mock_runner = MagicMock()
+    mock_runner.summary.return_value = {"name": "policy1"}
+    mock_runner.hosts.return_value = ([{"id": 1}], None)
+    policy_manager.runners["policy1"] = mock_runner
+    assert policy_manager.get_policy("policy1", cursor=None, limit=10) == {
+        "name": "policy1",
+        "hosts": [{"id": 1}],
+        "next_cursor": None,
+    }
+    mock_runner.hosts.assert_called_once_with(None, 10)
+
+
+def test_top_hosts(policy_manager):
+    """Test that the worst scope items of all policies are merged."""
+    for name, scores in (("policy1", [9.0, 2.0]), ("policy2", [5.0, 1.0])):
+        mock_runner = MagicMock()
+        mock_runner.top.return_value = [(score, {"policy": name, "score": score}) for score in scores]
+        policy_manager.runners[name] = mock_runner
+    hosts = policy_manager.top_hosts("slowest", 3)
+    assert [(h["policy"], h["score"]) for h in hosts] == [
+        ("policy1", 9.0),
+        ("policy2", 5.0),
+        ("policy1", 2.0),
+    ]
+    policy_manager.runners["policy1"].top.assert_called_once_with("slowest", 3)
+
+    with pytest.raises(ValueError, match="policy 'policy3' not found"):
+        policy_manager.get_host("policy3", 1)
+    policy_manager.runners["policy1"].host.return_value = {"id": 1}
+    assert policy_manager.get_host("policy1", 1) == {"id": 1}
+
+
+def test_run_policy(policy_manager):
+    """Test queueing an immediate run and following its progress."""
+    with pytest.raises(ValueError, match="policy 'policy1' not found"):
+        policy_manager.run_policy("policy1")
+
+    mock_runner = MagicMock()
+    mock_runner.run_now.return_value.id = "abc"
+    mock_runner.run_now.return_value.progress.return_value = {"id": "abc"}
+    policy_manager.runners["policy1"] = mock_runner
+    handle = policy_manager.run_policy("policy1", ["router1"])
+    mock_runner.run_now.assert_called_once_with(["router1"])
+    assert policy_manager.get_run(handle.id) == {"id": "abc"}
+
+    with pytest.raises(ValueError, match="run 'unknown' not found"):
+        policy_manager.get_run("unknown")
+
+
 def test_start_existing_policy_raises_error(policy_manager, sample_policy):
     """Test that starting an already existing policy raises an error."""
     policy_manager.runners["policy1"] = MagicMock()
@@ -101,6 +282,60 @@ def test_parse_policy_invalid_cron(policy_manager):
     assert exc_info.match("Invalid cron schedule format.")
 
 
+def test_parse_policy_resolves_env_vars(policy_manager, monkeypatch):
+    """Test that ${VAR} values are resolved from the environment, in YAML and JSON."""
+    monkeypatch.setenv("ROUTER_PASSWORD", "secret")
+    config_data = b"""
+    policies:
+      policy1:
+        config:
+          defaults:
+            site: "${UNSET_SITE_VARIABLE}"
+        scope:
+          - hostname: "router1"
+            username: "admin"
+            password: "${ROUTER_PASSWORD}"
+    """
+    policy = policy_manager.parse_policy(config_data).policies["policy1"]
+    assert policy.scope[0].password == "secret"
+    assert policy.config.defaults.site == "${UNSET_SITE_VARIABLE}"
+
+    config_data = b"""{"policies": {"policy1": {"scope": [
+        {"hostname": "router1", "username": "admin", "password": "${ROUTER_PASSWORD}"}
+    ]}}}"""
+    policy = policy_manager.parse_policy(config_data, "application/json").policies["policy1"]
+    assert policy.scope[0].password == "secret"
+
+
+def test_parse_policy_keeps_env_var_keys(policy_manager, monkeypatch):
+    """Test that ${VAR} mapping keys are left as written."""
+    monkeypatch.setenv("ROUTER_PASSWORD", "secret")
+    config_data = b"""
+    policies:
+      policy1:
+        scope:
+          - hostname: "router1"
+            username: "admin"
+            password: "${ROUTER_PASSWORD}"
+            optional_args:
+              ${ROUTER_PASSWORD}: "${ROUTER_PASSWORD}"
+    """
+    policy = policy_manager.parse_policy(config_data).policies["policy1"]
+    assert policy.scope[0].optional_args == {"${ROUTER_PASSWORD}": "secret"}
+
+
+def test_parse_policy_json(policy_manager):
+    """Test parsing JSON configuration into a PolicyRequest object."""
+    config_data = b"""{"policies": {"policy1": {
+        "config": {"schedule": "0 * * * *", "defaults": {"site": "New York"}},
+        "scope": [{"driver": "ios", "hostname": "router1", "username": "admin", "password": "password"}]
+    }}}"""
+    policy_request = policy_manager.parse_policy(config_data, "application/json")
+
+    assert isinstance(policy_request, PolicyRequest)
+    assert policy_request.policies["policy1"].scope[0].hostname == "router1"
+
+
 def test_policy_exists(policy_manager):
     """Test checking if a policy exists."""
     policy_manager.runners["policy1"] = MagicMock()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Priority Pool Unit Tests."""
+
+import threading
+
+import pytest
+
+from device_discovery.policy.pool import HIGH, ROUTINE, PriorityPool
+
+
+def test_pool_runs_high_priority_first():
+    """Test that queued high priority tasks go ahead of routine ones."""
+    pool = PriorityPool(max_workers=1)
+    release = threading.Event()
+    order = []
+    try:
+        blocker = pool.submit(release.wait)
+        routine = [pool.submit(order.append, f"routine{i}", priority=ROUTINE) for i in range(2)]
+        high = pool.submit(order.append, "high", priority=HIGH)
+        assert pool.queued() == 3
+        release.set()
+        for future in [blocker, *routine, high]:
+            future.result(timeout=5)
+    finally:
+        pool.shutdown()
+    assert order == ["high", "routine0", "routine1"]
+
+
+def test_pool_never_exceeds_max_workers():
+    """Test that the number of concurrent tasks is bounded."""
+    pool = PriorityPool(max_workers=2)
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def task():
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        threading.Event().wait(0.01)
+        with lock:
+            running[0] -= 1
+
+    try:
+        futures = [pool.submit(task, priority=i % 2) for i in range(10)]
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        pool.shutdown()
+    assert running[1] <= 2
+    assert len(pool._threads) == 2
+
+
+def test_pool_reports_exceptions():
+    """Test that task exceptions are set on their future."""
+    pool = PriorityPool(max_workers=1)
+    try:
+        future = pool.submit(int, "not a number")
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+    finally:
+        pool.shutdown()
+    with pytest.raises(RuntimeError):
+        pool.submit(int, "1")
+
+
+def test_pool_invalid_size():
+    """Test that a pool needs at least one thread."""
+    with pytest.raises(ValueError, match="max_workers must be greater than 0"):
+        PriorityPool(max_workers=0)
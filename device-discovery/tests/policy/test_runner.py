@@ -2,13 +2,18 @@
 # Copyright 2024 NetBox Labs Inc
 """NetBox Labs - Policy Manager Unit Tests."""
 
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 from apscheduler.triggers.date import DateTrigger
+from prometheus_client import REGISTRY
 
 from device_discovery.policy.models import Config, Defaults, Napalm, Status
+from device_discovery.policy.pool import PriorityPool
 from device_discovery.policy.runner import PolicyRunner
+from device_discovery.policy.scopes import scope_fingerprint
 
 
 @pytest.fixture
@@ -69,7 +74,7 @@ def test_setup_policy_runner_with_one_time_run(policy_runner, sample_scopes):
 def test_setup_with_unsupported_driver_raises_error(policy_runner, sample_scopes):
     """Test setup raises error if driver is unsupported."""
     sample_scopes[0].driver = "unsupported_driver"
-    with patch("device_discovery.policy.runner.supported_drivers", ["ios"]), pytest.raises(
+    with patch("device_discovery.policy.runner.get_supported_drivers", return_value=["ios"]), pytest.raises(
         Exception, match="specified driver 'unsupported_driver' was not found"
     ):
         policy_runner.setup("policy1", Config(), sample_scopes)
@@ -95,12 +100,15 @@ def test_run_device_with_discovered_driver(policy_runner, sample_scopes, sample_
         mock_driver_instance.get_facts.return_value = {"model": "SampleModel"}
         mock_driver_instance.get_interfaces.return_value = {"eth0": "up"}
         mock_driver_instance.get_interfaces_ip.return_value = {"eth0": "192.168.1.1"}
+        mock_ingest.return_value = (3, [])
 
         # Run the device with the setup runner
-        policy_runner.run("test_id", sample_scopes[0], sample_config)
+        policy_runner.config = sample_config
+        policy_runner.run(policy_runner.scopes.add(sample_scopes[0]))
 
         # Verify driver discovery and ingestion
-        mock_discover.assert_called_once_with(sample_scopes[0])
+        mock_discover.assert_called_once()
+        assert mock_discover.call_args[0][0].hostname == "router1"
         mock_ingest.assert_called_once()
         data = mock_ingest.call_args[0][1]
         assert data["driver"] == "ios"
@@ -119,7 +127,8 @@ def test_run_discovered_driver_error(policy_runner, sample_scopes, sample_config
     ) as mock_logger_error:
 
         # Run the device with an error to check error handling
-        policy_runner.run("test_id", sample_scopes[0], sample_config)
+        policy_runner.config = sample_config
+        policy_runner.run(policy_runner.scopes.add(sample_scopes[0]))
 
         mock_discover.assert_called_once()
         assert mock_logger_error.call_count == 2
@@ -134,7 +143,8 @@ def test_run_device_with_error_in_job(policy_runner, sample_scopes, sample_confi
     ), patch("device_discovery.policy.runner.logger.error") as mock_logger_error:
 
         # Run the device with an error to check error handling
-        policy_runner.run("test_id", sample_scopes[0], sample_config)
+        policy_runner.config = sample_config
+        policy_runner.run(policy_runner.scopes.add(sample_scopes[0]))
         mock_logger_error.assert_called_once()
 
 
@@ -146,3 +156,262 @@ def test_stop_policy_runner(policy_runner):
         # Ensure scheduler shutdown is called and status is updated
         mock_shutdown.assert_called_once()
         assert policy_runner.status == Status.FINISHED
+
+
+def test_run_device_error_is_counted(policy_runner, sample_scopes, sample_config):
+    """Test that a collection error is counted by stage and type."""
+    policy_runner.name = "metrics_policy"
+    labels = {"policy": "metrics_policy", "stage": "collection", "type": "TimeoutError"}
+    before = REGISTRY.get_sample_value("device_discovery_errors_total", labels) or 0
+    with patch(
+        "device_discovery.policy.runner.get_network_driver",
+        side_effect=TimeoutError("timed out"),
+    ):
+        policy_runner.config = sample_config
+        policy_runner.run(policy_runner.scopes.add(sample_scopes[0]))
+
+    assert REGISTRY.get_sample_value("device_discovery_errors_total", labels) == before + 1
+
+
+def test_update_only_touches_changed_scopes(policy_runner, sample_config):
+    """Test that updating a policy keeps unchanged jobs and discovered drivers."""
+    scopes = [
+        Napalm(hostname="router1", username="admin", password="password"),
+        Napalm(hostname="router2", username="admin", password="password"),
+        Napalm(hostname="router3", username="admin", password="password"),
+    ]
+    with patch("device_discovery.policy.runner.get_supported_drivers", return_value=["ios"]):
+        policy_runner.setup("policy1", sample_config, scopes)
+    try:
+        ids = {policy_runner.scopes.get(id).hostname: id for id in policy_runner.scopes}
+        policy_runner.scopes.get(ids["router2"]).driver = "ios"  # discovered
+
+        new_scopes = [
+            Napalm(hostname="router1", username="admin", password="password"),
+            Napalm(hostname="router2", username="admin", password="changed"),
+            Napalm(hostname="router4", username="admin", password="password"),
+        ]
+        fingerprints = [scope_fingerprint(scope) for scope in new_scopes]
+        assert not policy_runner.matches(sample_config, fingerprints)
+
+        changes = policy_runner.update(sample_config, new_scopes, fingerprints)
+
+        assert changes == {"added": 1, "removed": 1, "updated": 1, "rescheduled": False}
+        assert policy_runner.matches(sample_config, fingerprints)
+        hostnames = {policy_runner.scopes.get(id).hostname: id for id in policy_runner.scopes}
+        assert hostnames["router1"] == ids["router1"]
+        assert hostnames["router2"] == ids["router2"]
+        router2 = policy_runner.scopes.get(ids["router2"])
+        assert (router2.password, router2.driver) == ("changed", "ios")
+        assert policy_runner.scheduler.get_job(str(ids["router3"])) is None
+        assert {job.id for job in policy_runner.scheduler.get_jobs()} == {
+            str(id) for id in hostnames.values()
+        }
+    finally:
+        policy_runner.stop()
+
+
+def test_update_reschedules_on_schedule_change(policy_runner, sample_config, sample_scopes):
+    """Test that changing the schedule reschedules every job."""
+    with patch("device_discovery.policy.runner.get_supported_drivers", return_value=["ios"]):
+        policy_runner.setup("policy1", sample_config, sample_scopes)
+    try:
+        fingerprints = [scope_fingerprint(scope) for scope in sample_scopes]
+        new_config = Config(schedule="30 2 * * *", defaults=Defaults(site="New York"))
+
+        changes = policy_runner.update(new_config, sample_scopes, fingerprints)
+
+        assert changes == {"added": 0, "removed": 0, "updated": 0, "rescheduled": True}
+        (job,) = policy_runner.scheduler.get_jobs()
+        assert job.next_run_time.hour == 2
+        assert job.next_run_time.minute == 30
+    finally:
+        policy_runner.stop()
+
+
+def test_snapshot_restores_updated_policy(policy_runner, sample_config, sample_scopes):
+    """Test that an update is reverted by applying the snapshot taken before it."""
+    with patch("device_discovery.policy.runner.get_supported_drivers", return_value=["ios"]):
+        policy_runner.setup("policy1", sample_config, sample_scopes)
+        try:
+            snapshot = policy_runner.snapshot()
+            new_config = Config(schedule="30 2 * * *", defaults=Defaults(site="New York"))
+            new_scopes = [sample_scopes[0].model_copy(update={"password": "changed"})]
+            with pytest.raises(ValueError):
+                policy_runner.validate(Config(schedule="not a cron"), new_scopes)
+            policy_runner.validate(new_config, new_scopes)
+            policy_runner.update(
+                new_config, new_scopes, [scope_fingerprint(scope) for scope in new_scopes]
+            )
+
+            policy_runner.update(*snapshot)
+
+            assert policy_runner.matches(sample_config, snapshot[2])
+            (id,) = policy_runner.scopes
+            assert policy_runner.scopes.get(id).password == "password"
+        finally:
+            policy_runner.stop()
+
+
+def test_run_state_is_recorded(policy_runner, sample_scopes, sample_config):
+    """Test that the outcome of each run is kept per host and summarized."""
+    policy_runner.name = "policy1"
+    policy_runner.config = sample_config
+    ok = policy_runner.scopes.add(sample_scopes[0])
+    failing = policy_runner.scopes.add(
+        Napalm(driver="ios", hostname="router2", username="admin", password="password")
+    )
+    with patch("device_discovery.policy.runner.get_network_driver"), patch(
+        "device_discovery.client.Client.ingest", return_value=(5, [])
+    ):
+        policy_runner.run(ok)
+    with patch(
+        "device_discovery.policy.runner.get_network_driver",
+        side_effect=Exception("Connection error"),
+    ):
+        policy_runner.run(failing)
+        policy_runner.run(failing)
+
+    summary = policy_runner.summary()
+    assert (summary["scopes"], summary["runs"], summary["failing"]) == (2, 3, 1)
+    assert summary["schedule"] == "0 * * * *"
+
+    hosts, next_cursor = policy_runner.hosts(None, 1)
+    assert next_cursor == ok
+    assert hosts[0]["hostname"] == "router1"
+    assert (hosts[0]["entities"], hosts[0]["last_error"], hosts[0]["driver"]) == (5, None, "ios")
+    assert hosts[0]["last_run"] is not None
+
+    hosts, next_cursor = policy_runner.hosts(ok, 1)
+    assert next_cursor is None
+    assert (hosts[0]["hostname"], hosts[0]["last_error"]) == ("router2", "Connection error")
+
+    policy_runner.forget_scope(failing)
+    assert policy_runner.summary()["failing"] == 0
+
+
+def test_run_now(policy_runner, sample_scopes):
+    """Test that an immediate run is queued for the matching scope items."""
+    policy_runner.name = "policy1"
+    first = policy_runner.scopes.add(sample_scopes[0])
+    second = policy_runner.scopes.add(
+        Napalm(driver="ios", hostname="router2", username="admin", password="password")
+    )
+    with patch.object(policy_runner, "run", side_effect=[None, "Connection error"]) as mock_run:
+        handle = policy_runner.run_now()
+        for _, future in handle.hosts:
+            future.result(timeout=5)
+    assert sorted(call.args[0] for call in mock_run.call_args_list) == [first, second]
+
+    progress = handle.progress()
+    assert (progress["policy"], progress["status"]) == ("policy1", "completed")
+    assert (progress["succeeded"], progress["failed"]) == (1, 1)
+    assert {host["error"] for host in progress["hosts"]} == {None, "Connection error"}
+
+    with patch.object(policy_runner, "run", return_value=None):
+        handle = policy_runner.run_now(["router2", "unknown"])
+        handle.hosts[0][1].result(timeout=5)
+    assert [hostname for hostname, _ in handle.hosts] == ["router2"]
+
+    with pytest.raises(ValueError, match="policy 'policy1' has no matching scope item"):
+        policy_runner.run_now(["unknown"])
+
+
+def test_run_now_skips_running_scope_items(policy_runner, sample_scopes, sample_config):
+    """Test that a scope item already running is not run again on demand."""
+    policy_runner.name = "policy1"
+    policy_runner.config = sample_config
+    id = policy_runner.scopes.add(sample_scopes[0])
+    started, release = threading.Event(), threading.Event()
+
+    def connect(*args):
+        started.set()
+        release.wait(5)
+        raise Exception("Connection error")
+
+    with patch("device_discovery.policy.runner.get_network_driver", return_value=connect) as mock_driver:
+        scheduled = threading.Thread(target=policy_runner.run, args=[id])
+        scheduled.start()
+        assert started.wait(5)
+
+        handle = policy_runner.run_now()
+        assert policy_runner.run(id) is None
+        assert handle.progress()["status"] == "running"
+
+        release.set()
+        scheduled.join(5)
+        assert handle.hosts[0][1].result(timeout=5) == "Connection error"
+    mock_driver.assert_called_once()
+    assert policy_runner.runs == 1
+
+
+def test_runs_waiting_in_saturated_pool_all_run(sample_scopes):
+    """Test that runs queued behind busy pool threads are delayed rather than dropped."""
+    pool = PriorityPool(max_workers=1)
+    ran = []
+    done = threading.Semaphore(0)
+
+    def run(self, id):
+        time.sleep(0.6)
+        ran.append(self.name)
+        done.release()
+
+    with patch("device_discovery.policy.runner.get_pool", return_value=pool), patch(
+        "device_discovery.policy.runner.get_supported_drivers", return_value=["ios"]
+    ), patch.object(PolicyRunner, "_run", run):
+        runners = [PolicyRunner() for _ in range(3)]
+        try:
+            for i, runner in enumerate(runners):
+                runner.setup(f"p{i}", Config(), sample_scopes)
+            for _ in range(3):
+                assert done.acquire(timeout=10)
+        finally:
+            for runner in runners:
+                runner.stop()
+            pool.shutdown()
+
+    assert sorted(ran) == ["p0", "p1", "p2"]
+
+
+def test_run_history_and_top(policy_runner, sample_scopes, sample_config):
+    """Test that runs are kept in the host history and the slowest and failing indexes."""
+    policy_runner.name = "policy1"
+    policy_runner.config = sample_config
+    ok = policy_runner.scopes.add(sample_scopes[0])
+    failing = policy_runner.scopes.add(
+        Napalm(driver="ios", hostname="router2", username="admin", password="password")
+    )
+
+    def ingest(hostname, data, policy, timings):
+        timings.update(translate=0.1, ingest=0.2)
+        return 5, []
+
+    with patch("device_discovery.policy.runner.get_network_driver"), patch(
+        "device_discovery.client.Client.ingest", side_effect=ingest
+    ):
+        policy_runner.run(ok)
+    with patch(
+        "device_discovery.policy.runner.get_network_driver",
+        side_effect=TimeoutError("timed out"),
+    ):
+        policy_runner.run(failing)
+        policy_runner.run(failing)
+
+    host = policy_runner.host(ok)
+    assert host["hostname"] == "router1"
+    assert set(host["history"][0]["stages"]) == {"collection", "translate", "ingest"}
+    assert host["history"][0]["entities"] == 5
+
+    host = policy_runner.host(failing)
+    assert host["consecutive_failures"] == 2
+    assert [r["error_class"] for r in host["history"]] == ["TimeoutError", "TimeoutError"]
+
+    top = policy_runner.top("failing", 10)
+    assert [(score, h["hostname"]) for score, h in top] == [(2, "router2")]
+    assert top[0][1]["last"]["error_class"] == "TimeoutError"
+    assert len(policy_runner.top("slowest", 10)) == 2
+
+    policy_runner.forget_scope(failing)
+    assert policy_runner.top("failing", 10) == []
+    with pytest.raises(ValueError, match=f"scope item {failing} not found in policy 'policy1'"):
+        policy_runner.host(failing)
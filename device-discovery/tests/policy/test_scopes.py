@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Scope Store Unit Tests."""
+
+import gc
+import threading
+import time
+
+import pytest
+
+from device_discovery.policy.models import Napalm
+from device_discovery.policy.scopes import ScopeStore
+
+
+def test_scope_store_interns_credentials():
+    """Test that scope items sharing connection settings share a single Credentials."""
+    store = ScopeStore()
+    ids = [
+        store.add(
+            Napalm(
+                hostname=f"router{i}",
+                username="admin",
+                password="password",
+                optional_args={"port": 22, "transport": "ssh"},
+            )
+        )
+        for i in range(3)
+    ]
+    other = store.add(Napalm(driver="eos", hostname="switch1", username="admin", password="other"))
+
+    assert ids == [1, 2, 3]
+    assert store.credentials_count() == 2
+    first, second = store.get(ids[0]), store.get(ids[1])
+    assert first.credentials is second.credentials
+    assert (first.hostname, first.driver, first.username, first.timeout) == ("router0", None, "admin", 60)
+    assert first.optional_args == {"port": 22, "transport": "ssh"}
+    assert store.get(other).driver == "eos"
+
+
+def test_scope_store_remove():
+    """Test that removing the last user of a credential set releases it."""
+    store = ScopeStore()
+    id = store.add(Napalm(hostname="router1", username="admin", password="password"))
+    assert id in store
+    assert len(store) == 1
+
+    store.remove(id)
+    store.remove(id)
+    gc.collect()
+
+    assert id not in store
+    assert store.get(id) is None
+    assert list(store) == []
+    assert store.credentials_count() == 0
+
+
+def test_add_with_id():
+    """Test that restored records keep their ids, which must keep increasing."""
+    store = ScopeStore()
+    scope = Napalm(driver="ios", hostname="router1", username="admin", password="password")
+    assert store.add(scope, id=5) == 5
+    assert store.add(scope) == 6
+    with pytest.raises(ValueError, match="scope id 3 is not greater than the stored ones"):
+        store.add(scope, id=3)
+    assert store.ids() == [5, 6]
+
+
+def test_readers_iterate_over_a_snapshot():
+    """Test that the store can be read while it is changed by another thread."""
+    store = ScopeStore()
+    scope = Napalm(hostname="router", username="admin", password="password")
+    for _ in range(1000):
+        store.add(scope)
+    stop = threading.Event()
+
+    def churn():
+        while not stop.is_set():
+            id = store.add(scope)
+            time.sleep(0)
+            store.remove(id)
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        # Reading the records one at a time lets the writer run in between
+        for _ in range(5):
+            read = 0
+            for _, record in store.items():
+                time.sleep(0)
+                read += record.hostname == "router"
+            assert read >= 1000
+    finally:
+        stop.set()
+        writer.join()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Policy State Unit Tests."""
+
+from datetime import datetime, timezone
+
+from device_discovery.policy.state import (
+    RUN_RECORD,
+    HostState,
+    RunHistory,
+    TopIndex,
+    paginate,
+)
+
+
+def test_paginate():
+    """Test cursor pagination over sorted keys."""
+    keys = ["a", "b", "c", "d", "e"]
+    assert paginate(keys, None, 2) == (["a", "b"], "b")
+    assert paginate(keys, "b", 2) == (["c", "d"], "d")
+    assert paginate(keys, "d", 2) == (["e"], None)
+    assert paginate(keys, "bb", 2) == (["c", "d"], "d")
+    assert paginate(keys, "e", 2) == ([], None)
+    assert paginate(keys, None, 5) == (keys, None)
+
+
+def test_host_state_to_dict():
+    """Test the serialization of a host state."""
+    state = HostState()
+    assert state.to_dict() == {
+        "last_run": None,
+        "duration_seconds": None,
+        "driver": None,
+        "entities": None,
+        "last_error": None,
+        "consecutive_failures": 0,
+    }
+    state.last_run = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    state.entities = 3
+    assert state.to_dict()["last_run"] == "2024-01-01T00:00:00+00:00"
+    assert state.to_dict()["entities"] == 3
+
+
+def test_run_history_is_a_ring_buffer():
+    """Test that the history keeps the most recent runs in a fixed size buffer."""
+    history = RunHistory(size=3)
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert history.records() == []
+    for i in range(5):
+        history.append(
+            started.replace(minute=i),
+            float(i),
+            {"collection": 0.5, "ingest": 0.25},
+            i if i % 2 else None,
+            "TimeoutError" if i == 3 else None,
+        )
+    assert len(history) == 3
+    assert len(history._buffer) == 3 * RUN_RECORD.size
+
+    records = history.records()
+    assert [r["duration_seconds"] for r in records] == [4.0, 3.0, 2.0]
+    assert records[1] == {
+        "started": "2024-01-01T00:03:00+00:00",
+        "duration_seconds": 3.0,
+        "stages": {"collection": 0.5, "ingest": 0.25},
+        "entities": 3,
+        "error_class": "TimeoutError",
+    }
+    assert (records[0]["entities"], records[0]["error_class"]) == (None, None)
+    assert history.records(1) == records[:1]
+
+
+def test_top_index():
+    """Test that the index follows score changes and removals."""
+    index = TopIndex()
+    index.set(1, 5.0)
+    index.set(2, 1.0)
+    index.set(3, 3.0)
+    assert index.top(2) == [(1, 5.0), (3, 3.0)]
+
+    index.set(1, 0.5)
+    index.set(2, 0)
+    index.discard(3)
+    index.discard(4)
+    assert index.top(10) == [(1, 0.5)]
+    assert len(index) == 1
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# Copyright 2024 NetBox Labs Inc
+"""NetBox Labs - Policy Store Unit Tests."""
+
+import json
+import os
+import sqlite3
+import stat
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from device_discovery.discovery import get_discovered_driver
+from device_discovery.policy.manager import PolicyManager
+from device_discovery.policy.models import Policy
+from device_discovery.policy.runner import PolicyRunner
+from device_discovery.policy.store import PolicyStore
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    """Fixture for the path of a state database."""
+    return str(tmp_path / "state.db")
+
+
+@pytest.fixture(autouse=True)
+def mock_supported_drivers():
+    """Fixture to mock the installed drivers."""
+    with patch(
+        "device_discovery.policy.runner.get_supported_drivers", return_value=["ios", "eos"]
+    ):
+        yield
+
+
+def make_policy(schedule: str | None) -> Policy:
+    """Build a policy with a set driver and a driver to discover."""
+    config = {"defaults": {"site": "New York"}}
+    if schedule is not None:
+        config["schedule"] = schedule
+    return Policy(
+        config=config,
+        scope=[
+            {"driver": "ios", "hostname": "store-router1", "username": "a", "password": "b"},
+            {
+                "hostname": "store-router2",
+                "username": "a",
+                "password": "b",
+                "optional_args": {"port": 2222},
+            },
+        ],
+    )
+
+
+def test_store_file_is_private(store_path):
+    """Test that the state database, holding credentials, is only readable by its owner."""
+    PolicyStore(store_path).close()
+    assert stat.S_IMODE(os.stat(store_path).st_mode) == 0o600
+
+
+def test_restore_scheduled_policy(store_path):
+    """Test that a policy is restored with its drivers, last runs and next run times."""
+    manager = PolicyManager(PolicyStore(store_path))
+    manager.start_policy("policy1", make_policy("0 * * * *"))
+    runner = manager.runners["policy1"]
+    ids = runner.scopes.ids()
+    runner.scopes.get(ids[1]).driver = "eos"
+    runner.record_run(ids[1], datetime.now(timezone.utc), 1.5, "eos", 3, None)
+    runner.record_run(ids[0], datetime.now(timezone.utc), 0.5, "ios", None, "timeout")
+    next_run = runner.next_run_time(ids[0])
+    fingerprint = runner.scopes.fingerprint()
+    manager.stop()
+
+    restored = PolicyManager(PolicyStore(store_path))
+    restored.restore()
+    try:
+        runner = restored.runners["policy1"]
+        assert restored.policy_names == ["policy1"]
+        assert runner.scopes.ids() == ids
+        assert runner.scopes.fingerprint() == fingerprint
+        assert runner.scopes.get(ids[1]).driver == "eos"
+        assert runner.scopes.get(ids[1]).optional_args == {"port": 2222}
+        assert get_discovered_driver("store-router2") == "eos"
+        assert runner.next_run_time(ids[0]) == next_run
+        assert (runner.failing, runner.config.defaults.site) == (1, "New York")
+        hosts, _ = runner.hosts(None, 10)
+        assert [(h["entities"], h["last_error"]) for h in hosts] == [(None, "timeout"), (3, None)]
+
+        # The restored policy is unchanged when pushed again
+        assert restored.upsert_policy("policy1", make_policy("0 * * * *")) == {
+            "status": "unchanged"
+        }
+
+        restored.delete_policy("policy1")
+        assert PolicyStore(store_path).load() == []
+    finally:
+        restored.stop()
+
+
+def test_restore_streamed_scopes(store_path):
+    """Test that scope items added to a started policy are saved with it."""
+    manager = PolicyManager(PolicyStore(store_path))
+    policy = make_policy("0 * * * *")
+    try:
+        manager.start_policy("policy1", Policy(config=policy.config, scope=[]))
+        assert manager.add_scopes("policy1", policy.scope) == 2
+    finally:
+        manager.stop()
+
+    ((name, _, rows),) = PolicyStore(store_path).load()
+    assert name == "policy1"
+    assert [json.loads(row["scope"])["hostname"] for row in rows] == ["store-router1", "store-router2"]
+
+
+def test_restore_one_time_runs(store_path):
+    """Test that missed one-time runs keep their intervals and done ones are not repeated."""
+    policy = make_policy(None)
+    policy.scope.append(policy.scope[0].model_copy(update={"hostname": "store-router3"}))
+    with patch.object(PolicyRunner, "run"):
+        manager = PolicyManager(PolicyStore(store_path))
+        manager.start_policy("policy1", policy)
+        ids = manager.runners["policy1"].scopes.ids()
+        manager.stop()
+
+        past = datetime.now(timezone.utc) - timedelta(hours=1)
+        with sqlite3.connect(store_path) as conn:
+            conn.executemany(
+                "UPDATE scopes SET next_run = ? WHERE id = ?",
+                [
+                    (past.isoformat(), ids[0]),
+                    ((past + timedelta(seconds=30)).isoformat(), ids[1]),
+                    (None, ids[2]),
+                ],
+            )
+
+        restored = PolicyManager(PolicyStore(store_path))
+        restored.restore()
+        try:
+            runner = restored.runners["policy1"]
+            first, second = runner.next_run_time(ids[0]), runner.next_run_time(ids[1])
+            assert first > datetime.now(timezone.utc)
+            assert second - first == timedelta(seconds=30)
+            assert runner.next_run_time(ids[2]) is None
+        finally:
+            restored.stop()
+
+
+def test_restore_skips_invalid_policy(store_path):
+    """Test that a policy whose driver is no longer installed is not restored."""
+    manager = PolicyManager(PolicyStore(store_path))
+    manager.start_policy("policy1", make_policy("0 * * * *"))
+    manager.stop()
+
+    restored = PolicyManager(PolicyStore(store_path))
+    with patch("device_discovery.policy.runner.get_supported_drivers", return_value=["eos"]):
+        restored.restore()
+    try:
+        assert restored.runners == {}
+    finally:
+        restored.stop()
@@ -90,9 +90,13 @@ def test_ingest_success(mock_diode_client_class, sample_data):
         "device_discovery.client.translate_data",
         return_value=translate_data(sample_data),
     ) as mock_translate_data:
-        client.ingest(hostname, sample_data)
+        timings = {}
+        entities, errors = client.ingest(hostname, sample_data, timings=timings)
         mock_translate_data.assert_called_once_with(sample_data)
         mock_diode_instance.ingest.assert_called_once()
+        assert entities == len(mock_translate_data.return_value)
+        assert errors == []
+        assert set(timings) == {"translate", "ingest"}
 
 
 def test_ingest_failure(mock_diode_client_class, sample_data):
@@ -110,11 +114,11 @@ def test_ingest_failure(mock_diode_client_class, sample_data):
         "device_discovery.client.translate_data",
         return_value=translate_data(sample_data),
     ) as mock_translate_data:
-        client.ingest(hostname, sample_data)
+        _, errors = client.ingest(hostname, sample_data)
         mock_translate_data.assert_called_once_with(sample_data)
         mock_diode_instance.ingest.assert_called_once()
 
-    assert len(mock_diode_instance.ingest.return_value.errors) > 0
+    assert errors == ["Error1", "Error2"]
 
 
 def test_ingest_without_initialization():
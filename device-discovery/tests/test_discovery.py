@@ -2,7 +2,9 @@
 # Copyright 2024 NetBox Labs Inc
 """NetBox Labs - Discovery Unit Tests."""
 
+import json
 import logging
+from importlib.metadata import PackageNotFoundError
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
@@ -10,10 +12,12 @@ import pytest
 from napalm.base.base import NetworkDriver
 
 from device_discovery.discovery import (
+    DriverPrewarmer,
     discover_device_driver,
+    get_supported_drivers,
+    installed_napalm_distributions,
     napalm_driver_list,
     set_napalm_logs_level,
-    supported_drivers,
     walk_napalm_packages,
 )
 
@@ -67,7 +71,7 @@ def test_discover_device_driver_success(mock_get_network_driver):
 
     mock_get_network_driver.side_effect = [
         MagicMock(return_value=mock_driver_instance)
-    ] * len(supported_drivers)
+    ] * len(get_supported_drivers())
 
     info = SimpleNamespace(
         hostname="testhost",
@@ -78,7 +82,7 @@ def test_discover_device_driver_success(mock_get_network_driver):
     )
 
     driver = discover_device_driver(info)
-    assert driver in supported_drivers, "Expected one of the supported drivers"
+    assert driver in get_supported_drivers(), "Expected one of the supported drivers"
 
 
 def test_discover_device_driver_no_serial_number(mock_get_network_driver):
@@ -354,3 +358,112 @@ def test_set_napalm_logs_level(mock_loggers):
 
     for logger in mock_loggers.values():
         logger.setLevel.assert_called_once_with(logging.DEBUG)
+
+
+@pytest.fixture
+def fresh_driver_cache(tmp_path, monkeypatch):
+    """Reset the in-memory driver list and point the disk cache to a temporary directory."""
+    monkeypatch.setenv("DEVICE_DISCOVERY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr("device_discovery.discovery._supported_drivers", None)
+    return tmp_path / "napalm_drivers.json"
+
+
+def test_get_supported_drivers_computes_once(fresh_driver_cache):
+    """Test that the driver list is computed once and written to disk."""
+    with patch(
+        "device_discovery.discovery.napalm_driver_list", return_value=["eos", "srl"]
+    ) as mock_list:
+        assert get_supported_drivers() == ["eos", "srl"]
+        assert get_supported_drivers() == ["eos", "srl"]
+        mock_list.assert_called_once()
+
+    assert json.loads(fresh_driver_cache.read_text())["drivers"] == ["eos", "srl"]
+
+
+def test_get_supported_drivers_uses_disk_cache(fresh_driver_cache):
+    """Test that a matching disk cache avoids importing the drivers."""
+    with patch(
+        "device_discovery.discovery.installed_napalm_distributions",
+        return_value=["napalm==5.2.0"],
+    ), patch(
+        "device_discovery.discovery.napalm_driver_list", return_value=["eos"]
+    ) as mock_list:
+        get_supported_drivers()
+        with patch("device_discovery.discovery._supported_drivers", None):
+            assert get_supported_drivers() == ["eos"]
+        mock_list.assert_called_once()
+
+
+def test_get_supported_drivers_invalidated_by_new_distribution(fresh_driver_cache):
+    """Test that installing or upgrading a NAPALM distribution invalidates the cache."""
+    fresh_driver_cache.write_text(json.dumps({"key": "stale", "drivers": ["old"]}))
+    with patch(
+        "device_discovery.discovery.napalm_driver_list", return_value=["eos", "srl"]
+    ) as mock_list:
+        assert get_supported_drivers() == ["eos", "srl"]
+        mock_list.assert_called_once()
+
+
+def test_installed_napalm_distributions():
+    """Test that the distributions are those providing napalm and napalm_* packages."""
+    packages = {
+        "napalm": ["napalm"],
+        "napalm_synthetic": ["netboxlabs-napalm-synthetic"],
+        "napalm_srl": ["napalm-srlinux", "napalm-srl-extras"],
+        "pydantic": ["pydantic"],
+    }
+    versions = {"napalm": "5.2.0", "netboxlabs-napalm-synthetic": "0.0.1", "napalm-srlinux": "1.0.0"}
+
+    def version(name):
+        if name not in versions:
+            raise PackageNotFoundError(name)
+        return versions[name]
+
+    with patch("device_discovery.discovery.packages_distributions", return_value=packages), patch(
+        "device_discovery.discovery.version", side_effect=version
+    ):
+        assert installed_napalm_distributions() == [
+            "napalm==5.2.0",
+            "napalm-srlinux==1.0.0",
+            "netboxlabs-napalm-synthetic==0.0.1",
+        ]
+
+
+def test_get_supported_drivers_invalidated_by_driver_upgrade(fresh_driver_cache):
+    """Test that upgrading a driver whose distribution name is not napalm* invalidates the cache."""
+    packages = {"napalm": ["napalm"], "napalm_synthetic": ["netboxlabs-napalm-synthetic"]}
+    versions = {"napalm": "5.2.0", "netboxlabs-napalm-synthetic": "0.0.1"}
+    with patch("device_discovery.discovery.packages_distributions", return_value=packages), patch(
+        "device_discovery.discovery.version", side_effect=versions.get
+    ), patch("device_discovery.discovery.napalm_driver_list", side_effect=[["eos"], ["eos", "synthetic"]]) as mock_list:
+        assert get_supported_drivers() == ["eos"]
+        versions["netboxlabs-napalm-synthetic"] = "0.0.2"
+        with patch("device_discovery.discovery._supported_drivers", None):
+            assert get_supported_drivers() == ["eos", "synthetic"]
+        assert mock_list.call_count == 2
+
+
+def test_prewarmer_imports_each_driver_once():
+    """Test that the prewarmer imports drivers in the background and skips warmed ones."""
+    prewarmer = DriverPrewarmer()
+    with patch("device_discovery.discovery.get_network_driver") as mock_get:
+        for future in prewarmer.prewarm({"ios", "eos"}):
+            future.result()
+        assert prewarmer.prewarm({"ios", "eos"}) == []
+        prewarmer.shutdown()
+
+    assert sorted(call.args[0] for call in mock_get.call_args_list) == ["eos", "ios"]
+    assert set(prewarmer.timings) == {"eos", "ios"}
+
+
+def test_prewarmer_retries_failed_import():
+    """Test that a driver failing to import can be scheduled again."""
+    prewarmer = DriverPrewarmer()
+    with patch(
+        "device_discovery.discovery.get_network_driver", side_effect=ModuleNotFoundError("napalm_x")
+    ):
+        for future in prewarmer.prewarm({"x"}):
+            assert future.result() == 0.0
+        assert len(prewarmer.prewarm({"x"})) == 1
+        prewarmer.shutdown()
+    assert prewarmer.timings == {}
@@ -28,7 +28,7 @@ def mock_client():
 
     Mocks the Client class to control its behavior during tests.
     """
-    with patch("device_discovery.main.Client") as mock:
+    with patch("device_discovery.client.Client") as mock:
         yield mock
 
 
@@ -43,6 +43,39 @@ def mock_uvicorn_run():
         yield mock
 
 
+@pytest.fixture(autouse=True)
+def mock_configure_pool():
+    """
+    Fixture to mock the configure_pool function.
+
+    The shared worker pool is already in use by the other tests.
+    """
+    with patch("device_discovery.main.configure_pool") as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_configure_store():
+    """
+    Fixture to mock the configure_store function.
+
+    Prevents the tests from creating a state database.
+    """
+    with patch("device_discovery.policy.store.configure_store") as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_set_late_threshold():
+    """
+    Fixture to mock the set_late_threshold function.
+
+    Keeps the late run threshold of the other tests.
+    """
+    with patch("device_discovery.policy.executor.set_late_threshold") as mock:
+        yield mock
+
+
 def test_main_keyboard_interrupt(mock_parse_args):
     """Test handling of KeyboardInterrupt in main."""
     mock_parse_args.return_value = MagicMock(
@@ -128,3 +161,36 @@ def test_main_missing_policy(mock_parse_args):
             main()
         except Exception as e:
             assert str(e) == "Test Exit"
+
+
+def test_main_configures_worker_pool(
+    mock_parse_args, mock_client, mock_uvicorn_run, mock_configure_pool, mock_set_late_threshold
+):
+    """Test the worker pool is sized before the server is imported."""
+    mock_parse_args.return_value = MagicMock(
+        diode_target="grpc", diode_api_key="abc", host="0.0.0.0", port=1234, workers=8
+    )
+
+    main()
+
+    mock_configure_pool.assert_called_once_with(8)
+    mock_set_late_threshold.assert_called_once_with(mock_parse_args.return_value.late_threshold)
+    mock_uvicorn_run.assert_called_once()
+
+
+def test_main_configures_state_db(
+    mock_parse_args, mock_client, mock_uvicorn_run, mock_configure_store
+):
+    """Test the policy store is opened when a state database is given."""
+    mock_parse_args.return_value = MagicMock(
+        diode_target="grpc", diode_api_key="abc", workers=8, state_db="/tmp/state.db"
+    )
+
+    main()
+
+    mock_configure_store.assert_called_once_with("/tmp/state.db")
+
+    mock_configure_store.reset_mock()
+    mock_parse_args.return_value.state_db = None
+    main()
+    mock_configure_store.assert_not_called()
@@ -2,7 +2,7 @@
 # Copyright 2024 NetBox Labs Inc
 """NetBox Labs - Server Unit Tests."""
 
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 import yaml
@@ -121,9 +121,10 @@ def mock_supported_drivers():
     Mocks the supported drivers to control response in capabilities endpoint.
     """
     with patch(
-        "device_discovery.server.supported_drivers", ["driver1", "driver2"]
+        "device_discovery.server.get_supported_drivers",
+        return_value=["driver1", "driver2"],
     ) as mock:
-        yield mock
+        yield mock.return_value
 
 
 @pytest.fixture
@@ -182,6 +183,19 @@ def test_read_capabilities(mock_supported_drivers):
     assert response.json() == {"supported_drivers": mock_supported_drivers}
 
 
+def test_read_metrics():
+    """
+    Test the /metrics endpoint.
+
+    Ensures the Prometheus text format is returned with the device-discovery metrics.
+    """
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "device_discovery_collection_duration_seconds" in response.text
+    assert "device_discovery_scheduler_lag_seconds" in response.text
+
+
 def test_write_policy_valid_yaml(mock_valid_policy_request, valid_policy_yaml):
     """
     Test posting a valid YAML policy.
@@ -257,6 +271,17 @@ def test_write_policy_unexpected_parser_error():
         assert response.json() == {"detail": "unexpected error"}
 
 
+def test_write_policy_invalid_json():
+    """Test posting a malformed JSON policy."""
+    response = client.post(
+        "/api/v1/policies",
+        headers={"Content-Type": "application/json"},
+        content='{"policies": {',
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid JSON format"}
+
+
 def test_write_policy_invalid_content_type():
     """
     Test the /api/v1/policies endpoint with invalid content type.
@@ -266,13 +291,13 @@ def test_write_policy_invalid_content_type():
     """
     response = client.post(
         "/api/v1/policies",
-        headers={"content-type": "application/json"},
-        json={"policies": {"policy1": {}}},
+        headers={"content-type": "text/plain"},
+        content="policies: {}",
     )
     assert response.status_code == 400
     assert (
         response.json()["detail"]
-        == "invalid Content-Type. Only 'application/x-yaml' is supported"
+        == "invalid Content-Type. Only 'application/x-yaml' and 'application/json' are supported"
     )
 
 
@@ -399,3 +424,238 @@ def test_delete_policy_error(mock_manager):
     response = client.delete("/api/v1/policies/policy1")
     assert response.status_code == 400
     assert response.json()["detail"] == "unexpected error"
+
+
+@pytest.fixture
+def mock_policy_runner():
+    """Fixture to mock the PolicyRunner created by the manager."""
+    manager.runners = {}
+    with patch("device_discovery.policy.manager.PolicyRunner") as mock:
+        yield mock.return_value
+    manager.runners = {}
+
+
+def test_stream_policy(mock_policy_runner):
+    """Test streaming a policy as NDJSON, scope items are added as they are read."""
+    body = (
+        b'{"name": "policy1", "config": {"defaults": {"site": "New York"}}}\n'
+        b'{"driver": "ios", "hostname": "router1", "username": "admin", "password": "password"}\n'
+        b"\n"
+        b'{"hostname": "router2", "username": "admin", "password": "password"}'
+    )
+    response = client.post(
+        "/api/v1/policies/stream",
+        headers={"Content-Type": "application/x-ndjson"},
+        content=iter([body[:50], body[50:]]),
+    )
+    assert response.status_code == 201
+    assert response.json() == {"detail": "policy 'policy1' was started with 2 scope items"}
+    mock_policy_runner.setup.assert_called_once()
+    assert [c.args[0].hostname for c in mock_policy_runner.add_scope.call_args_list] == [
+        "router1",
+        "router2",
+    ]
+    assert "policy1" in manager.runners
+
+
+def test_stream_policy_validation_error(mock_policy_runner):
+    """Test that an invalid scope item rejects the streamed policy."""
+    body = (
+        b'{"name": "policy1"}\n'
+        b'{"hostname": "router1", "username": "admin", "password": "password"}\n'
+        b'{"hostname": "router2", "username": "admin"}\n'
+    )
+    response = client.post(
+        "/api/v1/policies/stream",
+        headers={"Content-Type": "application/x-ndjson"},
+        content=body,
+    )
+    assert response.status_code == 403
+    assert response.json() == {
+        "detail": [
+            {"field": "scope.1.password", "type": "missing", "error": "Field required"}
+        ]
+    }
+    mock_policy_runner.stop.assert_called_once()
+    assert "policy1" not in manager.runners
+
+
+def test_stream_policy_invalid_json(mock_policy_runner):
+    """Test that a malformed line rejects the streamed policy."""
+    response = client.post(
+        "/api/v1/policies/stream",
+        headers={"Content-Type": "application/x-ndjson"},
+        content=b'{"name": "policy1"}\n{"hostname": \n',
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "line 2: Invalid JSON format"}
+    assert "policy1" not in manager.runners
+
+
+def test_stream_policy_invalid_scope_line(mock_policy_runner):
+    """Test that any error on a scope line drops the policy, not only validation errors."""
+    response = client.post(
+        "/api/v1/policies/stream",
+        headers={"Content-Type": "application/x-ndjson"},
+        content=b'{"name": "policy1"}\n{"hostname": "${HOST}\xff"}\n',
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("line 2: 'utf-8' codec can't decode")
+    assert "policy1" not in manager.runners
+
+    mock_policy_runner.add_scope.side_effect = ValueError("duplicate hostname")
+    response = client.post(
+        "/api/v1/policies/stream",
+        headers={"Content-Type": "application/x-ndjson"},
+        content=b'{"name": "policy1"}\n{"hostname": "router1", "username": "a", "password": "b"}\n',
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "line 2: duplicate hostname"}
+    assert "policy1" not in manager.runners
+
+
+def test_stream_policy_already_exists(mock_policy_runner):
+    """Test that streaming an existing policy is a conflict, leaving it in place."""
+    manager.runners["policy1"] = mock_policy_runner
+    response = client.post(
+        "/api/v1/policies/stream",
+        headers={"Content-Type": "application/x-ndjson"},
+        content=b'{"name": "policy1"}\n',
+    )
+    assert response.status_code == 409
+    assert response.json() == {"detail": "policy 'policy1' already exists"}
+    assert manager.runners["policy1"] is mock_policy_runner
+    mock_policy_runner.stop.assert_not_called()
+
+
+def test_stream_policy_invalid_content_type():
+    """Test streaming a policy with an invalid content type."""
+    response = client.post(
+        "/api/v1/policies/stream",
+        headers={"Content-Type": "application/json"},
+        content=b'{"name": "policy1"}',
+    )
+    assert response.status_code == 400
+    assert (
+        response.json()["detail"]
+        == "invalid Content-Type. Only 'application/x-ndjson' is supported"
+    )
+
+
+def test_upsert_policy(mock_manager, mock_valid_policy_request, valid_policy_yaml):
+    """Test creating or updating a policy with PUT."""
+    mock_manager.parse_policy.return_value = mock_valid_policy_request
+    mock_manager.upsert_policies.return_value = {"policy1": {"status": "unchanged"}}
+    response = client.put(
+        "/api/v1/policies",
+        headers={"Content-Type": "application/x-yaml"},
+        content=valid_policy_yaml,
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "detail": "policy 'policy1' is unchanged",
+        "policies": {"policy1": {"status": "unchanged"}},
+    }
+
+
+def test_upsert_policy_error(mock_manager, mock_valid_policy_request, valid_policy_yaml):
+    """Test that an update error returns a 400."""
+    mock_manager.parse_policy.return_value = mock_valid_policy_request
+    mock_manager.upsert_policies.side_effect = Exception("unsupported driver")
+    response = client.put(
+        "/api/v1/policies",
+        headers={"Content-Type": "application/x-yaml"},
+        content=valid_policy_yaml,
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "unsupported driver"}
+
+
+def test_list_policies(mock_manager):
+    """Test listing the policies."""
+    mock_manager.list_policies.return_value = {"policies": [], "next_cursor": None}
+    response = client.get("/api/v1/policies", params={"cursor": "a", "limit": 10})
+    assert response.status_code == 200
+    assert response.json() == {"policies": [], "next_cursor": None}
+    mock_manager.list_policies.assert_called_once_with("a", 10)
+
+    response = client.get("/api/v1/policies", params={"limit": 0})
+    assert response.status_code == 422
+
+
+def test_read_policy(mock_manager):
+    """Test describing a policy."""
+    mock_manager.get_policy.return_value = {"name": "policy1", "hosts": [], "next_cursor": None}
+    response = client.get("/api/v1/policies/policy1", params={"cursor": 10})
+    assert response.status_code == 200
+    assert response.json()["name"] == "policy1"
+    mock_manager.get_policy.assert_called_once_with("policy1", 10, 100)
+
+    mock_manager.get_policy.side_effect = ValueError("policy 'policy2' not found")
+    response = client.get("/api/v1/policies/policy2")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "policy 'policy2' not found"}
+
+
+def test_run_policy(mock_manager):
+    """Test queueing an immediate run of a policy."""
+    mock_manager.policy_exists.return_value = True
+    mock_manager.run_policy.return_value = MagicMock(id="abc", hosts=[("router1", None)])
+    response = client.post("/api/v1/policies/policy1/run", json={"hostnames": ["router1"]})
+    assert response.status_code == 202
+    assert response.json() == {
+        "detail": "run of policy 'policy1' was queued for 1 scope items",
+        "id": "abc",
+        "url": "/api/v1/runs/abc",
+    }
+    mock_manager.run_policy.assert_called_once_with("policy1", ["router1"])
+
+    response = client.post("/api/v1/policies/policy1/run")
+    assert response.status_code == 202
+    mock_manager.run_policy.assert_called_with("policy1", None)
+
+    mock_manager.run_policy.side_effect = ValueError("policy 'policy1' has no matching scope item")
+    response = client.post("/api/v1/policies/policy1/run", json={"hostnames": ["unknown"]})
+    assert response.status_code == 400
+
+    mock_manager.policy_exists.return_value = False
+    response = client.post("/api/v1/policies/policy2/run")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "policy 'policy2' not found"}
+
+
+def test_read_run(mock_manager):
+    """Test following the progress of an immediate run."""
+    mock_manager.get_run.return_value = {"id": "abc", "status": "running"}
+    response = client.get("/api/v1/runs/abc")
+    assert response.status_code == 200
+    assert response.json() == {"id": "abc", "status": "running"}
+
+    mock_manager.get_run.side_effect = ValueError("run 'def' not found")
+    response = client.get("/api/v1/runs/def")
+    assert response.status_code == 404
+
+
+def test_read_host(mock_manager):
+    """Test describing a scope item with its run history."""
+    mock_manager.get_host.return_value = {"id": 1, "history": []}
+    response = client.get("/api/v1/policies/policy1/hosts/1")
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "history": []}
+    mock_manager.get_host.assert_called_once_with("policy1", 1)
+
+    mock_manager.get_host.side_effect = ValueError("scope item 2 not found in policy 'policy1'")
+    response = client.get("/api/v1/policies/policy1/hosts/2")
+    assert response.status_code == 404
+
+
+def test_read_top_hosts(mock_manager):
+    """Test listing the slowest and most failing scope items."""
+    mock_manager.top_hosts.return_value = [{"policy": "policy1", "id": 1}]
+    response = client.get("/api/v1/hosts/top", params={"by": "failing", "limit": 5})
+    assert response.status_code == 200
+    assert response.json() == {"hosts": [{"policy": "policy1", "id": 1}]}
+    mock_manager.top_hosts.assert_called_once_with("failing", 5)
+
+    response = client.get("/api/v1/hosts/top", params={"by": "fastest"})
+    assert response.status_code == 422
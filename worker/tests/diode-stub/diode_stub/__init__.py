@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Diode ingester stand-in namespace."""
+
+from diode_stub.server import IngesterStub, IngestStats, percentiles, serve
+
+__all__ = ["IngestStats", "IngesterStub", "percentiles", "serve"]
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - End-to-end ingest throughput benchmark against the Diode stand-in."""
+
+import argparse
+import json
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from netboxlabs.diode.sdk.ingester import Device, Entity
+
+from diode_stub.server import serve
+
+
+def napalm_payload(hostname: str, interfaces: int) -> dict:
+    """
+    Build a NAPALM-like payload, as collected by device-discovery.
+
+    Args:
+    ----
+        hostname (str): Device hostname.
+        interfaces (int): Number of interfaces, each one with an IPv4 address.
+
+    Returns:
+    -------
+        dict: facts, interfaces and interface IPs.
+
+    """
+    facts = {
+        "hostname": hostname,
+        "model": "Bench 9000",
+        "vendor": "NetBox Labs",
+        "serial_number": f"SN-{hostname}",
+    }
+    ifaces = {}
+    ips = {}
+    for i in range(interfaces):
+        name = f"Ethernet{i}"
+        ifaces[name] = {
+            "is_enabled": True,
+            "description": "",
+            "mac_address": f"00:1c:73:{(i >> 16) & 0xFF:02x}:{(i >> 8) & 0xFF:02x}:{i & 0xFF:02x}",
+            "speed": 10000,
+            "mtu": 9214,
+        }
+        ips[name] = {"ipv4": {f"10.{(i >> 16) & 0xFF}.{(i >> 8) & 0xFF}.{i & 0xFF}": {"prefix_length": 31}}}
+    return {"device": facts, "interface": ifaces, "interface_ip": ips}
+
+
+def bench_device_discovery(target: str, args: argparse.Namespace):
+    """Drive device_discovery.client.Client against the stand-in."""
+    from device_discovery.client import Client
+    from device_discovery.policy.models import Defaults
+
+    client = Client()
+    client.init_client(prefix="bench", target=target, api_key="bench")
+
+    def ingest(i: int):
+        hostname = f"bench-{i}"
+        data = napalm_payload(hostname, args.interfaces)
+        data["driver"] = "eos"
+        data["defaults"] = Defaults(site="bench")
+        client.ingest(hostname, data)
+
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(ingest, range(args.runs)))
+
+
+class BenchBackend:
+    """Backend producing a fixed number of devices."""
+
+    def __init__(self, entities: int):
+        """Initialize the backend with the number of entities to produce."""
+        self.entities = entities
+
+    def run(self, policy_name: str, policy) -> Iterable[Entity]:
+        """Produce the devices."""
+        for i in range(self.entities):
+            yield Entity(
+                device=Device(
+                    name=f"{policy_name}-{i}",
+                    device_type="Bench 9000",
+                    manufacturer="NetBox Labs",
+                    site="bench",
+                    serial=f"SN-{i}",
+                )
+            )
+
+
+def bench_worker(target: str, args: argparse.Namespace):
+    """Drive worker.policy.runner.PolicyRunner against the stand-in."""
+    from netboxlabs.diode.sdk import DiodeClient
+    from worker.models import Config, Policy
+    from worker.policy.runner import PolicyRunner
+
+    client = DiodeClient(target=target, app_name="bench", app_version="0.0.0", api_key="bench")
+    backend = BenchBackend(args.entities)
+    policy = Policy(config=Config(package="bench"), scope={})
+
+    def run(i: int):
+        runner = PolicyRunner()
+        runner.name = f"bench-{i}"
+        runner.run(client, backend, policy)
+
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(run, range(args.runs)))
+    client.close()
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser(description="Diode ingest throughput benchmark")
+    parser.add_argument("target", choices=["device-discovery", "worker"], help="Component to drive")
+    parser.add_argument("-r", "--runs", default=100, help="Hosts (device-discovery) or policy runs (worker)", type=int)
+    parser.add_argument("-t", "--threads", default=10, help="Concurrent callers", type=int)
+    parser.add_argument("-i", "--interfaces", default=48, help="Interfaces per device (device-discovery)", type=int)
+    parser.add_argument("-e", "--entities", default=1000, help="Entities per run (worker)", type=int)
+    parser.add_argument("--delay", default=0.0, help="Stand-in delay per request (s)", type=float)
+    parser.add_argument("--jitter", default=0.0, help="Stand-in random extra delay (s)", type=float)
+    parser.add_argument("--error-rate", default=0.0, help="Stand-in error rate", type=float)
+    parser.add_argument("--abort-rate", default=0.0, help="Stand-in abort rate", type=float)
+    args = parser.parse_args()
+
+    server, port, servicer = serve(
+        delay=args.delay,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        abort_rate=args.abort_rate,
+        seed=0,
+    )
+    target = f"grpc://127.0.0.1:{port}"
+    start = time.perf_counter()
+    try:
+        if args.target == "device-discovery":
+            bench_device_discovery(target, args)
+        else:
+            bench_worker(target, args)
+    finally:
+        elapsed = time.perf_counter() - start
+        server.stop(grace=1)
+
+    stats = servicer.stats.snapshot()
+    report = {
+        "target": args.target,
+        "runs": args.runs,
+        "threads": args.threads,
+        "wall_seconds": round(elapsed, 6),
+        "entities_per_second": round(stats["entities"] / elapsed, 1) if elapsed else 0.0,
+        "server": stats,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
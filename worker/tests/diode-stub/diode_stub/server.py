@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Diode ingester stand-in server."""
+
+import argparse
+import json
+import logging
+import random
+import signal
+import statistics
+import threading
+import time
+from concurrent import futures
+
+import grpc
+from netboxlabs.diode.sdk.diode.v1 import ingester_pb2, ingester_pb2_grpc
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IngestStats:
+    """Thread-safe counters for the requests received by the stand-in."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self._lock:
+            self.requests = 0
+            self.entities = 0
+            self.bytes = 0
+            self.errors = 0
+            self.aborts = 0
+            self.latencies = []
+            self.first_request = None
+            self.last_request = None
+
+    def record(self, entities: int, size: int, latency: float, error: bool, abort: bool):
+        """
+        Record a single ingest request.
+
+        Args:
+        ----
+            entities (int): Number of entities in the request.
+            size (int): Serialized request size in bytes.
+            latency (float): Time spent handling the request, in seconds.
+            error (bool): Whether the request was answered with ingestion errors.
+            abort (bool): Whether the request was aborted with a gRPC error.
+
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            self.entities += entities
+            self.bytes += size
+            self.errors += int(error)
+            self.aborts += int(abort)
+            self.latencies.append(latency)
+            if self.first_request is None:
+                self.first_request = now - latency
+            self.last_request = now
+
+    def snapshot(self) -> dict:
+        """
+        Summarize the recorded requests.
+
+        Returns
+        -------
+            dict: Request, entity and byte totals plus latency percentiles.
+
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            elapsed = (
+                self.last_request - self.first_request
+                if self.first_request is not None
+                else 0.0
+            )
+            summary = {
+                "requests": self.requests,
+                "entities": self.entities,
+                "bytes": self.bytes,
+                "errors": self.errors,
+                "aborts": self.aborts,
+                "elapsed_seconds": round(elapsed, 6),
+            }
+        summary["latency_seconds"] = percentiles(latencies)
+        return summary
+
+
+def percentiles(values: list[float]) -> dict:
+    """
+    Compute the usual latency percentiles of a list of values.
+
+    Args:
+    ----
+        values (list[float]): The values, in seconds.
+
+    Returns:
+    -------
+        dict: p50, p90, p99 and max, rounded to microseconds.
+
+    """
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    if len(values) == 1:
+        return {key: round(values[0], 6) for key in ("p50", "p90", "p99", "max")}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49], 6),
+        "p90": round(cuts[89], 6),
+        "p99": round(cuts[98], 6),
+        "max": round(max(values), 6),
+    }
+
+
+class IngesterStub(ingester_pb2_grpc.IngesterServiceServicer):
+    """Diode IngesterService implementation that only records what it receives."""
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        abort_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        """
+        Initialize the stand-in.
+
+        Args:
+        ----
+            delay (float): Fixed delay added to every request, in seconds.
+            jitter (float): Maximum random delay added on top of `delay`, in seconds.
+            error_rate (float): Fraction of requests answered with ingestion errors.
+            abort_rate (float): Fraction of requests aborted with UNAVAILABLE.
+            seed (int | None): Seed for the random generator, for reproducible runs.
+
+        """
+        self.delay = delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.abort_rate = abort_rate
+        self.stats = IngestStats()
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def _draw(self) -> tuple[float, float]:
+        with self._random_lock:
+            return self._random.random(), self._random.random()
+
+    def Ingest(self, request, context):  # noqa: N802
+        """Handle an ingest request."""
+        start = time.monotonic()
+        fault, jitter = self._draw()
+        delay = self.delay + jitter * self.jitter
+        if delay > 0:
+            time.sleep(delay)
+
+        abort = fault < self.abort_rate
+        error = not abort and fault < self.abort_rate + self.error_rate
+        self.stats.record(
+            len(request.entities),
+            request.ByteSize(),
+            time.monotonic() - start,
+            error,
+            abort,
+        )
+        if abort:
+            context.abort(grpc.StatusCode.UNAVAILABLE, "injected failure")
+        if error:
+            return ingester_pb2.IngestResponse(errors=["injected ingestion error"])
+        return ingester_pb2.IngestResponse()
+
+
+def serve(
+    host: str = "127.0.0.1", port: int = 0, max_workers: int = 10, **options
+) -> tuple[grpc.Server, int, IngesterStub]:
+    """
+    Start the stand-in gRPC server.
+
+    Args:
+    ----
+        host (str): Address to bind.
+        port (int): Port to bind, 0 picks a free one.
+        max_workers (int): Size of the server thread pool.
+        **options: Keyword arguments forwarded to IngesterStub.
+
+    Returns:
+    -------
+        tuple: The started server, the bound port and the servicer.
+
+    """
+    servicer = IngesterStub(**options)
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        options=[("grpc.max_receive_message_length", 64 * 1024 * 1024)],
+    )
+    ingester_pb2_grpc.add_IngesterServiceServicer_to_server(servicer, server)
+    bound_port = server.add_insecure_port(f"{host}:{port}")
+    server.start()
+    return server, bound_port, servicer
+
+
+def main():
+    """Run the stand-in until interrupted, then print the collected statistics."""
+    parser = argparse.ArgumentParser(description="Local Diode ingester stand-in")
+    parser.add_argument("-s", "--host", default="127.0.0.1", help="Server host", type=str)
+    parser.add_argument("-p", "--port", default=8081, help="Server port", type=int)
+    parser.add_argument("-w", "--workers", default=10, help="Server threads", type=int)
+    parser.add_argument("--delay", default=0.0, help="Fixed delay per request (s)", type=float)
+    parser.add_argument("--jitter", default=0.0, help="Random extra delay per request (s)", type=float)
+    parser.add_argument("--error-rate", default=0.0, help="Fraction of requests answered with errors", type=float)
+    parser.add_argument("--abort-rate", default=0.0, help="Fraction of requests aborted", type=float)
+    parser.add_argument("--seed", default=None, help="Random seed", type=int)
+    args = parser.parse_args()
+
+    server, port, servicer = serve(
+        host=args.host,
+        port=args.port,
+        max_workers=args.workers,
+        delay=args.delay,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        abort_rate=args.abort_rate,
+        seed=args.seed,
+    )
+    logger.info(f"Diode stand-in listening on grpc://{args.host}:{port}")
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+    server.stop(grace=1)
+    print(json.dumps(servicer.stats.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
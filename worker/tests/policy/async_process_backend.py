@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Async backend run by the process pool tests."""
+
+import asyncio
+import os
+from collections.abc import AsyncIterable
+
+from netboxlabs.diode.sdk.ingester import Entity, Site
+
+from worker.backend import AsyncBackend
+from worker.models import Metadata, Policy
+
+
+class AsyncProcessBackend(AsyncBackend):
+    """Async backend yielding one site per count, tagged with the process id."""
+
+    def setup(self) -> Metadata:
+        """Set up the backend."""
+        return Metadata(name="async_process", app_name="process", app_version="1.0.0")
+
+    async def run(self, policy_name: str, policy: Policy) -> AsyncIterable[Entity]:
+        """Yield the sites."""
+        for i in range(policy.scope["count"]):
+            await asyncio.sleep(0)
+            yield Entity(site=Site(name=f"{policy_name}-{i}", description=str(os.getpid())))
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Backend run by the process pool tests."""
+
+import os
+import time
+from collections.abc import Iterable
+
+from netboxlabs.diode.sdk.ingester import Entity, Site
+
+from worker.backend import Backend, RunContext
+from worker.models import Metadata, Policy
+
+
+class ProcessBackend(Backend):
+    """Backend yielding one site per count, tagged with the process id."""
+
+    def setup(self) -> Metadata:
+        """Set up the backend."""
+        return Metadata(name="process", app_name="process", app_version="1.0.0")
+
+    def run(self, policy_name: str, policy: Policy, context: RunContext) -> Iterable[Entity]:
+        """Yield the sites, allocate, fail, exit or hang as the scope says."""
+        allocated = b"x" * policy.scope.get("allocate", 0)
+        if policy.scope.get("hang"):
+            context.report(stage="hanging")
+            time.sleep(60)
+        if policy.scope.get("exit"):
+            os._exit(3)
+        if policy.scope.get("fail"):
+            raise ValueError("backend failed")
+        for i in range(policy.scope["count"]):
+            yield Entity(site=Site(name=f"{policy_name}-{i}", description=str(os.getpid())))
+        del allocated
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Chunked Ingestion Unit Tests."""
+
+import asyncio
+
+import pytest
+from netboxlabs.diode.sdk.ingester import Entity, Site
+
+from worker.policy.chunks import achunked, chunked
+
+
+def sites(count: int, pulled: list | None = None):
+    """Yield site entities, recording how many were pulled."""
+    for i in range(count):
+        if pulled is not None:
+            pulled.append(i)
+        yield Entity(site=Site(name=f"site{i}"))
+
+
+def test_chunked_by_count():
+    """Test that chunks hold at most the given number of entities."""
+    chunks = list(chunked(sites(5), max_entities=2))
+    assert [len(chunk) for chunk, _ in chunks] == [2, 2, 1]
+    assert [size for _, size in chunks] == [
+        sum(e.ByteSize() + 6 for e in chunk) for chunk, _ in chunks
+    ]
+
+
+def test_chunked_by_size():
+    """Test that chunks stay under the size limit, a large entity going alone."""
+    small = Entity(site=Site(name="a"))
+    large = Entity(site=Site(name="b" * 100))
+    limit = 2 * (small.ByteSize() + 6)
+    chunks = list(chunked([small, small, small, large, None, small], max_bytes=limit))
+    assert [len(chunk) for chunk, _ in chunks] == [2, 1, 1, 1]
+    assert chunks[2][0] == [large]
+
+
+def test_chunked_is_lazy():
+    """Test that entities are only pulled when the next chunk is requested."""
+    pulled = []
+    chunks = chunked(sites(10, pulled), max_entities=3)
+    next(chunks)
+    assert len(pulled) == 3
+    next(chunks)
+    assert len(pulled) == 6
+
+
+def test_achunked():
+    """Test that entities of async and regular iterables are chunked."""
+
+    async def agenerate():
+        for entity in sites(5):
+            yield entity
+        yield None
+
+    async def collect(entities):
+        return [len(chunk) async for chunk, _ in achunked(entities, max_entities=2)]
+
+    assert asyncio.run(collect(agenerate())) == [2, 2, 1]
+    assert asyncio.run(collect(list(sites(3)))) == [2, 1]
+
+
+def test_chunked_invalid_limits():
+    """Test that chunk limits must be positive."""
+    with pytest.raises(ValueError, match="chunk limits must be greater than 0"):
+        next(chunked([], max_entities=0))
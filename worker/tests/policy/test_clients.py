@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Diode Client Pool Unit Tests."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from worker.policy.clients import ClientPool
+
+
+@pytest.fixture
+def mock_diode_client():
+    """Fixture to mock the DiodeClient constructor, creating a new client each call."""
+    with patch("worker.policy.clients.DiodeClient") as mock:
+        mock.side_effect = lambda **kwargs: MagicMock(**kwargs)
+        yield mock
+
+
+def test_clients_are_shared_by_key(mock_diode_client):
+    """Test that a client is shared by the same target, app and API key only."""
+    pool = ClientPool()
+    a = pool.acquire("grpc://diode:8080", "app", "1.0", "key")
+    b = pool.acquire("grpc://diode:8080", "app", "1.0", "key")
+    c = pool.acquire("grpc://diode:8080", "app", "1.0", "other-key")
+    d = pool.acquire("grpc://diode:8080", "prefix/app", "1.0", "key")
+
+    assert a is b
+    assert len({id(a), id(c), id(d)}) == 3
+    assert (len(pool), pool.references(a), pool.references(c)) == (3, 2, 1)
+    assert mock_diode_client.call_count == 3
+
+
+def test_clients_are_closed_when_released(mock_diode_client):
+    """Test that a client is closed once released by all its users, then recreated."""
+    pool = ClientPool()
+    a = pool.acquire("grpc://diode:8080", "app", "1.0", None)
+    pool.acquire("grpc://diode:8080", "app", "1.0", None)
+
+    pool.release(a)
+    a.close.assert_not_called()
+    pool.release(a)
+    a.close.assert_called_once()
+    assert (len(pool), pool.references(a)) == (0, 0)
+
+    # Releasing an unknown client is ignored
+    pool.release(a)
+    assert pool.acquire("grpc://diode:8080", "app", "1.0", None) is not a
+
+
+def test_close_failure_is_logged(mock_diode_client, caplog):
+    """Test that a client failing to close is dropped with a warning."""
+    pool = ClientPool()
+    client = pool.acquire("grpc://diode:8080", "app", "1.0", None)
+    client.close.side_effect = RuntimeError("channel error")
+
+    pool.release(client)
+
+    assert len(pool) == 0
+    assert "Failed to close Diode client for 'app': channel error" in caplog.text
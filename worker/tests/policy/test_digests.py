@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Entity Digests Unit Tests."""
+
+import os
+import stat
+from unittest.mock import patch
+
+import pytest
+from netboxlabs.diode.sdk.ingester import Device, Entity, Site
+
+from worker.policy.digests import DigestStore, entity_digest
+
+
+def sites(*names: str) -> list[Entity]:
+    """Build site entities."""
+    return [Entity(site=Site(name=name)) for name in names]
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Fixture for a digest store in a temporary directory."""
+    return DigestStore(str(tmp_path / "digests"), resync_interval=3600)
+
+
+def test_entity_digest_is_stable():
+    """Test that equal entities have the same digest, and different ones do not."""
+    device = Entity(device=Device(name="dev1", tags=["a", "b"], site="site1"))
+    assert entity_digest(device) == entity_digest(
+        Entity(device=Device(name="dev1", tags=["a", "b"], site="site1"))
+    )
+    assert entity_digest(device) != entity_digest(Entity(device=Device(name="dev1")))
+
+
+def test_delta_runs(store):
+    """Test that a run only selects the entities changed since the last committed run."""
+    first = store.begin("policy1")
+    assert first.full
+    assert len(first.select(sites("a", "b", "c"))) == 3
+    first.commit()
+    assert stat.S_IMODE(os.stat(store.path("policy1")).st_mode) == 0o600
+
+    second = store.begin("policy1")
+    assert not second.full
+    assert [e.site.name for e in second.select(sites("a", "b2", "c", "d"))] == ["b2", "d"]
+    assert second.unchanged == 2
+
+    # An uncommitted run leaves the digests of the last run
+    assert [e.site.name for e in store.begin("policy1").select(sites("b2"))] == ["b2"]
+
+    second.commit()
+    third = store.begin("policy1")
+    assert third.select(sites("a", "b2", "c", "d")) == []
+    # Other policies have their own digests
+    assert store.begin("policy2").full
+
+
+def test_periodic_full_run(store):
+    """Test that a policy runs in full once the resync interval is over."""
+    store.begin("policy1").commit()
+    with patch("worker.policy.digests.time.time", return_value=4e9):
+        assert store.begin("policy1").full
+
+
+def test_unreadable_or_deleted_digests(store, caplog):
+    """Test that a policy runs in full when its digests are corrupted or deleted."""
+    store.begin("policy1").commit()
+    with open(store.path("policy1"), "r+b") as f:
+        f.write(b"garbage!")
+    assert store.begin("policy1").full
+    assert "Ignoring unreadable digests" in caplog.text
+
+    store.begin("policy1").commit()
+    store.delete("policy1")
+    store.delete("policy1")
+    assert store.begin("policy1").full
+
+
+def test_invalid_resync_interval(tmp_path):
+    """Test that the resync interval must be positive."""
+    with pytest.raises(ValueError, match="resync_interval must be greater than 0"):
+        DigestStore(str(tmp_path), resync_interval=0)
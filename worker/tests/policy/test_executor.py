@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Instrumented Executor Unit Tests."""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from worker.metrics import LATE_RUNS, SCHEDULER_LAG
+from worker.policy.executor import (
+    DEFAULT_LATE_THRESHOLD,
+    InstrumentedThreadPoolExecutor,
+    set_late_threshold,
+)
+
+
+def sample(metric, name, policy):
+    """Read a sample of a metric for the given policy."""
+    for collected in metric.collect():
+        for s in collected.samples:
+            if s.name == name and s.labels.get("policy") == policy:
+                return s.value
+    return None
+
+
+def test_executor_records_lag_and_late_runs(caplog):
+    """Test that the dispatch lag of each job is measured and late runs counted."""
+    scheduler = BackgroundScheduler(executors={"default": InstrumentedThreadPoolExecutor()})
+    done = threading.Event()
+
+    scheduler.start()
+    try:
+        set_late_threshold(0.5)
+        scheduler.add_job(
+            done.set,
+            "date",
+            name="executor_late",
+            run_date=datetime.now(timezone.utc) - timedelta(seconds=2),
+            misfire_grace_time=60,
+        )
+        scheduler.add_job(
+            lambda: None, "date", name="executor_late", run_date=datetime.now(timezone.utc)
+        )
+        assert done.wait(5)
+        for _ in range(50):
+            if sample(SCHEDULER_LAG, "orb_worker_scheduler_lag_seconds_count", "executor_late") == 2:
+                break
+            threading.Event().wait(0.1)
+    finally:
+        set_late_threshold(DEFAULT_LATE_THRESHOLD)
+        scheduler.shutdown()
+
+    assert sample(SCHEDULER_LAG, "orb_worker_scheduler_lag_seconds_count", "executor_late") == 2
+    assert sample(LATE_RUNS, "orb_worker_late_runs_total", "executor_late") == 1
+    assert "started 2." in caplog.text
+
+
+def test_executor_does_not_count_missed_runs(caplog):
+    """Test that a run dropped past its misfire grace time is not counted as late."""
+    scheduler = BackgroundScheduler(executors={"default": InstrumentedThreadPoolExecutor()})
+    missed = threading.Event()
+    scheduler.add_listener(lambda event: missed.set(), mask=EVENT_JOB_MISSED)
+
+    scheduler.start()
+    try:
+        set_late_threshold(0.5)
+        scheduler.add_job(
+            missed.set,
+            "date",
+            name="executor_missed",
+            run_date=datetime.now(timezone.utc) - timedelta(seconds=2),
+            misfire_grace_time=1,
+        )
+        assert missed.wait(5)
+    finally:
+        set_late_threshold(DEFAULT_LATE_THRESHOLD)
+        scheduler.shutdown()
+
+    assert sample(SCHEDULER_LAG, "orb_worker_scheduler_lag_seconds_count", "executor_missed") is None
+    assert sample(LATE_RUNS, "orb_worker_late_runs_total", "executor_missed") is None
+    assert "started 2." not in caplog.text
+
+
+def test_executor_reports_job_errors():
+    """Test that a failing job is reported to the scheduler."""
+    scheduler = BackgroundScheduler(executors={"default": InstrumentedThreadPoolExecutor()})
+    errors = []
+    scheduler.add_listener(lambda event: errors.append(event.exception), mask=EVENT_JOB_ERROR)
+
+    def job():
+        raise RuntimeError("boom")
+
+    scheduler.start()
+    try:
+        scheduler.add_job(job, "date", run_date=datetime.now(timezone.utc))
+        for _ in range(50):
+            if errors:
+                break
+            threading.Event().wait(0.1)
+    finally:
+        scheduler.shutdown()
+
+    assert len(errors) == 1
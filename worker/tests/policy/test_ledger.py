@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Run Ledger Unit Tests."""
+
+import pytest
+
+from worker.policy.ledger import RunLedger, RunRecord
+
+
+def record(policy: str, package: str = "custom", error: str | None = None, **usage):
+    """Record a finished run of a policy."""
+    run = RunRecord(policy, package, "process")
+    run.entities = usage.pop("entities", 0)
+    run.finish(None if error else run.entities, error, usage)
+    return run
+
+
+def test_record_measures_the_run():
+    """Test that a record adds the usage of the backend process to that of the worker."""
+    run = record("p", entities=3, cpu_seconds=1.5, peak_rss_delta=2048)
+
+    result = run.to_dict()
+    assert (result["policy"], result["package"], result["isolation"]) == ("p", "custom", "process")
+    assert (result["entities"], result["ingested"], result["error"]) == (3, 3, None)
+    assert result["cpu_seconds"] >= 1.5
+    assert result["peak_rss_delta"] >= 2048
+    assert result["wall_seconds"] >= 0
+    assert result["started"].endswith("+00:00")
+
+
+def test_async_record_has_no_cpu_time():
+    """Test that the CPU time of an async run is not measured."""
+    run = RunRecord("p", "custom", "async")
+    run.finish(0, None)
+
+    assert run.cpu_seconds is None
+
+
+def test_ledger_is_bounded():
+    """Test that the oldest runs are dropped once the ledger is full."""
+    ledger = RunLedger(size=3)
+    for i in range(5):
+        ledger.add(record(f"p{i}"))
+
+    assert len(ledger) == 3
+    assert [r["policy"] for r in ledger.query()] == ["p4", "p3", "p2"]
+
+
+def test_ledger_query_filters_and_sorts():
+    """Test that runs are filtered by policy, package and outcome, and sorted by usage."""
+    ledger = RunLedger()
+    ledger.add(record("a", cpu_seconds=1.0))
+    ledger.add(record("b", package="heavy", cpu_seconds=30.0))
+    ledger.add(record("a", error="boom", cpu_seconds=5.0))
+    ledger.add(record("c", cpu_seconds=10.0))
+
+    assert [r["policy"] for r in ledger.query(policy="a")] == ["a", "a"]
+    assert [r["policy"] for r in ledger.query(package="heavy")] == ["b"]
+    assert [r["error"] for r in ledger.query(failed=True)] == ["boom"]
+    assert len(ledger.query(failed=False)) == 3
+    assert [r["policy"] for r in ledger.query(sort="cpu_seconds")] == ["b", "c", "a", "a"]
+    assert len(ledger.query(limit=2)) == 2
+
+
+def test_ledger_invalid_arguments():
+    """Test that invalid sizes and sort fields are rejected."""
+    with pytest.raises(ValueError, match="size must be greater than 0"):
+        RunLedger(size=0)
+    with pytest.raises(ValueError, match="cannot sort by 'name'"):
+        RunLedger().query(sort="name")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Event Loop Unit Tests."""
+
+import asyncio
+import threading
+
+from worker.policy.loop import EventLoopThread
+
+
+def test_submit_runs_on_loop_thread():
+    """Test that coroutines run on the loop thread, and blocking calls on its executor."""
+    loop = EventLoopThread(blocking_workers=1)
+
+    async def names():
+        blocking = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: threading.current_thread().name
+        )
+        return threading.current_thread().name, blocking
+
+    try:
+        assert loop.submit(names()).result(5) == ("orb-worker-loop", "orb-worker-blocking_0")
+    finally:
+        loop.stop()
+
+
+def test_stop_cancels_coroutines():
+    """Test that stopping the loop cancels the running coroutines, and it can restart."""
+    loop = EventLoopThread()
+    cancelled = threading.Event()
+
+    async def wait():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    future = loop.submit(wait())
+    loop.stop()
+
+    assert cancelled.is_set()
+    assert future.cancelled()
+    try:
+        assert loop.submit(asyncio.sleep(0, "restarted")).result(5) == "restarted"
+    finally:
+        loop.stop()
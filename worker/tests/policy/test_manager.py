@@ -2,11 +2,17 @@
 # Copyright 2025 NetBox Labs Inc
 """NetBox Labs - Policy Manager Unit Tests."""
 
+import threading
+import time
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
+from apscheduler.triggers.date import DateTrigger
+from prometheus_client import REGISTRY
 from pydantic import ValidationError
 
+from worker.metrics import RUN_DURATION, TIMED_OUT_RUNS
 from worker.models import Policy, PolicyRequest
 from worker.policy.manager import PolicyManager
 
@@ -14,7 +20,10 @@ from worker.policy.manager import PolicyManager
 @pytest.fixture
 def policy_manager():
     """Fixture to create a PolicyManager instance."""
-    return PolicyManager()
+    manager = PolicyManager()
+    yield manager
+    if manager.scheduler is not None:
+        manager.scheduler.shutdown()
 
 
 @pytest.fixture
@@ -37,12 +46,145 @@ def test_start_policy(policy_manager, sample_policy):
         policy_manager.start_policy("policy1", sample_policy)
 
         # Check that PolicyRunner.setup was called with correct arguments
-        mock_runner.setup.assert_called_once_with("policy1", None, sample_policy)
+        mock_runner.setup.assert_called_once_with(
+            "policy1", None, sample_policy, 0.0, process_pool=None
+        )
 
         # Ensure the policy runner was added to the manager's runners
         assert "policy1" in policy_manager.runners
 
 
+def test_upsert_policy(policy_manager, sample_policy):
+    """Test that upserting starts, skips or restarts a policy."""
+    with patch("worker.policy.manager.PolicyRunner") as MockPolicyRunner:
+        mock_runner = MockPolicyRunner.return_value
+        assert policy_manager.upsert_policy("policy1", sample_policy) == {"status": "started"}
+
+        mock_runner.policy = sample_policy.model_copy(deep=True)
+        assert policy_manager.upsert_policy("policy1", sample_policy) == {"status": "unchanged"}
+        mock_runner.stop.assert_not_called()
+
+        changed = sample_policy.model_copy(update={"scope": [{"any": "other"}]})
+        assert policy_manager.upsert_policy("policy1", changed) == {"status": "updated"}
+        mock_runner.stop.assert_called_once()
+        assert mock_runner.setup.call_count == 2
+
+
+def test_failed_update_keeps_running_policies(policy_manager, sample_policy):
+    """Test that an update failing to start leaves every running policy in place."""
+    changed = sample_policy.model_copy(update={"scope": [{"any": "other"}]})
+    broken = sample_policy.model_copy(update={"scope": [{"any": "broken"}]})
+    runners = []
+
+    def new_runner(scheduler):
+        runner = MagicMock()
+
+        def setup(name, config, policy, *args, **kwargs):
+            if policy == broken:
+                raise RuntimeError("backend setup failed")
+            runner.policy = policy
+
+        runner.setup.side_effect = setup
+        runners.append(runner)
+        return runner
+
+    with patch("worker.policy.manager.PolicyRunner", side_effect=new_runner):
+        policy_manager.start_policy("a", sample_policy)
+        policy_manager.start_policy("b", sample_policy)
+        original = dict(policy_manager.runners)
+
+        with pytest.raises(RuntimeError, match="backend setup failed"):
+            policy_manager.upsert_policy("a", broken)
+        with pytest.raises(RuntimeError, match="backend setup failed"):
+            policy_manager.upsert_policies({"a": changed, "c": sample_policy, "b": broken})
+
+    assert policy_manager.runners == original
+    assert policy_manager.policy_names == ["a", "b"]
+    assert not any(runner.stop.called for runner in original.values())
+    # The versions set up before the failure were stopped, not those failing to
+    broken_a, changed_a, new_c, broken_b = runners[2:]
+    assert (changed_a.stop.called, new_c.stop.called) == (True, True)
+    assert (broken_a.stop.called, broken_b.stop.called) == (False, False)
+
+
+def test_policies_share_scheduler(policy_manager, sample_policy):
+    """Test that every policy is scheduled by the manager's sized scheduler."""
+    policy_manager.setup(None, max_workers=3, splay=30)
+    with patch("worker.policy.manager.PolicyRunner") as MockPolicyRunner:
+        MockPolicyRunner.side_effect = lambda scheduler: MagicMock()
+        policy_manager.start_policy("a", sample_policy)
+        policy_manager.start_policy("b", sample_policy)
+
+    scheduler = policy_manager.scheduler
+    assert scheduler.running
+    assert scheduler._executors["default"]._pool._max_workers == 3
+    assert [c.args for c in MockPolicyRunner.call_args_list] == [(scheduler,), (scheduler,)]
+    policy_manager.runners["a"].setup.assert_called_once_with(
+        "a", None, sample_policy, 30, process_pool=None
+    )
+
+
+def test_policies_waiting_for_a_thread_all_run(policy_manager):
+    """Test that runs queued behind busy threads are delayed rather than dropped."""
+    policy_manager.setup(None, max_workers=1)
+    scheduler = policy_manager.get_scheduler()
+    ran = []
+    done = threading.Semaphore(0)
+
+    def run(name):
+        time.sleep(0.6)
+        ran.append(name)
+        done.release()
+
+    run_date = datetime.now() + timedelta(seconds=0.1)
+    for name in ("p0", "p1", "p2"):
+        scheduler.add_job(run, name=name, trigger=DateTrigger(run_date=run_date), args=[name])
+    for _ in range(3):
+        assert done.acquire(timeout=5)
+
+    assert sorted(ran) == ["p0", "p1", "p2"]
+
+
+def test_get_process_pool(policy_manager):
+    """Test that policies run in the process pool when they or their package ask for it."""
+    policy_manager.setup(None, isolated_packages=["isolated"], max_processes=2)
+
+    def policy(package, isolation=None):
+        return Policy(config={"package": package, "isolation": isolation}, scope={})
+
+    assert policy_manager.get_process_pool(policy("custom")) is None
+    assert policy_manager.get_process_pool(policy("isolated", "thread")) is None
+    pool = policy_manager.get_process_pool(policy("isolated"))
+    assert pool is policy_manager.get_process_pool(policy("custom", "process"))
+    assert pool.max_processes == 2
+
+
+def test_setup_invalid_max_workers(policy_manager):
+    """Test that the scheduler needs at least one thread."""
+    with pytest.raises(ValueError, match="max_workers must be greater than 0"):
+        policy_manager.setup(None, max_workers=0)
+
+
+def test_list_policies(policy_manager, sample_policy):
+    """Test listing policies one page at a time."""
+    with patch("worker.policy.manager.PolicyRunner") as MockPolicyRunner:
+        MockPolicyRunner.side_effect = lambda scheduler: MagicMock()
+        for name in ("c", "a", "b"):
+            policy_manager.start_policy(name, sample_policy)
+            policy_manager.runners[name].summary.return_value = {"name": name}
+
+    page = policy_manager.list_policies(limit=2)
+    assert page == {"policies": [{"name": "a"}, {"name": "b"}], "next_cursor": "b"}
+    page = policy_manager.list_policies(cursor="b", limit=2)
+    assert page == {"policies": [{"name": "c"}], "next_cursor": None}
+
+    policy_manager.delete_policy("b")
+    assert policy_manager.policy_names == ["a", "c"]
+    assert policy_manager.get_policy("a") == {"name": "a"}
+    with pytest.raises(ValueError, match="policy 'b' not found"):
+        policy_manager.get_policy("b")
+
+
 def test_start_existing_policy_raises_error(policy_manager, sample_policy):
     """Test that starting an already existing policy raises an error."""
     policy_manager.runners["policy1"] = MagicMock()
@@ -93,6 +235,56 @@ def test_parse_policy_invalid_cron(policy_manager):
     assert exc_info.match("Invalid cron schedule format.")
 
 
+def test_parse_policy_resolves_env_vars(policy_manager, monkeypatch):
+    """Test that ${VAR} values are resolved from the environment, in YAML and JSON."""
+    monkeypatch.setenv("CUSTOM_TOKEN", "secret")
+    config_data = b"""
+    policies:
+      policy1:
+        config:
+          package: "custom"
+          token: "${CUSTOM_TOKEN}"
+        scope:
+          - custom: "${UNSET_CUSTOM_VARIABLE}"
+    """
+    policy = policy_manager.parse_policy(config_data).policies["policy1"]
+    assert policy.config.token == "secret"
+    assert policy.scope == [{"custom": "${UNSET_CUSTOM_VARIABLE}"}]
+
+    config_data = b"""{"policies": {"policy1": {
+        "config": {"package": "custom", "token": "${CUSTOM_TOKEN}"}, "scope": {}
+    }}}"""
+    policy = policy_manager.parse_policy(config_data, "application/json").policies["policy1"]
+    assert policy.config.token == "secret"
+
+
+def test_parse_policy_keeps_env_var_keys(policy_manager, monkeypatch):
+    """Test that ${VAR} mapping keys are left as written."""
+    monkeypatch.setenv("CUSTOM_TOKEN", "secret")
+    config_data = b"""
+    policies:
+      policy1:
+        config:
+          package: "custom"
+        scope:
+          ${CUSTOM_TOKEN}: "${CUSTOM_TOKEN}"
+    """
+    policy = policy_manager.parse_policy(config_data).policies["policy1"]
+    assert policy.scope == {"${CUSTOM_TOKEN}": "secret"}
+
+
+def test_parse_policy_json(policy_manager):
+    """Test parsing JSON configuration into a PolicyRequest object."""
+    config_data = b"""{"policies": {"policy1": {
+        "config": {"package": "custom", "schedule": "0 * * * *"},
+        "scope": [{"custom": "scope"}]
+    }}}"""
+    policy_request = policy_manager.parse_policy(config_data, "application/json")
+
+    assert isinstance(policy_request, PolicyRequest)
+    assert policy_request.policies["policy1"].scope == [{"custom": "scope"}]
+
+
 def test_policy_exists(policy_manager):
     """Test checking if a policy exists."""
     policy_manager.runners["policy1"] = MagicMock()
@@ -111,6 +303,47 @@ def test_delete_policy(policy_manager):
     assert "policy1" not in policy_manager.runners
 
 
+def test_delete_policy_deletes_digests(policy_manager):
+    """Test that deleting a policy deletes its entity digests."""
+    policy_manager.runners = {"policy1": MagicMock()}
+    with patch("worker.policy.manager.get_digest_store") as mock_store:
+        policy_manager.delete_policy("policy1")
+
+    mock_store.return_value.delete.assert_called_once_with("policy1")
+
+
+def test_delete_policy_forgets_metrics(policy_manager, sample_policy):
+    """Test that deleting a policy drops its metric series."""
+    RUN_DURATION.labels("gone", "custom").observe(1)
+    TIMED_OUT_RUNS.labels("gone").inc()
+    RUN_DURATION.labels("kept", "custom").observe(1)
+    policy_manager.runners = {"gone": MagicMock(policy=sample_policy)}
+
+    policy_manager.delete_policy("gone")
+
+    labels = {"policy": "gone", "package": "custom"}
+    assert REGISTRY.get_sample_value("orb_worker_run_duration_seconds_count", labels) is None
+    assert REGISTRY.get_sample_value("orb_worker_timed_out_runs_total", {"policy": "gone"}) is None
+    labels = {"policy": "kept", "package": "custom"}
+    assert REGISTRY.get_sample_value("orb_worker_run_duration_seconds_count", labels) == 1
+
+
+def test_update_forgets_metrics_of_previous_package(policy_manager, sample_policy):
+    """Test that updating the package of a policy drops the metric series of the previous one."""
+    moved = sample_policy.model_copy(deep=True)
+    moved.config.package = "other"
+    with patch("worker.policy.manager.PolicyRunner") as MockPolicyRunner, patch(
+        "worker.policy.manager.forget_package"
+    ) as mock_forget:
+        MockPolicyRunner.side_effect = lambda scheduler: MagicMock()
+        policy_manager.start_policy("policy1", sample_policy)
+        policy_manager.runners["policy1"].policy = sample_policy
+        MockPolicyRunner.side_effect = lambda scheduler: MagicMock(policy=moved)
+        policy_manager.upsert_policy("policy1", moved)
+
+    mock_forget.assert_called_once_with("policy1", "custom")
+
+
 def test_delete_nonexistent_policy_raises_error(policy_manager):
     """Test deleting a nonexistent policy raises an error."""
     with pytest.raises(ValueError, match="policy 'nonexistent_policy' not found"):
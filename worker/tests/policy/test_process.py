@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Process Pool Unit Tests."""
+
+import os
+import sys
+import time
+
+import pytest
+
+from worker.backend import RunContext, RunTimedOut
+from worker.models import Policy
+from worker.policy.process import ProcessPool, rss_bytes
+
+PACKAGE = "tests.policy.process_backend"
+
+
+def make_policy(**scope) -> Policy:
+    """Build a policy of the process backend."""
+    return Policy(config={"package": PACKAGE, "isolation": "process"}, scope=scope)
+
+
+def pids(chunks) -> set[int]:
+    """Return the ids of the processes which produced the entities."""
+    return {int(e.site.description) for chunk, _ in chunks for e in chunk}
+
+
+@pytest.fixture
+def pool():
+    """Fixture for a pool of one process, replaced every two runs."""
+    pool = ProcessPool(max_processes=1, max_runs=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_run_streams_chunks(pool):
+    """Test that the entities come back in chunks, produced by another process."""
+    chunks = list(pool.run(PACKAGE, "p", make_policy(count=5), 2, 1024 * 1024))
+
+    assert [len(chunk) for chunk, _ in chunks] == [2, 2, 1]
+    assert [e.site.name for chunk, _ in chunks for e in chunk][:2] == ["p-0", "p-1"]
+    assert all(size > 0 for _, size in chunks)
+    assert os.getpid() not in pids(chunks)
+
+
+def test_run_reports_usage(pool):
+    """Test that the CPU time and peak RSS growth of the process are reported."""
+    usage = {}
+    allocate = 64 * 1024 * 1024
+    policy = make_policy(count=1, allocate=allocate)
+    list(pool.run(PACKAGE, "p", policy, 10, 1024 * 1024, usage=usage))
+
+    assert usage["cpu_seconds"] > 0
+    assert usage["peak_rss_delta"] >= allocate // 2
+
+
+def test_run_async_backend(pool):
+    """Test that an async backend runs on an event loop of the process."""
+    package = "tests.policy.async_process_backend"
+    policy = Policy(config={"package": package}, scope={"count": 3})
+    chunks = list(pool.run(package, "p", policy, 2, 1024 * 1024))
+
+    assert [len(chunk) for chunk, _ in chunks] == [2, 1]
+    assert os.getpid() not in pids(chunks)
+
+
+def test_processes_are_reused_then_recycled(pool):
+    """Test that a process serves runs until it reaches its run limit."""
+    runs = [pids(pool.run(PACKAGE, "p", make_policy(count=1), 10, 1024 * 1024)) for _ in range(3)]
+
+    assert runs[0] == runs[1] != runs[2]
+    assert pool.recycled == 1
+    assert pool.processes() == 1
+
+
+def test_processes_are_recycled_above_rss():
+    """Test that a process is replaced once it exceeds the RSS limit."""
+    pool = ProcessPool(max_processes=1, max_rss=1)
+    try:
+        first = pids(pool.run(PACKAGE, "p", make_policy(count=1), 10, 1024 * 1024))
+        second = pids(pool.run(PACKAGE, "p", make_policy(count=1), 10, 1024 * 1024))
+    finally:
+        pool.shutdown()
+
+    assert first != second
+    assert pool.recycled == 2
+
+
+def test_run_errors(pool):
+    """Test that backend errors and process exits are raised, and the pool recovers."""
+    with pytest.raises(RuntimeError, match="backend failed"):
+        list(pool.run(PACKAGE, "p", make_policy(fail=True), 10, 1024 * 1024))
+    with pytest.raises(RuntimeError, match="backend process exited with code 3"):
+        list(pool.run(PACKAGE, "p", make_policy(exit=True), 10, 1024 * 1024))
+
+    assert len(pids(pool.run(PACKAGE, "p", make_policy(count=1), 10, 1024 * 1024))) == 1
+
+
+def test_abandoned_run_kills_process(pool):
+    """Test that a process still streaming when its run is abandoned is replaced."""
+    chunks = pool.run(PACKAGE, "p", make_policy(count=1000), 1, 1024 * 1024)
+    first = pids([next(chunks)])
+    chunks.close()
+
+    assert pool.processes() == 0
+    assert pids(pool.run(PACKAGE, "p", make_policy(count=1), 10, 1024 * 1024)) != first
+
+
+def test_timed_out_run_kills_process(pool):
+    """Test that a process past the deadline of its run is killed, after reporting progress."""
+    context = RunContext(timeout=1)
+    start = time.monotonic()
+    with pytest.raises(RunTimedOut, match="run timed out after 1s"):
+        list(pool.run(PACKAGE, "p", make_policy(hang=True), 10, 1024 * 1024, context))
+
+    assert time.monotonic() - start < 5
+    assert context.progress == {"stage": "hanging"}
+    assert pool.processes() == 0
+
+
+def test_metadata_from_process(pool):
+    """Test that the metadata comes from a process, which keeps the backend set up."""
+    assert pool.metadata(PACKAGE).app_name == "process"
+    assert PACKAGE not in sys.modules
+    with pytest.raises(RuntimeError, match="No module named"):
+        pool.metadata("tests.policy.missing_backend")
+
+    assert pool.processes() == 1
+    assert pool.recycled == 0
+
+
+def test_rss_bytes():
+    """Test that the RSS of the current process is measured."""
+    assert rss_bytes() > 1024 * 1024
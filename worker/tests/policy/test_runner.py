@@ -2,20 +2,38 @@
 # Copyright 2025 NetBox Labs Inc
 """NetBox Labs - Policy Manager Unit Tests."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import threading
+import time
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
+from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.date import DateTrigger
-
-from worker.backend import Backend
-from worker.models import Config, DiodeConfig, Policy, Status
+from netboxlabs.diode.sdk.ingester import Entity, Site
+
+from worker.backend import AsyncBackend, Backend, BackendRegistry
+from worker.metrics import (
+    ENTITIES,
+    INGEST_ERRORS,
+    RUN_DURATION,
+    RUN_ERRORS,
+    TIMED_OUT_RUNS,
+    UNCHANGED_ENTITIES,
+)
+from worker.models import Config, DiodeConfig, Metadata, Policy, Status
+from worker.policy.clients import ClientPool
+from worker.policy.digests import DigestStore
+from worker.policy.ledger import RunLedger
+from worker.policy.loop import get_event_loop
 from worker.policy.runner import PolicyRunner
+from worker.policy.splay import SplayedTrigger
 
 
 @pytest.fixture
 def policy_runner():
     """Fixture to create a PolicyRunner instance."""
-    return PolicyRunner()
+    return PolicyRunner(MagicMock())
 
 
 @pytest.fixture
@@ -42,16 +60,21 @@ def mock_load_class():
         MagicMock: A mock object for the load_class function.
 
     """
-    with patch("worker.policy.runner.load_class") as mock_load:
+    with patch("worker.backend.load_class") as mock_load, patch(
+        "worker.policy.runner.get_backend_registry", return_value=BackendRegistry()
+    ):
         mock_backend_class = MagicMock(spec=Backend)
+        mock_backend_class.shared = False
         mock_load.return_value = mock_backend_class
         yield mock_load
 
 
 @pytest.fixture
 def mock_diode_client():
-    """Fixture to mock the DiodeClient constructor."""
-    with patch("worker.policy.runner.DiodeClient") as mock_diode_client:
+    """Fixture to mock the DiodeClient constructor, with a pool of clients of the test."""
+    with patch("worker.policy.clients.DiodeClient") as mock_diode_client, patch(
+        "worker.policy.runner.get_client_pool", return_value=ClientPool()
+    ):
         mock_instance = MagicMock()
         mock_diode_client.return_value = mock_instance
         yield mock_diode_client
@@ -61,7 +84,10 @@ def mock_diode_client():
 def mock_backend():
     """Fixture to mock a backend."""
     backend = MagicMock()
-    backend.run.return_value = ["entity1", "entity2"]  # Mock returned entities
+    backend.run.return_value = [  # Mock returned entities
+        Entity(site=Site(name="site1")),
+        Entity(site=Site(name="site2")),
+    ]
     return backend
 
 
@@ -78,18 +104,34 @@ def test_setup_policy_runner_with_cron(
     mock_diode_client,
 ):
     """Test setting up the PolicyRunner with a cron schedule."""
-    with patch.object(policy_runner.scheduler, "start") as mock_start, patch.object(
-        policy_runner.scheduler, "add_job"
-    ) as mock_add_job:
+    mock_add_job = policy_runner.scheduler.add_job
+    mock_add_job.return_value.id = "job1"
 
-        policy_runner.setup("policy1", sample_diode_config, sample_policy)
+    policy_runner.setup("policy1", sample_diode_config, sample_policy)
+
+    # Ensure the job is added to the shared scheduler, which is not started by the runner
+    policy_runner.scheduler.start.assert_not_called()
+    mock_add_job.assert_called_once()
+    assert mock_add_job.call_args[1]["name"] == "policy1"
+    assert policy_runner.job_ids == ["job1"]
+    mock_load_class.assert_called_once()
+    mock_diode_client.assert_called_once()
+    assert policy_runner.status == Status.RUNNING
+
+
+def test_setup_policy_runner_with_splay(
+    policy_runner,
+    sample_policy,
+    sample_diode_config,
+    mock_load_class,
+    mock_diode_client,
+):
+    """Test that a splay delays the cron schedule of the policy."""
+    policy_runner.setup("policy1", sample_diode_config, sample_policy, splay=60)
 
-        # Ensure scheduler starts and job is added
-        mock_start.assert_called_once()
-        mock_add_job.assert_called_once()
-        mock_load_class.assert_called_once()
-        mock_diode_client.assert_called_once()
-        assert policy_runner.status == Status.RUNNING
+    trigger = policy_runner.scheduler.add_job.call_args[1]["trigger"]
+    assert isinstance(trigger, SplayedTrigger)
+    assert 0 <= trigger.offset.total_seconds() < 60
 
 
 def test_setup_policy_runner_with_one_time_run(
@@ -101,19 +143,35 @@ def test_setup_policy_runner_with_one_time_run(
 ):
     """Test setting up the PolicyRunner with a one-time schedule."""
     one_time_config = Config(package="custom")
-    with patch.object(policy_runner.scheduler, "start") as mock_start, patch.object(
-        policy_runner.scheduler, "add_job"
-    ) as mock_add_job:
-        sample_policy.config = one_time_config
-        policy_runner.setup("policy1", sample_diode_config, sample_policy)
+    sample_policy.config = one_time_config
+    policy_runner.setup("policy1", sample_diode_config, sample_policy, splay=60)
+
+    # Verify that DateTrigger is used for one-time scheduling, without splay
+    trigger = policy_runner.scheduler.add_job.call_args[1]["trigger"]
+    mock_load_class.assert_called_once()
+    mock_diode_client.assert_called_once()
+    assert isinstance(trigger, DateTrigger)
+    assert policy_runner.status == Status.RUNNING
+
+
+def test_setup_isolated_policy_runner(
+    policy_runner,
+    sample_policy,
+    sample_diode_config,
+    mock_load_class,
+    mock_diode_client,
+):
+    """Test that an isolated policy gets the backend metadata from the process pool."""
+    pool = MagicMock()
+    pool.metadata.return_value = Metadata(name="custom", app_name="app", app_version="1.0")
 
-        # Verify that DateTrigger is used for one-time scheduling
-        trigger = mock_add_job.call_args[1]["trigger"]
-        mock_load_class.assert_called_once()
-        mock_diode_client.assert_called_once()
-        assert isinstance(trigger, DateTrigger)
-        assert mock_start.called
-        assert policy_runner.status == Status.RUNNING
+    policy_runner.setup("policy1", sample_diode_config, sample_policy, process_pool=pool)
+
+    pool.metadata.assert_called_once_with("custom")
+    mock_load_class.assert_not_called()
+    assert mock_diode_client.call_args.kwargs["app_name"] == "test/app"
+    assert policy_runner.backend is None
+    assert policy_runner.scheduler.add_job.call_args[1]["args"][1] is None
 
 
 def test_run_success(policy_runner, sample_policy, mock_diode_client, mock_backend):
@@ -130,6 +188,26 @@ def test_run_success(policy_runner, sample_policy, mock_diode_client, mock_backe
     assert mock_diode_client.ingest.return_value.errors == []
 
 
+def test_run_state_is_recorded(policy_runner, sample_policy, mock_diode_client, mock_backend):
+    """Test that the outcome of the last run is summarized."""
+    policy_runner.name = "test_policy"
+    policy_runner.policy = sample_policy
+    mock_diode_client.ingest.return_value.errors = []
+    policy_runner.run(mock_diode_client, mock_backend, sample_policy)
+
+    summary = policy_runner.summary()
+    assert summary["runs"] == 1
+    assert summary["entities"] == 2
+    assert summary["last_error"] is None
+    assert summary["last_run"] is not None
+    assert (summary["package"], summary["schedule"]) == ("custom", "0 * * * *")
+
+    mock_backend.run.side_effect = Exception("Backend error")
+    policy_runner.run(mock_diode_client, mock_backend, sample_policy)
+    summary = policy_runner.summary()
+    assert (summary["runs"], summary["entities"], summary["last_error"]) == (2, None, "Backend error")
+
+
 def test_run_ingestion_errors(
     policy_runner,
     sample_policy,
@@ -155,6 +233,424 @@ def test_run_ingestion_errors(
     )
 
 
+def test_run_ingests_generator_in_chunks(
+    policy_runner, sample_policy, mock_diode_client, caplog
+):
+    """Test that a generator backend is ingested one chunk at a time."""
+    pulled = []
+
+    def generate(*args):
+        for i in range(5):
+            pulled.append(i)
+            yield Entity(site=Site(name=f"site{i}"))
+
+    sizes = []
+    mock_diode_client.ingest.side_effect = lambda chunk: sizes.append(
+        (len(chunk), len(pulled))
+    ) or MagicMock(errors=[])
+    backend = MagicMock()
+    backend.run.side_effect = generate
+    policy_runner.name = "test_policy"
+    policy_runner.chunk_entities = 2
+
+    with caplog.at_level("INFO"):
+        policy_runner.run(mock_diode_client, backend, sample_policy)
+
+    # Each chunk is ingested before the next entities are generated
+    assert sizes == [(2, 2), (2, 4), (1, 5)]
+    assert policy_runner.entities == 5
+    assert policy_runner.last_error is None
+    assert "Ingested chunk 3 (1 entities" in caplog.text
+
+
+def test_run_stops_at_failed_chunk(policy_runner, sample_policy, mock_diode_client):
+    """Test that a failed chunk stops the run and closes the generator."""
+    closed = []
+
+    def generate(*args):
+        try:
+            for i in range(10):
+                yield Entity(site=Site(name=f"site{i}"))
+        finally:
+            closed.append(True)
+
+    mock_diode_client.ingest.side_effect = [MagicMock(errors=[]), MagicMock(errors=["boom"])]
+    backend = MagicMock()
+    backend.run.side_effect = generate
+    policy_runner.name = "test_policy"
+    policy_runner.chunk_entities = 3
+
+    policy_runner.run(mock_diode_client, backend, sample_policy)
+
+    assert mock_diode_client.ingest.call_count == 2
+    assert closed == [True]
+    assert policy_runner.entities == 3
+    assert policy_runner.last_error == "ingestion failed: ['boom']"
+
+
+def test_run_in_process_pool(policy_runner, sample_policy, mock_diode_client, mock_backend):
+    """Test that an isolated policy ingests the chunks streamed by the process pool."""
+    chunk = [Entity(site=Site(name="site1"))]
+
+    def run(*args):
+        yield chunk, 20
+        yield chunk, 20
+        args[-1].update(cpu_seconds=2.5, peak_rss_delta=64 * 1024 * 1024)
+
+    pool = MagicMock()
+    pool.run.side_effect = run
+    mock_diode_client.ingest.return_value.errors = []
+    policy_runner.name = "test_policy"
+    policy_runner.process_pool = pool
+    ledger = RunLedger()
+
+    with patch("worker.policy.runner.get_run_ledger", return_value=ledger):
+        policy_runner.run(mock_diode_client, mock_backend, sample_policy)
+
+    mock_backend.run.assert_not_called()
+    pool.run.assert_called_once_with(
+        "custom",
+        "test_policy",
+        sample_policy,
+        1000,
+        3 * 1024 * 1024,
+        policy_runner.context,
+        ANY,
+    )
+    assert mock_diode_client.ingest.call_count == 2
+    assert policy_runner.entities == 2
+    (record,) = ledger.query()
+    assert record["isolation"] == "process"
+    assert record["cpu_seconds"] >= 2.5
+    assert record["peak_rss_delta"] >= 64 * 1024 * 1024
+
+
+class SitesBackend(AsyncBackend):
+    """Async backend yielding sites, after waiting on the given event if any."""
+
+    def __init__(self, count: int, wait: asyncio.Event | None = None):
+        """Initialize the backend with the number of sites and the event to wait on."""
+        self.count = count
+        self.wait = wait
+
+    async def run(self, policy_name, policy):
+        """Yield the sites, once the event is set."""
+        if self.wait is not None:
+            await self.wait.wait()
+        for i in range(self.count):
+            await asyncio.sleep(0)
+            yield Entity(site=Site(name=f"site{i}"))
+
+
+@pytest.fixture
+def event_loop_thread():
+    """Fixture stopping the shared event loop after the test."""
+    yield get_event_loop()
+    get_event_loop().stop()
+
+
+def test_run_async_backend(
+    policy_runner, sample_policy, mock_diode_client, event_loop_thread
+):
+    """Test that an async backend runs on the event loop, without blocking the caller."""
+    threads = []
+    mock_diode_client.ingest.side_effect = lambda chunk: threads.append(
+        threading.current_thread().name
+    ) or MagicMock(errors=[])
+    policy_runner.name = "test_policy"
+    policy_runner.chunk_entities = 2
+    ledger = RunLedger()
+
+    with patch("worker.policy.runner.get_run_ledger", return_value=ledger):
+        policy_runner.run(mock_diode_client, SitesBackend(5), sample_policy)
+        policy_runner.task.result(5)
+
+    assert mock_diode_client.ingest.call_count == 3
+    assert all(name.startswith("orb-worker-blocking") for name in threads)
+    assert (policy_runner.runs, policy_runner.entities) == (1, 5)
+    assert policy_runner.last_error is None
+    (record,) = ledger.query()
+    assert (record["isolation"], record["chunks"], record["cpu_seconds"]) == ("async", 3, None)
+
+
+def test_run_async_coroutine_backend(
+    policy_runner, sample_policy, mock_diode_client, event_loop_thread
+):
+    """Test that an async backend can return its entities from a coroutine."""
+
+    class ListBackend(AsyncBackend):
+        async def run(self, policy_name, policy):
+            return [Entity(site=Site(name="site1")), None]
+
+    mock_diode_client.ingest.return_value.errors = []
+    policy_runner.run(mock_diode_client, ListBackend(), sample_policy)
+    policy_runner.task.result(5)
+
+    assert policy_runner.entities == 1
+
+
+def test_stop_cancels_async_run(
+    policy_runner, sample_policy, mock_diode_client, event_loop_thread, caplog
+):
+    """Test that an async run in progress is skipped by the next run and cancelled by stop."""
+    policy_runner.name = "test_policy"
+    backend = SitesBackend(1, asyncio.Event())
+
+    policy_runner.run(mock_diode_client, backend, sample_policy)
+    task = policy_runner.task
+    policy_runner.run(mock_diode_client, backend, sample_policy)
+    assert policy_runner.task is task
+    assert "Previous run still in progress, skipped" in caplog.text
+
+    policy_runner.stop()
+    for _ in range(50):
+        if policy_runner.runs:
+            break
+        threading.Event().wait(0.1)
+
+    assert task.cancelled()
+    assert policy_runner.last_error == "run cancelled"
+    mock_diode_client.ingest.assert_not_called()
+
+
+def sample(metric, name, policy):
+    """Read a sample of a metric for the given policy."""
+    for collected in metric.collect():
+        for s in collected.samples:
+            if s.name == name and s.labels.get("policy") == policy:
+                return s.value
+    return None
+
+
+def test_run_timeout(policy_runner, sample_policy, mock_diode_client):
+    """Test that a run past the timeout of its policy stops being ingested and is counted."""
+
+    class SlowBackend(Backend):
+        def run(self, policy_name, policy, context):
+            for i in range(10):
+                context.report(sites=i)
+                time.sleep(0.05)
+                yield Entity(site=Site(name=f"site{i}"))
+
+    backend = SlowBackend()
+    mock_diode_client.ingest.return_value.errors = []
+    policy_runner.name = "timeout_policy"
+    policy_runner.chunk_entities = 1
+    sample_policy.config.timeout = 0.12
+
+    policy_runner.run(mock_diode_client, backend, sample_policy)
+
+    assert policy_runner.last_error == "run timed out after 0.12s"
+    assert mock_diode_client.ingest.call_count < 4
+    assert policy_runner.summary()["progress"]["sites"] < 4
+    assert sample(TIMED_OUT_RUNS, "orb_worker_timed_out_runs_total", "timeout_policy") == 1
+
+
+def test_stop_cancels_run(policy_runner, sample_policy, mock_diode_client):
+    """Test that stopping the runner cancels a run waiting on its context."""
+    started = threading.Event()
+
+    class WaitingBackend(Backend):
+        def run(self, policy_name, policy, context):
+            started.set()
+            context.wait(60)
+            context.check()
+            return []
+
+    policy_runner.name = "test_policy"
+    thread = threading.Thread(
+        target=policy_runner.run, args=(mock_diode_client, WaitingBackend(), sample_policy)
+    )
+    thread.start()
+    assert started.wait(5)
+    policy_runner.stop()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert policy_runner.last_error == "run cancelled"
+
+
+@pytest.fixture
+def blocked_ingest(mock_diode_client):
+    """Fixture blocking the ingestion of the Diode client until its second event is set."""
+    ingesting, release = threading.Event(), threading.Event()
+
+    def ingest(chunk):
+        ingesting.set()
+        release.wait(5)
+        return MagicMock(errors=[])
+
+    mock_diode_client.return_value.ingest.side_effect = ingest
+    return ingesting, release
+
+
+def test_stop_releases_client_after_run(
+    policy_runner,
+    sample_policy,
+    sample_diode_config,
+    mock_load_class,
+    mock_diode_client,
+    mock_backend,
+    blocked_ingest,
+):
+    """Test that the client of a run ingesting when the runner stops is closed once it returns."""
+    ingesting, release = blocked_ingest
+    client = mock_diode_client.return_value
+    policy_runner.setup("policy1", sample_diode_config, sample_policy)
+    thread = threading.Thread(
+        target=policy_runner.run, args=(policy_runner.client, mock_backend, sample_policy)
+    )
+    thread.start()
+    assert ingesting.wait(5)
+
+    policy_runner.stop()
+    client.close.assert_not_called()
+
+    release.set()
+    thread.join(5)
+    client.close.assert_called_once()
+    assert policy_runner.client is None
+    # Runs starting after the stop are skipped
+    policy_runner.run(client, mock_backend, sample_policy)
+    assert client.ingest.call_count == 1
+
+
+def test_stop_tears_down_backend_after_run(
+    policy_runner,
+    sample_policy,
+    sample_diode_config,
+    mock_load_class,
+    mock_diode_client,
+    mock_backend,
+    blocked_ingest,
+):
+    """Test that the backend of a run in progress when the runner stops is torn down once it returns."""
+    ingesting, release = blocked_ingest
+    policy_runner.setup("policy1", sample_diode_config, sample_policy)
+    backend = policy_runner.backend
+    thread = threading.Thread(
+        target=policy_runner.run, args=(policy_runner.client, mock_backend, sample_policy)
+    )
+    thread.start()
+    assert ingesting.wait(5)
+
+    policy_runner.stop()
+    backend.teardown.assert_not_called()
+
+    release.set()
+    thread.join(5)
+    backend.teardown.assert_called_once()
+    assert policy_runner.backend is None
+
+
+def test_stop_releases_client_after_async_run(
+    policy_runner,
+    sample_policy,
+    sample_diode_config,
+    mock_load_class,
+    mock_diode_client,
+    blocked_ingest,
+    event_loop_thread,
+):
+    """Test that a cancelled async run keeps its client until its blocking ingestion returns."""
+    ingesting, release = blocked_ingest
+    client = mock_diode_client.return_value
+    policy_runner.setup("policy1", sample_diode_config, sample_policy)
+    policy_runner.run(policy_runner.client, SitesBackend(1), sample_policy)
+    assert ingesting.wait(5)
+
+    policy_runner.stop()
+    threading.Event().wait(0.1)
+    client.close.assert_not_called()
+
+    release.set()
+    for _ in range(50):
+        if client.close.called:
+            break
+        threading.Event().wait(0.1)
+    client.close.assert_called_once()
+    assert policy_runner.last_error == "run cancelled"
+
+
+def test_async_run_timeout(
+    policy_runner, sample_policy, mock_diode_client, event_loop_thread
+):
+    """Test that an async run past its timeout is cancelled."""
+    sample_policy.config.timeout = 0.1
+    policy_runner.name = "async_timeout_policy"
+
+    policy_runner.run(mock_diode_client, SitesBackend(1, asyncio.Event()), sample_policy)
+    policy_runner.task.result(5)
+
+    assert policy_runner.last_error == "run timed out after 0.1s"
+    assert sample(TIMED_OUT_RUNS, "orb_worker_timed_out_runs_total", "async_timeout_policy") == 1
+
+
+def test_run_ingests_changed_entities(
+    policy_runner, sample_policy, mock_diode_client, mock_backend, tmp_path
+):
+    """Test that a run only ingests the entities changed since the last successful run."""
+    store = DigestStore(str(tmp_path))
+    mock_diode_client.ingest.return_value.errors = []
+    policy_runner.name = "delta_policy"
+    with patch("worker.policy.runner.get_digest_store", return_value=store):
+        policy_runner.run(mock_diode_client, mock_backend, sample_policy)
+        mock_backend.run.return_value.append(Entity(site=Site(name="site3")))
+        policy_runner.run(mock_diode_client, mock_backend, sample_policy)
+        policy_runner.run(mock_diode_client, mock_backend, sample_policy)
+
+        sample_policy.config.delta = False
+        policy_runner.run(mock_diode_client, mock_backend, sample_policy)
+
+    sent = [len(c.args[0]) for c in mock_diode_client.ingest.call_args_list]
+    assert sent == [2, 1, 3]
+    assert policy_runner.entities == 3
+    assert sample(UNCHANGED_ENTITIES, "orb_worker_unchanged_entities_total", "delta_policy") == 5
+
+
+def test_run_is_measured(policy_runner, sample_policy, mock_diode_client):
+    """Test that the resource usage and outcome of each run are exported and recorded."""
+
+    def generate(*args):
+        for i in range(7):
+            yield Entity(site=Site(name=f"site{i}"))
+
+    mock_diode_client.ingest.side_effect = [
+        MagicMock(errors=[]),
+        MagicMock(errors=["boom"]),
+        MagicMock(errors=[]),
+        MagicMock(errors=[]),
+        MagicMock(errors=[]),
+    ]
+    backend = MagicMock()
+    backend.run.side_effect = generate
+    policy_runner.name = "measured_policy"
+    policy_runner.chunk_entities = 3
+    ledger = RunLedger()
+
+    with patch("worker.policy.runner.get_run_ledger", return_value=ledger):
+        policy_runner.run(mock_diode_client, backend, sample_policy)
+        policy_runner.run(mock_diode_client, backend, sample_policy)
+
+    failed, succeeded = ledger.query()[::-1]
+    assert (failed["entities"], failed["ingested"], failed["chunks"]) == (6, 3, 2)
+    assert failed["error"] == "ingestion failed: ['boom']"
+    assert (succeeded["entities"], succeeded["ingested"], succeeded["chunks"]) == (7, 7, 3)
+    assert succeeded["error"] is None
+    for record in (failed, succeeded):
+        assert (record["policy"], record["package"], record["isolation"]) == (
+            "measured_policy",
+            "custom",
+            "thread",
+        )
+        assert record["cpu_seconds"] >= 0 and record["peak_rss_delta"] >= 0
+        assert record["wall_seconds"] >= record["ingest_seconds"] >= 0
+    assert sample(RUN_DURATION, "orb_worker_run_duration_seconds_count", "measured_policy") == 2
+    assert sample(ENTITIES, "orb_worker_entities_total", "measured_policy") == 13
+    assert sample(INGEST_ERRORS, "orb_worker_ingest_errors_total", "measured_policy") == 1
+    assert sample(RUN_ERRORS, "orb_worker_run_errors_total", "measured_policy") == 1
+
+
 def test_run_backend_exception(
     policy_runner,
     sample_policy,
@@ -178,11 +674,55 @@ def test_run_backend_exception(
     assert "Policy test_policy: Backend error" in caplog.text
 
 
-def test_stop_policy_runner(policy_runner):
-    """Test stopping the PolicyRunner."""
-    with patch.object(policy_runner.scheduler, "shutdown") as mock_shutdown:
+def test_runners_share_diode_client(
+    sample_policy, sample_diode_config, mock_load_class, mock_diode_client
+):
+    """Test that policies of the same backend share a client, closed with the last one."""
+    runners = [PolicyRunner(MagicMock()) for _ in range(2)]
+    for name, runner in zip(("policy1", "policy2"), runners):
+        runner.setup(name, sample_diode_config, sample_policy)
+
+    mock_diode_client.assert_called_once()
+    assert runners[0].client is runners[1].client
+    runners[0].stop()
+    mock_diode_client.return_value.close.assert_not_called()
+    runners[1].stop()
+    mock_diode_client.return_value.close.assert_called_once()
+
+
+def test_stop_tears_down_backend(
+    policy_runner, sample_policy, sample_diode_config, mock_load_class, mock_diode_client
+):
+    """Test that stopping the PolicyRunner tears down its backend."""
+    policy_runner.setup("policy1", sample_diode_config, sample_policy)
+    backend = policy_runner.backend
+
+    policy_runner.stop()
+
+    backend.setup.assert_called_once()
+    backend.teardown.assert_called_once()
+    assert policy_runner.backend is None
+
+
+def test_stop_policy_runner(
+    sample_policy, sample_diode_config, mock_load_class, mock_diode_client
+):
+    """Test that stopping the PolicyRunner only removes its jobs from the shared scheduler."""
+    scheduler = BackgroundScheduler()
+    other = scheduler.add_job(print, "interval", hours=1)
+    scheduler.start(paused=True)
+    try:
+        policy_runner = PolicyRunner(scheduler)
+        policy_runner.setup("policy1", sample_diode_config, sample_policy)
+        assert len(scheduler.get_jobs()) == 2
+
         policy_runner.stop()
 
-        # Ensure scheduler shutdown is called and status is updated
-        mock_shutdown.assert_called_once()
+        assert scheduler.running
+        assert scheduler.get_jobs() == [other]
+        assert policy_runner.job_ids == []
         assert policy_runner.status == Status.FINISHED
+        # Stopping again is harmless
+        policy_runner.stop()
+    finally:
+        scheduler.shutdown()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Splay Unit Tests."""
+
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.triggers.cron import CronTrigger
+
+from worker.policy.splay import SplayedTrigger, splay_offset
+
+
+def test_splay_offset_is_stable_and_bounded():
+    """Test that a policy keeps its offset and policies are spread over the window."""
+    offsets = {splay_offset(f"policy{i}", 60) for i in range(100)}
+    assert splay_offset("policy1", 60) == splay_offset("policy1", 60)
+    assert all(timedelta(0) <= o < timedelta(seconds=60) for o in offsets)
+    assert len(offsets) > 90
+    assert splay_offset("policy1", 0) == timedelta(0)
+
+
+def test_splayed_trigger_fire_times():
+    """Test that every fire time of the cron schedule is delayed by the offset."""
+    trigger = SplayedTrigger(
+        CronTrigger.from_crontab("0 * * * *", timezone=timezone.utc), timedelta(seconds=90)
+    )
+    now = datetime(2025, 1, 1, 10, 0, 30, tzinfo=timezone.utc)
+
+    first = trigger.get_next_fire_time(None, now)
+    # The 10:00 run is not due before 10:01:30
+    assert first == datetime(2025, 1, 1, 10, 1, 30, tzinfo=timezone.utc)
+    assert trigger.get_next_fire_time(first, first) == datetime(
+        2025, 1, 1, 11, 1, 30, tzinfo=timezone.utc
+    )
+    assert str(trigger).endswith("+ 90.0s")
@@ -2,12 +2,24 @@
 # Copyright 2025 NetBox Labs Inc
 """NetBox Labs - Backend Unit Tests."""
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from worker.backend import Backend, load_class
-from worker.models import Policy
+from worker.backend import (
+    AsyncBackend,
+    Backend,
+    BackendRegistry,
+    RunCancelled,
+    RunContext,
+    RunTimedOut,
+    call_run,
+    load_class,
+)
+from worker.models import Metadata, Policy
 
 
 @pytest.fixture
@@ -52,6 +64,21 @@ def test_load_class_valid_backend_class(mock_import_module):
     mock_import_module.assert_called_once_with(mock_module_name)
 
 
+def test_load_class_skips_imported_base_class(mock_import_module):
+    """Test that the Backend base classes imported by a module are not loaded."""
+
+    class MockBackend(Backend):
+        pass
+
+    mock_module = MagicMock()
+    setattr(mock_module, "AsyncBackend", AsyncBackend)
+    setattr(mock_module, "Backend", Backend)
+    setattr(mock_module, "MockBackend", MockBackend)
+    mock_import_module.return_value = mock_module
+
+    assert load_class("worker.test_module") == MockBackend
+
+
 def test_load_class_no_backend_class(mock_import_module):
     """Test that load_class raises RuntimeError if no Backend class is found."""
     mock_module_name = "worker.test_module"
@@ -88,3 +115,174 @@ def test_load_class_attribute_error(mock_import_module):
         match=f"Failed to load a class inheriting from 'Backend' in module '{mock_module_name}': Attribute error",
     ):
         load_class(mock_module_name)
+
+
+class CountingBackend(Backend):
+    """Backend counting its setups and teardowns."""
+
+    setups = 0
+    teardowns = 0
+
+    def setup(self) -> Metadata:
+        """Count the setup."""
+        type(self).setups += 1
+        return Metadata(name="counting", app_name="counting", app_version="1.0.0")
+
+    def teardown(self):
+        """Count the teardown."""
+        type(self).teardowns += 1
+
+
+def test_registry_caches_classes(mock_import_module):
+    """Test that a package is imported and searched once."""
+    mock_module = MagicMock()
+    setattr(mock_module, "CountingBackend", CountingBackend)
+    mock_import_module.return_value = mock_module
+    registry = BackendRegistry()
+
+    assert registry.load_class("worker.counting") is CountingBackend
+    assert registry.load_class("worker.counting") is CountingBackend
+    mock_import_module.assert_called_once_with("worker.counting")
+
+
+def test_registry_instance_per_policy():
+    """Test that each policy gets its own backend, set up and torn down."""
+
+    class PerPolicyBackend(CountingBackend):
+        pass
+
+    registry = BackendRegistry()
+    registry._classes["per_policy"] = PerPolicyBackend
+    (first, metadata), (second, _) = registry.acquire("per_policy"), registry.acquire("per_policy")
+
+    assert first is not second
+    assert metadata.app_name == "counting"
+    assert PerPolicyBackend.setups == 2
+    registry.release("per_policy", first)
+    assert PerPolicyBackend.teardowns == 1
+
+
+def test_registry_shared_instance():
+    """Test that a shared backend is set up with its first policy, torn down with the last."""
+
+    class SharedBackend(CountingBackend):
+        shared = True
+
+    registry = BackendRegistry()
+    registry._classes["shared"] = SharedBackend
+    first, _ = registry.acquire("shared")
+    second, _ = registry.acquire("shared")
+
+    assert first is second
+    assert (SharedBackend.setups, registry.users("shared")) == (1, 2)
+    registry.release("shared", first)
+    assert SharedBackend.teardowns == 0
+    registry.release("shared", second)
+    assert (SharedBackend.teardowns, registry.users("shared")) == (1, 0)
+
+    third, _ = registry.acquire("shared")
+    assert third is not first
+    assert SharedBackend.setups == 2
+
+
+def test_registry_shared_setup_does_not_block_other_packages():
+    """Test that a slow shared setup only holds up the policies of its package."""
+    started = threading.Event()
+    resume = threading.Event()
+
+    class SlowBackend(CountingBackend):
+        shared = True
+
+        def setup(self) -> Metadata:
+            started.set()
+            resume.wait(5)
+            return super().setup()
+
+    class OtherBackend(CountingBackend):
+        shared = True
+
+    registry = BackendRegistry()
+    registry._classes.update(slow=SlowBackend, other=OtherBackend)
+    with ThreadPoolExecutor(2) as executor:
+        first = executor.submit(registry.acquire, "slow")
+        assert started.wait(5)
+        second = executor.submit(registry.acquire, "slow")
+
+        other, _ = registry.acquire("other")
+        assert not first.done() and not second.done()
+        resume.set()
+
+        assert first.result(5)[0] is second.result(5)[0]
+    assert (SlowBackend.setups, registry.users("slow")) == (1, 2)
+    registry.release("other", other)
+
+
+def test_registry_shared_setup_failure():
+    """Test that a failed shared setup is retried by the next policy."""
+
+    class FailingBackend(CountingBackend):
+        shared = True
+
+        def setup(self) -> Metadata:
+            metadata = super().setup()
+            if type(self).setups == 1:
+                raise RuntimeError("setup failed")
+            return metadata
+
+    registry = BackendRegistry()
+    registry._classes["failing"] = FailingBackend
+    with pytest.raises(RuntimeError, match="setup failed"):
+        registry.acquire("failing")
+    assert registry.users("failing") == 0
+
+    registry.acquire("failing")
+    assert registry.users("failing") == 1
+
+
+def test_run_context_cancel():
+    """Test that a cancelled run stops at the next check or wait."""
+    reports = []
+    context = RunContext(on_report=reports.append)
+    context.report(items=1)
+    context.report(stage="collect")
+    context.check()
+    assert context.remaining() is None
+
+    context.cancel()
+
+    assert context.cancelled and not context.timed_out
+    assert context.wait(60)
+    with pytest.raises(RunCancelled, match="run cancelled"):
+        context.check()
+    assert context.progress == {"items": 1, "stage": "collect"}
+    assert reports == [{"items": 1}, {"stage": "collect"}]
+    assert context.updated is not None
+
+
+def test_run_context_deadline():
+    """Test that a run past its deadline times out."""
+    context = RunContext(timeout=0.05)
+    assert 0 < context.remaining() <= 0.05
+
+    start = time.monotonic()
+    assert context.wait(60)
+    assert time.monotonic() - start < 1
+    assert context.timed_out and context.remaining() == 0
+    with pytest.raises(RunTimedOut, match="run timed out after 0.05s"):
+        context.check()
+
+
+def test_call_run_passes_context_if_accepted():
+    """Test that the run context is only passed to backends taking it."""
+    context = RunContext()
+
+    class LegacyBackend(Backend):
+        def run(self, policy_name, policy):
+            return [policy_name]
+
+    class ContextBackend(Backend):
+        def run(self, policy_name, policy, context=None):
+            return [policy_name, context]
+
+    assert call_run(LegacyBackend(), "p", None, context) == ["p"]
+    assert call_run(ContextBackend(), "p", None, context) == ["p", context]
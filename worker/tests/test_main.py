@@ -32,6 +32,50 @@ def mock_uvicorn_run():
         yield mock
 
 
+@pytest.fixture(autouse=True)
+def mock_set_late_threshold():
+    """
+    Fixture to mock the set_late_threshold function.
+
+    Keeps the late run threshold of the other tests.
+    """
+    with patch("worker.main.set_late_threshold") as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_configure_digest_store():
+    """
+    Fixture to mock the configure_digest_store function.
+
+    Keeps the other tests from writing entity digests.
+    """
+    with patch("worker.main.configure_digest_store") as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_configure_run_ledger():
+    """
+    Fixture to mock the configure_run_ledger function.
+
+    Keeps the run ledger of the other tests.
+    """
+    with patch("worker.main.configure_run_ledger") as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_manager_setup():
+    """
+    Fixture to mock the PolicyManager.setup method.
+
+    Keeps the shared policy manager of the other tests.
+    """
+    with patch("worker.main.manager.setup") as mock:
+        yield mock
+
+
 def test_main_keyboard_interrupt(mock_parse_args):
     """Test handling of KeyboardInterrupt in main."""
     mock_parse_args.return_value = MagicMock(
@@ -45,7 +89,13 @@ def test_main_keyboard_interrupt(mock_parse_args):
             assert str(e) == "Test Exit"
 
 
-def test_main_with_config(mock_parse_args, mock_uvicorn_run):
+def test_main_with_config(
+    mock_parse_args,
+    mock_uvicorn_run,
+    mock_set_late_threshold,
+    mock_manager_setup,
+    mock_configure_digest_store,
+):
     """Test running the CLI with a configuration file and no environment file."""
     mock_parse_args.return_value = MagicMock(
         diode_target="grpc",
@@ -53,6 +103,15 @@ def test_main_with_config(mock_parse_args, mock_uvicorn_run):
         diode_app_name_prefix="test",
         host="0.0.0.0",
         port=1234,
+        late_threshold=5.0,
+        workers=4,
+        splay=30.0,
+        isolate=["nbl_custom"],
+        processes=2,
+        process_max_runs=10,
+        process_max_rss=512,
+        state_dir="/var/lib/orb",
+        resync_interval=3600.0,
     )
 
     with patch.object(sys, "exit", side_effect=Exception("Test Exit")):
@@ -63,6 +122,16 @@ def test_main_with_config(mock_parse_args, mock_uvicorn_run):
 
     mock_parse_args.assert_called_once()
     mock_uvicorn_run.assert_called_once()
+    mock_set_late_threshold.assert_called_once_with(5.0)
+    mock_configure_digest_store.assert_called_once_with("/var/lib/orb", 3600.0)
+    assert mock_manager_setup.call_args.kwargs == {
+        "max_workers": 4,
+        "splay": 30.0,
+        "isolated_packages": ["nbl_custom"],
+        "max_processes": 2,
+        "max_process_runs": 10,
+        "max_process_rss": 512 * 1024 * 1024,
+    }
 
 
 def test_main_start_server_failure(mock_parse_args, mock_uvicorn_run):
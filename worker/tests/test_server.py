@@ -164,6 +164,14 @@ def test_read_capabilities():
         mock_get_modules.assert_called_once()
 
 
+def test_read_metrics():
+    """Test the /metrics endpoint returns the Prometheus text format."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "orb_worker_scheduler_lag_seconds" in response.text
+
+
 def test_write_policy_valid_yaml(mock_valid_policy_request, valid_policy_yaml):
     """
     Test posting a valid YAML policy.
@@ -244,6 +252,17 @@ def test_write_policy_unexpected_parser_error():
         assert response.json() == {"detail": "unexpected error"}
 
 
+def test_write_policy_invalid_json():
+    """Test posting a malformed JSON policy."""
+    response = client.post(
+        "/api/v1/policies",
+        headers={"Content-Type": "application/json"},
+        content='{"policies": {',
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid JSON format"}
+
+
 def test_write_policy_invalid_content_type():
     """
     Test the /api/v1/policies endpoint with invalid content type.
@@ -253,13 +272,13 @@ def test_write_policy_invalid_content_type():
     """
     response = client.post(
         "/api/v1/policies",
-        headers={"content-type": "application/json"},
-        json={"policies": {"policy1": {}}},
+        headers={"content-type": "text/plain"},
+        content="policies: {}",
     )
     assert response.status_code == 400
     assert (
         response.json()["detail"]
-        == "invalid Content-Type. Only 'application/x-yaml' is supported"
+        == "invalid Content-Type. Only 'application/x-yaml' and 'application/json' are supported"
     )
 
 
@@ -394,3 +413,67 @@ def test_delete_policy_error(mock_manager):
     response = client.delete("/api/v1/policies/policy1")
     assert response.status_code == 400
     assert response.json()["detail"] == "unexpected error"
+
+
+def test_upsert_policy(mock_manager, valid_policy_yaml):
+    """Test creating or updating a policy with PUT."""
+    mock_manager.parse_policy.return_value = PolicyRequest.model_validate(
+        yaml.safe_load(valid_policy_yaml)
+    )
+    mock_manager.upsert_policies.return_value = {"policy1": {"status": "updated"}}
+    response = client.put(
+        "/api/v1/policies",
+        headers={"Content-Type": "application/x-yaml"},
+        content=valid_policy_yaml,
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "detail": "policy 'policy1' was updated",
+        "policies": {"policy1": {"status": "updated"}},
+    }
+
+
+def test_upsert_policy_error(mock_manager, valid_policy_yaml):
+    """Test that a policy failing to start fails the PUT."""
+    mock_manager.parse_policy.return_value = PolicyRequest.model_validate(
+        yaml.safe_load(valid_policy_yaml)
+    )
+    mock_manager.upsert_policies.side_effect = RuntimeError("backend setup failed")
+    response = client.put(
+        "/api/v1/policies",
+        headers={"Content-Type": "application/x-yaml"},
+        content=valid_policy_yaml,
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "backend setup failed"}
+
+
+def test_list_policies(mock_manager):
+    """Test listing the policies."""
+    mock_manager.list_policies.return_value = {"policies": [], "next_cursor": None}
+    response = client.get("/api/v1/policies", params={"limit": 10})
+    assert response.status_code == 200
+    assert response.json() == {"policies": [], "next_cursor": None}
+    mock_manager.list_policies.assert_called_once_with(None, 10)
+
+
+def test_read_policy(mock_manager):
+    """Test describing a policy."""
+    mock_manager.get_policy.side_effect = ValueError("policy 'policy1' not found")
+    response = client.get("/api/v1/policies/policy1")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "policy 'policy1' not found"}
+
+
+def test_list_runs(mock_manager):
+    """Test listing the recent runs, sorted by CPU time."""
+    mock_manager.list_runs.return_value = {"runs": []}
+    response = client.get(
+        "/api/v1/runs", params={"package": "custom", "sort": "cpu_seconds", "limit": 5}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"runs": []}
+    mock_manager.list_runs.assert_called_once_with(None, "custom", None, "cpu_seconds", 5)
+
+    response = client.get("/api/v1/runs", params={"sort": "name"})
+    assert response.status_code == 422
@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Synthetic worker backends namespace."""
+
+from worker_synthetic.shapes import SyntheticScope, build_entity
+
+__all__ = ["SyntheticScope", "build_entity"]
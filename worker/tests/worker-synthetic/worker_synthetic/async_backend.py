@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Synthetic async backend, run on the worker event loop."""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+from netboxlabs.diode.sdk.ingester import Entity
+from worker.backend import AsyncBackend
+from worker.models import Metadata, Policy
+
+from worker_synthetic.shapes import SyntheticScope, build_entity, burn
+
+
+class AsyncSyntheticBackend(AsyncBackend):
+    """Async backend producing synthetic entities, waiting without holding a thread."""
+
+    def setup(self) -> Metadata:
+        """Set up the backend."""
+        return Metadata(name="synthetic-async", app_name="worker-synthetic", app_version="0.0.1")
+
+    async def run(self, policy_name: str, policy: Policy) -> AsyncIterator[Entity]:
+        """Yield the entities, the CPU cost blocking the event loop as it would."""
+        scope = SyntheticScope(**policy.scope)
+        for i in range(scope.entities):
+            if scope.sleep_per_entity:
+                await asyncio.sleep(scope.sleep_per_entity)
+            else:
+                # Give the other runs of the loop a turn, as a real I/O bound backend would
+                await asyncio.sleep(0)
+            burn(scope.cpu_per_entity)
+            yield build_entity(scope.shape, policy_name, i)
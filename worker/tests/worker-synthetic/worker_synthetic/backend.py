@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Synthetic backend, returning or yielding its entities."""
+
+import time
+from collections.abc import Iterable, Iterator
+
+from netboxlabs.diode.sdk.ingester import Entity
+from worker.backend import Backend
+from worker.models import Metadata, Policy
+
+from worker_synthetic.shapes import SyntheticScope, build_entity, burn
+
+
+def _produce(policy_name: str, scope: SyntheticScope) -> Iterator[Entity]:
+    for i in range(scope.entities):
+        if scope.sleep_per_entity:
+            time.sleep(scope.sleep_per_entity)
+        burn(scope.cpu_per_entity)
+        yield build_entity(scope.shape, policy_name, i)
+
+
+class SyntheticBackend(Backend):
+    """Backend producing synthetic entities, as many and as costly as its scope says."""
+
+    def setup(self) -> Metadata:
+        """Set up the backend."""
+        return Metadata(name="synthetic", app_name="worker-synthetic", app_version="0.0.1")
+
+    def run(self, policy_name: str, policy: Policy) -> Iterable[Entity]:
+        """Return the entities as a list, or a generator in generator mode."""
+        scope = SyntheticScope(**policy.scope)
+        entities = _produce(policy_name, scope)
+        if scope.mode == "sync":
+            return list(entities)
+        return entities
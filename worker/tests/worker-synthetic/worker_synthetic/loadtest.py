@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Orb worker load harness using the synthetic backends."""
+
+import argparse
+import json
+import logging
+import resource
+import threading
+import time
+from datetime import datetime
+
+from apscheduler.events import EVENT_JOB_MISSED
+from diode_stub import percentiles, serve
+from worker.models import Config, DiodeConfig, Policy
+from worker.policy.ledger import DEFAULT_LEDGER_SIZE, configure_run_ledger, get_run_ledger
+from worker.policy.loop import get_event_loop
+from worker.policy.manager import PolicyManager
+from worker.policy.process import peak_rss_bytes, rss_bytes
+
+SYNC_PACKAGE = "worker_synthetic.backend"
+ASYNC_PACKAGE = "worker_synthetic.async_backend"
+
+
+class Sampler(threading.Thread):
+    """Background thread tracking peak thread count and RSS."""
+
+    def __init__(self, interval: float = 0.05):
+        """Initialize the sampler."""
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self.peak_rss = rss_bytes()
+        self._stopped = threading.Event()
+
+    def run(self):
+        """Sample until stopped."""
+        while not self._stopped.wait(self.interval):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss = max(self.peak_rss, rss_bytes())
+
+    def stop(self):
+        """Stop sampling."""
+        self._stopped.set()
+        self.join()
+
+
+def build_policy(args: argparse.Namespace) -> Policy:
+    """Build the policy every synthetic policy is a copy of."""
+    config = Config(
+        package=ASYNC_PACKAGE if args.mode == "async" else SYNC_PACKAGE,
+        isolation="process" if args.isolate else None,
+        timeout=args.run_timeout,
+    )
+    scope = {
+        "entities": args.entities,
+        "shape": args.shape,
+        "mode": "sync" if args.mode == "sync" else "generator",
+        "cpu_per_entity": args.cpu_per_entity,
+        "sleep_per_entity": args.sleep_per_entity,
+    }
+    return Policy(config=config, scope=scope)
+
+
+def wait_for_runs(manager: PolicyManager, names: list[str], missed: set[str], timeout: float) -> bool:
+    """Wait until every policy has run once, or one of them missed its run."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if missed or all(manager.runners[name].runs for name in names):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def run(args: argparse.Namespace, target: str) -> dict:
+    """
+    Load the synthetic policies into a PolicyManager and measure their one-time runs.
+
+    Args:
+    ----
+        args (argparse.Namespace): The harness options.
+        target (str): The Diode target.
+
+    Returns:
+    -------
+        dict: Throughput, dispatch lag, run durations, threads, memory and CPU time.
+
+    """
+    configure_run_ledger(max(args.policies, DEFAULT_LEDGER_SIZE))
+    manager = PolicyManager()
+    manager.setup(
+        DiodeConfig(target=target, api_key="load"),
+        max_workers=args.workers,
+        splay=args.splay,
+        max_processes=args.processes,
+    )
+    policy = build_policy(args)
+    names = [f"synthetic_{p}" for p in range(args.policies)]
+    # Time each one-time run is due, to measure how late it starts
+    scheduled = {}
+    # Runs dropped by the scheduler instead of waiting for a thread, failing the load test
+    jobs = {}
+    missed = set[str]()
+    manager.get_scheduler().add_listener(lambda event: missed.add(jobs.get(event.job_id)), EVENT_JOB_MISSED)
+    threads_before = threading.active_count()
+    rss_before = rss_bytes()
+    cpu_before = time.process_time()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    sampler = Sampler()
+    sampler.start()
+
+    start = time.perf_counter()
+    try:
+        for name in names:
+            manager.start_policy(name, policy.model_copy(deep=True))
+            job_id = manager.runners[name].job_ids[0]
+            jobs[job_id] = name
+            job = manager.scheduler.get_job(job_id)
+            if job is not None:
+                scheduled[name] = job.next_run_time
+        loaded = time.perf_counter() - start
+        completed = wait_for_runs(manager, names, missed, args.timeout)
+        elapsed = time.perf_counter() - start
+        cpu_seconds = time.process_time() - cpu_before
+        threads_peak = sampler.peak_threads
+        processes = manager.process_pool.processes() if manager.process_pool else 0
+    finally:
+        manager.stop()
+        get_event_loop().stop()
+        sampler.stop()
+    if missed:
+        raise RuntimeError(f"the scheduler dropped the runs of {len(missed)} policies: {sorted(missed)}")
+    # The backend processes were stopped with the manager
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    backend_cpu = usage.ru_utime + usage.ru_stime - children.ru_utime - children.ru_stime
+
+    runs = [r for r in get_run_ledger().query(limit=len(names)) if r["policy"] in scheduled]
+    starts = [datetime.fromisoformat(r["started"]) for r in runs]
+    lags = [(started - scheduled[r["policy"]]).total_seconds() for r, started in zip(runs, starts)]
+    # From the first run starting to the last one ending
+    window = (
+        max(s.timestamp() + r["wall_seconds"] for r, s in zip(runs, starts)) - min(starts).timestamp()
+        if runs
+        else 0.0
+    )
+    produced = sum(r["entities"] for r in runs)
+    ingested = sum(r["ingested"] or 0 for r in runs)
+    return {
+        "policies": args.policies,
+        "entities_per_run": args.entities,
+        "shape": args.shape,
+        "mode": args.mode,
+        "isolation": "process" if args.isolate else "thread",
+        "workers": args.workers,
+        "completed": completed,
+        "runs": len(runs),
+        "failed_runs": sum(1 for r in runs if r["error"] is not None),
+        "load_seconds": round(loaded, 6),
+        "wall_seconds": round(elapsed, 6),
+        "run_window_seconds": round(window, 6),
+        "entities_produced": produced,
+        "entities_ingested": ingested,
+        "entities_per_second": round(ingested / window, 1) if window else 0.0,
+        "dispatch_lag_seconds": percentiles(lags),
+        "run_wall_seconds": percentiles([r["wall_seconds"] for r in runs]),
+        "ingest_seconds": percentiles([r["ingest_seconds"] for r in runs]),
+        "cpu_seconds": round(cpu_seconds, 6),
+        "backend_processes_cpu_seconds": round(backend_cpu, 6) if processes else 0.0,
+        "threads": {"before": threads_before, "peak": threads_peak, "after": threading.active_count()},
+        "memory": {
+            "rss_before_bytes": rss_before,
+            "peak_rss_bytes": sampler.peak_rss,
+            "max_rss_bytes": peak_rss_bytes(),
+            "rss_after_bytes": rss_bytes(),
+        },
+        "backend_processes": processes,
+        "backend_processes_max_rss_bytes": usage.ru_maxrss * 1024 if processes else 0,
+    }
+
+
+def main():
+    """Run the load harness and print a JSON report."""
+    parser = argparse.ArgumentParser(description="Orb worker load harness")
+    parser.add_argument("-m", "--policies", default=100, help="Synthetic policies, each run once", type=int)
+    parser.add_argument("-e", "--entities", default=1000, help="Entities per run", type=int)
+    parser.add_argument(
+        "--shape", default="device", choices=["site", "device", "interface", "ip_address"], help="Kind of entity"
+    )
+    parser.add_argument(
+        "--mode",
+        default="generator",
+        choices=["sync", "generator", "async"],
+        help="Backend returning a list, yielding its entities, or async",
+    )
+    parser.add_argument("--cpu-per-entity", default=0.0, help="CPU seconds spent per entity", type=float)
+    parser.add_argument("--sleep-per-entity", default=0.0, help="Seconds waited per entity", type=float)
+    parser.add_argument("-w", "--workers", default=10, help="Worker --workers", type=int)
+    parser.add_argument("--splay", default=0.0, help="Worker --splay", type=float)
+    parser.add_argument("--isolate", action="store_true", help="Run the backends in the process pool")
+    parser.add_argument("--processes", default=4, help="Worker --processes", type=int)
+    parser.add_argument("--run-timeout", default=None, help="Policy timeout (s)", type=float)
+    parser.add_argument("--delay", default=0.0, help="Stand-in delay per request (s)", type=float)
+    parser.add_argument("--jitter", default=0.0, help="Stand-in random extra delay (s)", type=float)
+    parser.add_argument("-t", "--diode-target", default=None, help="Diode target, an in-process stand-in when omitted", type=str)
+    parser.add_argument("--timeout", default=600.0, help="Maximum seconds to wait for the runs", type=float)
+    parser.add_argument("--log-level", default="WARNING", help="Level of the worker logs", type=str)
+    args = parser.parse_args()
+    for logger in ("worker", "apscheduler"):
+        logging.getLogger(logger).setLevel(args.log_level)
+
+    stub = None
+    target = args.diode_target
+    if target is None:
+        server, port, stub = serve(delay=args.delay, jitter=args.jitter, seed=0)
+        target = f"grpc://127.0.0.1:{port}"
+    try:
+        report = run(args, target)
+    finally:
+        if stub is not None:
+            server.stop(grace=1)
+    if stub is not None:
+        report["server"] = stub.stats.snapshot()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""NetBox Labs - Synthetic entities and the scope describing them."""
+
+import time
+from typing import Literal
+
+from netboxlabs.diode.sdk.ingester import Device, Entity, Interface, IPAddress, Site
+from pydantic import BaseModel, Field
+
+# Interfaces per synthetic device for the interface and ip_address shapes
+PORTS = 48
+
+
+class SyntheticScope(BaseModel):
+    """Validation model for the scope of a synthetic policy."""
+
+    entities: int = Field(1000, ge=0, description="Entities produced by a run")
+    shape: Literal["site", "device", "interface", "ip_address"] = Field(
+        "device", description="Kind of entity, from a bare site to an address nested in an interface"
+    )
+    mode: Literal["sync", "generator"] = Field(
+        "generator", description="Return a list, or yield the entities one at a time (sync backend)"
+    )
+    cpu_per_entity: float = Field(0.0, ge=0, description="CPU seconds spent producing each entity")
+    sleep_per_entity: float = Field(0.0, ge=0, description="Seconds waited before producing each entity")
+
+
+def burn(seconds: float):
+    """Keep the CPU busy for the given CPU time of the calling thread."""
+    if seconds <= 0:
+        return
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+def _device(policy_name: str, i: int) -> Device:
+    return Device(
+        name=f"{policy_name}-device-{i}",
+        device_type="Synthetic 9000",
+        manufacturer="NetBox Labs",
+        platform="synthetic",
+        site=f"{policy_name}-site",
+        role="synthetic",
+        serial=f"SN-{i:08d}",
+        status="active",
+        tags=["synthetic"],
+    )
+
+
+def _interface(policy_name: str, i: int) -> Interface:
+    return Interface(
+        name=f"Ethernet{i % PORTS}",
+        device=_device(policy_name, i // PORTS),
+        type="10gbase-t",
+        enabled=True,
+        mtu=9214,
+        mac_address=f"00:1c:73:{(i >> 16) & 0xFF:02x}:{(i >> 8) & 0xFF:02x}:{i & 0xFF:02x}",
+        speed=10000000,
+        description=f"synthetic port {i}",
+    )
+
+
+def build_entity(shape: str, policy_name: str, i: int) -> Entity:
+    """
+    Build the i-th synthetic entity of a policy.
+
+    Args:
+    ----
+        shape (str): Kind of entity, "site", "device", "interface" or "ip_address".
+        policy_name (str): Policy name, making the entities of each policy distinct.
+        i (int): Index of the entity in the run.
+
+    Returns:
+    -------
+        Entity: The entity, the same for a given shape, policy and index.
+
+    """
+    if shape == "site":
+        return Entity(site=Site(name=f"{policy_name}-site-{i}"))
+    if shape == "device":
+        return Entity(device=_device(policy_name, i))
+    if shape == "interface":
+        return Entity(interface=_interface(policy_name, i))
+    return Entity(
+        ip_address=IPAddress(
+            address=f"10.{(i >> 16) & 0xFF}.{(i >> 8) & 0xFF}.{i & 0xFF}/31",
+            interface=_interface(policy_name, i),
+            status="active",
+        )
+    )
@@ -4,15 +4,162 @@
 
 import importlib
 import inspect
-from collections.abc import Iterable
+import threading
+import time
+from collections.abc import AsyncIterable, Callable, Iterable
+from concurrent.futures import Future
+from datetime import datetime, timezone
 
 from netboxlabs.diode.sdk.ingester import Entity
 
 from worker.models import Metadata, Policy
 
 
+class RunCancelled(Exception):
+    """Raised by `RunContext.check` once the run was cancelled."""
+
+
+class RunTimedOut(RunCancelled):
+    """Raised by `RunContext.check` once the run is past its deadline."""
+
+
+class RunContext:
+    """
+    Context of a backend run.
+
+    A backend whose `run` method takes a `context` keyword argument receives the context
+    of each run. It should call `check` regularly, which raises once the policy is
+    deleted or the run is past the `timeout` of the policy, and can `report` its progress.
+    """
+
+    def __init__(
+        self,
+        timeout: float | None = None,
+        on_report: Callable[[dict], None] | None = None,
+    ):
+        """
+        Initialize the context of a run starting now.
+
+        Args:
+        ----
+            timeout (float | None): Maximum duration of the run, in seconds.
+            on_report (Callable[[dict], None] | None): Called with each progress report.
+
+        """
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.progress = {}
+        self.updated = None
+        self._on_report = on_report
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float | None:
+        """
+        Return the time left before the deadline.
+
+        Returns
+        -------
+            float | None: Seconds left, 0 once past the deadline, None without deadline.
+
+        """
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    @property
+    def timed_out(self) -> bool:
+        """Whether the run is past its deadline."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the run was cancelled or is past its deadline."""
+        return self._cancelled.is_set() or self.timed_out
+
+    def cancel(self):
+        """Cancel the run."""
+        self._cancelled.set()
+
+    def check(self):
+        """
+        Raise if the run should stop.
+
+        Raises
+        ------
+            RunTimedOut: If the run is past its deadline.
+            RunCancelled: If the run was cancelled.
+
+        """
+        if self._cancelled.is_set():
+            raise RunCancelled("run cancelled")
+        if self.timed_out:
+            raise RunTimedOut(f"run timed out after {self.timeout}s")
+
+    def wait(self, seconds: float) -> bool:
+        """
+        Sleep, waking up early if the run is cancelled or reaches its deadline.
+
+        Args:
+        ----
+            seconds (float): Time to sleep.
+
+        Returns:
+        -------
+            bool: Whether the run should stop.
+
+        """
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        self._cancelled.wait(seconds)
+        return self.cancelled
+
+    def report(self, **progress):
+        """
+        Report the progress of the run, such as counts of processed items.
+
+        Args:
+        ----
+            **progress: Progress values, merged with the previous ones.
+
+        """
+        self.progress.update(progress)
+        self.updated = datetime.now(timezone.utc)
+        if self._on_report is not None:
+            self._on_report(progress)
+
+
+def call_run(backend: "Backend", policy_name: str, policy: Policy, context: RunContext):
+    """
+    Call the run method of a backend, with the run context if it takes one.
+
+    Args:
+    ----
+        backend (Backend): The backend.
+        policy_name (str): The name of the policy.
+        policy (Policy): The policy to run.
+        context (RunContext): The context of the run.
+
+    Returns:
+    -------
+        The result of `run`.
+
+    """
+    if "context" in inspect.signature(backend.run).parameters:
+        return backend.run(policy_name, policy, context=context)
+    return backend.run(policy_name, policy)
+
+
 class Backend:
-    """Backend Class."""
+    """
+    Backend Class.
+
+    Every policy gets its own backend instance, unless the class sets `shared`: its
+    policies then share one instance, set up with the first policy and torn down with
+    the last one. A shared backend must support concurrent runs.
+    """
+
+    shared = False
 
     def setup(self) -> Metadata:
         """
@@ -25,6 +172,9 @@ class Backend:
         """
         raise NotImplementedError("The 'setup' method must be implemented.")
 
+    def teardown(self):
+        """Release the resources acquired by `setup`, once no policy uses the backend."""
+
     def run(self, policy_name: str, policy: Policy) -> Iterable[Entity]:
         """
         Run the backend.
@@ -42,6 +192,34 @@ class Backend:
         raise NotImplementedError("The 'run' method must be implemented.")
 
 
+class AsyncBackend(Backend):
+    """
+    Backend Class for I/O-bound backends.
+
+    `run` is a coroutine returning the entities, or an async generator yielding them.
+    It runs on the event loop of the worker, so many policies can wait on I/O at the
+    same time without holding a thread each.
+    """
+
+    async def run(
+        self, policy_name: str, policy: Policy
+    ) -> Iterable[Entity] | AsyncIterable[Entity]:
+        """
+        Run the backend.
+
+        Args:
+        ----
+            policy_name (str): The name of the policy.
+            policy (Policy): The policy to run.
+
+        Returns:
+        -------
+            Iterable[Entity] | AsyncIterable[Entity]: The entities produced by the backend
+
+        """
+        raise NotImplementedError("The 'run' method must be implemented.")
+
+
 def load_class(module_name: str) -> type[Backend]:
     """
     Dynamically load a class from a given module and ensure it conforms to Backend.
@@ -54,10 +232,124 @@ def load_class(module_name: str) -> type[Backend]:
     try:
         module = importlib.import_module(module_name)
         for _, obj in inspect.getmembers(module):
-            if inspect.isclass(obj) and issubclass(obj, Backend):
+            if (
+                inspect.isclass(obj)
+                and issubclass(obj, Backend)
+                and obj not in (Backend, AsyncBackend)
+            ):
                 return obj
         raise ImportError("No class inheriting 'Backend'")
     except (ImportError, AttributeError) as e:
         raise RuntimeError(
             f"Failed to load a class inheriting from 'Backend' in module '{module_name}': {e}"
         )
+
+
+def _shared_backend(future: Future) -> Backend | None:
+    if not future.done() or future.exception() is not None:
+        return None
+    return future.result()[0]
+
+
+class BackendRegistry:
+    """Registry of the backend classes, and of the shared backend instances, by package."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._classes = dict[str, type[Backend]]()
+        # Future of the shared instance and its metadata, and number of policies, by
+        # package; the instance is set up outside of the lock, which only guards the dict
+        self._shared = dict[str, tuple[Future, int]]()
+        self._lock = threading.Lock()
+
+    def load_class(self, package: str) -> type[Backend]:
+        """
+        Return the backend class of a package, loading it on first use.
+
+        Args:
+        ----
+            package (str): The module name.
+
+        Returns:
+        -------
+            type[Backend]: The backend class.
+
+        """
+        cls = self._classes.get(package)
+        if cls is None:
+            cls = load_class(package)
+            with self._lock:
+                cls = self._classes.setdefault(package, cls)
+        return cls
+
+    def acquire(self, package: str) -> tuple[Backend, Metadata]:
+        """
+        Return a set up backend for a policy.
+
+        A shared backend is set up by its first policy, the policies acquiring it
+        meanwhile waiting for the setup without holding up the other packages.
+
+        Args:
+        ----
+            package (str): The module name.
+
+        Returns:
+        -------
+            tuple[Backend, Metadata]: The backend, to be released when the policy
+                stops, and its metadata.
+
+        """
+        cls = self.load_class(package)
+        if not cls.shared:
+            backend = cls()
+            return backend, backend.setup()
+        with self._lock:
+            future, users = self._shared.get(package, (None, 0))
+            setup = future is None
+            if setup:
+                future = Future()
+            self._shared[package] = (future, users + 1)
+        if setup:
+            # The policies acquiring the backend meanwhile wait for its setup
+            try:
+                backend = cls()
+                future.set_result((backend, backend.setup()))
+            except BaseException as e:
+                with self._lock:
+                    if self._shared.get(package, (None,))[0] is future:
+                        del self._shared[package]
+                future.set_exception(e)
+                raise
+        return future.result()
+
+    def release(self, package: str, backend: Backend):
+        """
+        Release the backend of a stopped policy, tearing it down if no policy uses it.
+
+        Args:
+        ----
+            package (str): The module name.
+            backend (Backend): A backend returned by `acquire`.
+
+        """
+        with self._lock:
+            future, users = self._shared.get(package, (None, 0))
+            if future is not None and _shared_backend(future) is backend:
+                if users > 1:
+                    self._shared[package] = (future, users - 1)
+                    return
+                del self._shared[package]
+        backend.teardown()
+
+    def users(self, package: str) -> int:
+        """Return the number of policies using the shared backend of a package."""
+        with self._lock:
+            return self._shared.get(package, (None, 0))[1]
+
+
+_registry = BackendRegistry()
+
+
+def get_backend_registry() -> BackendRegistry:
+    """Return the registry of the backends loaded by the worker."""
+    return _registry
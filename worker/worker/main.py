@@ -10,6 +10,11 @@ import netboxlabs.diode.sdk.version as SdkVersion
 import uvicorn
 
 from worker.models import DiodeConfig
+from worker.policy.digests import DEFAULT_RESYNC_INTERVAL, configure_digest_store
+from worker.policy.executor import DEFAULT_LATE_THRESHOLD, set_late_threshold
+from worker.policy.ledger import DEFAULT_LEDGER_SIZE, configure_run_ledger
+from worker.policy.manager import DEFAULT_MAX_WORKERS
+from worker.policy.process import DEFAULT_MAX_PROCESSES, DEFAULT_MAX_RUNS
 from worker.server import app, manager
 from worker.version import version_semver
 
@@ -69,8 +74,90 @@ def main():
         required=False,
     )
 
+    parser.add_argument(
+        "-w",
+        "--workers",
+        default=DEFAULT_MAX_WORKERS,
+        help="Maximum number of policies running concurrently",
+        type=int,
+        required=False,
+    )
+    parser.add_argument(
+        "--splay",
+        default=0.0,
+        help="Seconds over which scheduled policies sharing a schedule are spread, "
+        "each policy being delayed by a fixed offset derived from its name",
+        type=float,
+        required=False,
+    )
+    parser.add_argument(
+        "--isolate",
+        action="append",
+        default=[],
+        help="Package whose backend runs in a separate process, unless its policies set "
+        "'isolation: thread'. Can be repeated",
+        metavar="PACKAGE",
+        required=False,
+    )
+    parser.add_argument(
+        "--processes",
+        default=DEFAULT_MAX_PROCESSES,
+        help="Maximum number of backend processes",
+        type=int,
+        required=False,
+    )
+    parser.add_argument(
+        "--process-max-runs",
+        default=DEFAULT_MAX_RUNS,
+        help="Number of runs after which a backend process is replaced",
+        type=int,
+        required=False,
+    )
+    parser.add_argument(
+        "--process-max-rss",
+        default=None,
+        help="Memory, in MiB, above which a backend process is replaced after its run",
+        type=int,
+        required=False,
+    )
+    parser.add_argument(
+        "--state-dir",
+        default=None,
+        help="Directory keeping the digests of the entities sent by each policy. When set, "
+        "runs only ingest the entities new or changed since the last run",
+        type=str,
+        required=False,
+    )
+    parser.add_argument(
+        "--resync-interval",
+        default=DEFAULT_RESYNC_INTERVAL,
+        help="Seconds between full runs of a policy, ingesting every entity, when "
+        "--state-dir is set",
+        type=float,
+        required=False,
+    )
+    parser.add_argument(
+        "--run-ledger-size",
+        default=DEFAULT_LEDGER_SIZE,
+        help="Number of recent runs kept, with their resource usage, for /api/v1/runs",
+        type=int,
+        required=False,
+    )
+    parser.add_argument(
+        "-l",
+        "--late-threshold",
+        default=DEFAULT_LATE_THRESHOLD,
+        help="Seconds after their scheduled time above which runs are counted as late and logged",
+        type=float,
+        required=False,
+    )
+
     try:
         args = parser.parse_args()
+        set_late_threshold(args.late_threshold)
+        configure_run_ledger(args.run_ledger_size)
+        if args.state_dir:
+            configure_digest_store(args.state_dir, args.resync_interval)
         api_key = args.diode_api_key
         if api_key.startswith("${") and api_key.endswith("}"):
             env_var = api_key[2:-1]
@@ -79,7 +166,17 @@ def main():
         config = DiodeConfig(
             target=args.diode_target, prefix=args.diode_app_name_prefix, api_key=api_key
         )
-        manager.setup(config)
+        manager.setup(
+            config,
+            max_workers=args.workers,
+            splay=args.splay,
+            isolated_packages=args.isolate,
+            max_processes=args.processes,
+            max_process_runs=args.process_max_runs,
+            max_process_rss=(
+                args.process_max_rss * 1024 * 1024 if args.process_max_rss else None
+            ),
+        )
         uvicorn.run(
             app,
             host=args.host,
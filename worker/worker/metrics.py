@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""Orb Worker Prometheus metrics."""
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Dispatch lag is expected to stay well under a second on a healthy worker.
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Runs take from under a second to the better part of an hour.
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+# A single chunk ingestion is a round trip to Diode.
+INGEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Growth of the peak RSS, from none to gigabytes.
+RSS_BUCKETS = tuple(2**n for n in range(20, 34, 2))
+
+SCHEDULER_LAG = Histogram(
+    "orb_worker_scheduler_lag_seconds",
+    "Delay between a job's scheduled fire time and the moment it starts running",
+    ["policy"],
+    buckets=LAG_BUCKETS,
+)
+LATE_RUNS = Counter(
+    "orb_worker_late_runs",
+    "Jobs that started later than the late run threshold after their scheduled fire time",
+    ["policy"],
+)
+UNCHANGED_ENTITIES = Counter(
+    "orb_worker_unchanged_entities",
+    "Entities not ingested because they did not change since the last run of their policy",
+    ["policy"],
+)
+TIMED_OUT_RUNS = Counter(
+    "orb_worker_timed_out_runs",
+    "Runs stopped because they exceeded the timeout of their policy",
+    ["policy"],
+)
+
+RUN_DURATION = Histogram(
+    "orb_worker_run_duration_seconds",
+    "Wall time of the runs, from the start of the backend to the last ingestion",
+    ["policy", "package"],
+    buckets=DURATION_BUCKETS,
+)
+RUN_CPU = Histogram(
+    "orb_worker_run_cpu_seconds",
+    "CPU time of the runs, the backend process included for isolated backends",
+    ["policy", "package"],
+    buckets=DURATION_BUCKETS,
+)
+RUN_PEAK_RSS_DELTA = Histogram(
+    "orb_worker_run_peak_rss_delta_bytes",
+    "Growth of the peak RSS during the runs, of the backend process for isolated backends",
+    ["policy", "package"],
+    buckets=RSS_BUCKETS,
+)
+RUN_ERRORS = Counter(
+    "orb_worker_run_errors",
+    "Runs that ended with an error, timed out and cancelled runs included",
+    ["policy", "package"],
+)
+ENTITIES = Counter(
+    "orb_worker_entities",
+    "Entities produced by the backends, before unchanged entities are skipped",
+    ["policy", "package"],
+)
+INGEST_LATENCY = Histogram(
+    "orb_worker_ingest_latency_seconds",
+    "Duration of the ingestion of a chunk of entities",
+    ["policy", "package"],
+    buckets=INGEST_BUCKETS,
+)
+INGEST_ERRORS = Counter(
+    "orb_worker_ingest_errors",
+    "Chunk ingestions that failed or were rejected by Diode",
+    ["policy", "package"],
+)
+
+
+def forget_package(policy: str, package: str):
+    """
+    Drop the series of the runs of a policy with a package it no longer uses.
+
+    Args:
+    ----
+        policy (str): Policy name.
+        package (str): Package of the backend.
+
+    """
+    for metric in (
+        RUN_DURATION,
+        RUN_CPU,
+        RUN_PEAK_RSS_DELTA,
+        RUN_ERRORS,
+        ENTITIES,
+        INGEST_LATENCY,
+        INGEST_ERRORS,
+    ):
+        try:
+            metric.remove(policy, package)
+        except KeyError:
+            pass
+
+
+def forget_policy(policy: str, package: str):
+    """
+    Drop the series of a deleted policy, so they are not reported forever.
+
+    Args:
+    ----
+        policy (str): Policy name.
+        package (str): Package of the backend.
+
+    """
+    forget_package(policy, package)
+    for metric in (SCHEDULER_LAG, LATE_RUNS, TIMED_OUT_RUNS, UNCHANGED_ENTITIES):
+        try:
+            metric.remove(policy)
+        except KeyError:
+            pass
+
+
+def latest() -> tuple[bytes, str]:
+    """
+    Render the metrics in the Prometheus text format.
+
+    Returns
+    -------
+        tuple[bytes, str]: The payload and its content type.
+
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -3,7 +3,7 @@
 """Orb Worker Models."""
 
 from enum import Enum
-from typing import Any
+from typing import Any, Literal
 
 from croniter import CroniterBadCronError, croniter
 from pydantic import BaseModel, ConfigDict, Field, field_validator
@@ -41,6 +41,18 @@ class Config(BaseModel):
     model_config = ConfigDict(extra="allow")
     package: str
     schedule: str | None = Field(default=None, description="cron interval, optional")
+    delta: bool = Field(
+        default=True,
+        description="only ingest the entities changed since the last run, "
+        "when the worker keeps entity digests",
+    )
+    timeout: float | None = Field(
+        default=None, gt=0, description="maximum run duration in seconds, optional"
+    )
+    isolation: Literal["thread", "process"] | None = Field(
+        default=None,
+        description="run the backend in a worker thread or in a separate process, optional",
+    )
 
     @field_validator("schedule")
     @classmethod
@@ -57,6 +69,8 @@ class Config(BaseModel):
             ValueError: If the cron schedule format is invalid.
 
         """
+        if value is None:
+            return value
         try:
             croniter(value)
         except CroniterBadCronError:
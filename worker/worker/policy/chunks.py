@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""Orb Worker chunked ingestion."""
+
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from netboxlabs.diode.sdk.ingester import Entity
+
+# Diode rejects gRPC messages above 4 MiB, keep room for the request envelope
+DEFAULT_CHUNK_ENTITIES = 1000
+DEFAULT_CHUNK_BYTES = 3 * 1024 * 1024
+
+# Field tag and length prefix of an entity in the IngestRequest
+_ENTITY_OVERHEAD = 6
+
+
+class _Chunker:
+    """Accumulate entities into chunks bounded by count and size."""
+
+    __slots__ = ("max_entities", "max_bytes", "chunk", "size")
+
+    def __init__(self, max_entities: int, max_bytes: int):
+        if max_entities < 1 or max_bytes < 1:
+            raise ValueError("chunk limits must be greater than 0")
+        self.max_entities = max_entities
+        self.max_bytes = max_bytes
+        self.chunk = list[Entity]()
+        self.size = 0
+
+    def add(self, entity: Entity) -> list[tuple[list[Entity], int]]:
+        """Add an entity, returning the chunks it completes."""
+        full = []
+        entity_size = entity.ByteSize() + _ENTITY_OVERHEAD
+        if self.chunk and self.size + entity_size > self.max_bytes:
+            full.append(self.flush())
+        self.chunk.append(entity)
+        self.size += entity_size
+        if len(self.chunk) >= self.max_entities:
+            full.append(self.flush())
+        return full
+
+    def flush(self) -> tuple[list[Entity], int]:
+        """Return the current chunk and start a new one."""
+        chunk, size = self.chunk, self.size
+        self.chunk, self.size = [], 0
+        return chunk, size
+
+
+def chunked(
+    entities: Iterable[Entity | None],
+    max_entities: int = DEFAULT_CHUNK_ENTITIES,
+    max_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> Iterator[tuple[list[Entity], int]]:
+    """
+    Split entities into chunks, pulling them from the iterable one chunk at a time.
+
+    The next entity is only requested once the previous chunk was consumed, so a
+    generator is paused while a chunk is ingested and at most one chunk is held in
+    memory. An entity larger than `max_bytes` is sent in a chunk of its own.
+
+    Args:
+    ----
+        entities (Iterable[Entity | None]): The entities, None values are skipped.
+        max_entities (int): Maximum number of entities in a chunk.
+        max_bytes (int): Maximum estimated size of a chunk, in bytes.
+
+    Returns:
+    -------
+        Iterator[tuple[list[Entity], int]]: Each chunk, with its estimated size.
+
+    """
+    chunker = _Chunker(max_entities, max_bytes)
+    for entity in entities:
+        if entity is not None:
+            yield from chunker.add(entity)
+    if chunker.chunk:
+        yield chunker.flush()
+
+
+async def achunked(
+    entities: Iterable[Entity | None] | AsyncIterable[Entity | None],
+    max_entities: int = DEFAULT_CHUNK_ENTITIES,
+    max_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> AsyncIterator[tuple[list[Entity], int]]:
+    """
+    Split entities into chunks like `chunked`, for async backends.
+
+    Args:
+    ----
+        entities (Iterable[Entity | None] | AsyncIterable[Entity | None]): The entities,
+            from an iterable or an async iterable, None values are skipped.
+        max_entities (int): Maximum number of entities in a chunk.
+        max_bytes (int): Maximum estimated size of a chunk, in bytes.
+
+    Returns:
+    -------
+        AsyncIterator[tuple[list[Entity], int]]: Each chunk, with its estimated size.
+
+    """
+    if not isinstance(entities, AsyncIterable):
+        for chunk in chunked(entities, max_entities, max_bytes):
+            yield chunk
+        return
+    chunker = _Chunker(max_entities, max_bytes)
+    async for entity in entities:
+        if entity is not None:
+            for chunk in chunker.add(entity):
+                yield chunk
+    if chunker.chunk:
+        yield chunker.flush()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""Orb Worker shared Diode clients."""
+
+import logging
+import threading
+
+from netboxlabs.diode.sdk import DiodeClient
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ClientKey = tuple[str, str, str, str | None]
+
+
+class ClientPool:
+    """
+    Diode clients shared by the policies with the same target and producer app.
+
+    Each client holds a gRPC channel, which is safe to use from several threads. The
+    pool counts the policies using each client and closes it when the last one lets
+    it go.
+    """
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._clients = dict[ClientKey, DiodeClient]()
+        self._references = dict[ClientKey, int]()
+        self._keys = dict[int, ClientKey]()
+        self._lock = threading.Lock()
+
+    def acquire(
+        self, target: str, app_name: str, app_version: str, api_key: str | None
+    ) -> DiodeClient:
+        """
+        Return a client, creating it if no policy uses the same one.
+
+        Args:
+        ----
+            target (str): Diode target.
+            app_name (str): Producer app name.
+            app_version (str): Producer app version.
+            api_key (str | None): Diode API key.
+
+        Returns:
+        -------
+            DiodeClient: The shared client, to be released when no longer used.
+
+        """
+        key = (target, app_name, app_version, api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = DiodeClient(
+                    target=target,
+                    app_name=app_name,
+                    app_version=app_version,
+                    api_key=api_key,
+                )
+                self._clients[key] = client
+                self._references[key] = 0
+                self._keys[id(client)] = key
+            self._references[key] += 1
+            return client
+
+    def release(self, client: DiodeClient):
+        """
+        Release a client, closing it if no other policy uses it.
+
+        Args:
+        ----
+            client (DiodeClient): A client returned by `acquire`.
+
+        """
+        with self._lock:
+            key = self._keys.get(id(client))
+            if key is None:
+                return
+            self._references[key] -= 1
+            if self._references[key] > 0:
+                return
+            del self._clients[key], self._references[key], self._keys[id(client)]
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close Diode client for '{key[1]}': {e}")
+
+    def references(self, client: DiodeClient) -> int:
+        """Return the number of policies using a client."""
+        with self._lock:
+            key = self._keys.get(id(client))
+            return self._references[key] if key is not None else 0
+
+    def __len__(self) -> int:
+        """Return the number of open clients."""
+        with self._lock:
+            return len(self._clients)
+
+
+_client_pool = ClientPool()
+
+
+def get_client_pool() -> ClientPool:
+    """Return the pool of clients shared by the policies."""
+    return _client_pool
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""Orb Worker entity digests for delta ingestion."""
+
+import hashlib
+import logging
+import os
+import struct
+import time
+from array import array
+
+from netboxlabs.diode.sdk.ingester import Entity
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESYNC_INTERVAL = 24 * 60 * 60
+
+# Magic, time of the last full run, number of digests
+_HEADER = struct.Struct("<8sdQ")
+_MAGIC = b"ORBDGST1"
+
+
+def entity_digest(entity: Entity) -> int:
+    """
+    Return a stable digest of an entity.
+
+    Args:
+    ----
+        entity (Entity): The entity.
+
+    Returns:
+    -------
+        int: A 64-bit digest of its deterministic serialization.
+
+    """
+    data = entity.SerializeToString(deterministic=True)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class DeltaRun:
+    """Entities of a run, filtered against the digests of the last run."""
+
+    __slots__ = ("path", "previous", "full", "current", "unchanged", "_synced")
+
+    def __init__(self, path: str, previous: set[int] | None, synced: float | None):
+        """
+        Initialize the run.
+
+        Args:
+        ----
+            path (str): File the digests of the policy are saved to.
+            previous (set[int] | None): Digests of the last run, None for a full run.
+            synced (float | None): Time of the last full run.
+
+        """
+        self.path = path
+        self.previous = previous
+        self.full = previous is None
+        self.current = set[int]()
+        self.unchanged = 0
+        self._synced = time.time() if self.full else synced
+
+    def select(self, chunk: list[Entity]) -> list[Entity]:
+        """
+        Return the entities of a chunk to ingest.
+
+        Args:
+        ----
+            chunk (list[Entity]): Entities produced by the backend.
+
+        Returns:
+        -------
+            list[Entity]: The entities new or changed since the last run, or all of them
+                on a full run.
+
+        """
+        selected = []
+        for entity in chunk:
+            digest = entity_digest(entity)
+            self.current.add(digest)
+            if self.full or digest not in self.previous:
+                selected.append(entity)
+        self.unchanged += len(chunk) - len(selected)
+        return selected
+
+    def commit(self):
+        """Save the digests of a successful run, replacing those of the last run."""
+        digests = array("Q", sorted(self.current))
+        temp = f"{self.path}.tmp"
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, self._synced, len(digests)))
+            digests.tofile(f)
+        os.replace(temp, self.path)
+
+
+class DigestStore:
+    """
+    Digests of the entities last sent by each policy, kept in a directory.
+
+    A run only ingests the entities whose digest changed since the last successful run
+    of its policy. A full run, ingesting every entity, happens once every
+    `resync_interval` seconds, and when the digests are missing or unreadable.
+    """
+
+    def __init__(self, directory: str, resync_interval: float = DEFAULT_RESYNC_INTERVAL):
+        """
+        Open the store, creating its directory if needed.
+
+        Args:
+        ----
+            directory (str): Directory of the digest files.
+            resync_interval (float): Seconds between full runs of a policy.
+
+        """
+        if resync_interval <= 0:
+            raise ValueError("resync_interval must be greater than 0")
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.directory = directory
+        self.resync_interval = resync_interval
+
+    def path(self, policy: str) -> str:
+        """Return the digest file of a policy."""
+        name = hashlib.blake2b(policy.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{name}.digests")
+
+    def begin(self, policy: str) -> DeltaRun:
+        """
+        Start a run of a policy.
+
+        Args:
+        ----
+            policy (str): Policy name.
+
+        Returns:
+        -------
+            DeltaRun: The run, to commit once its entities are all ingested.
+
+        """
+        path = self.path(policy)
+        try:
+            with open(path, "rb") as f:
+                magic, synced, count = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC:
+                    raise ValueError("not a digest file")
+                digests = array("Q")
+                digests.fromfile(f, count)
+        except FileNotFoundError:
+            return DeltaRun(path, None, None)
+        except (OSError, ValueError, EOFError, struct.error) as e:
+            logger.warning(f"Policy {policy}: Ignoring unreadable digests: {e}")
+            return DeltaRun(path, None, None)
+        if time.time() - synced >= self.resync_interval:
+            return DeltaRun(path, None, None)
+        return DeltaRun(path, set(digests), synced)
+
+    def delete(self, policy: str):
+        """
+        Delete the digests of a policy.
+
+        Args:
+        ----
+            policy (str): Policy name.
+
+        """
+        try:
+            os.remove(self.path(policy))
+        except FileNotFoundError:
+            pass
+
+
+_store = None
+
+
+def configure_digest_store(directory: str, resync_interval: float = DEFAULT_RESYNC_INTERVAL):
+    """
+    Enable delta ingestion, keeping the entity digests in a directory.
+
+    Args:
+    ----
+        directory (str): Directory of the digest files.
+        resync_interval (float): Seconds between full runs of a policy.
+
+    """
+    global _store
+    _store = DigestStore(directory, resync_interval)
+    logger.info(f"Keeping entity digests in '{directory}'")
+
+
+def get_digest_store() -> DigestStore | None:
+    """Return the configured store, None when every run ingests all its entities."""
+    return _store
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""Orb Worker instrumented job executor."""
+
+import logging
+from datetime import datetime, timezone
+
+from apscheduler.executors.base import run_job
+from apscheduler.executors.pool import ThreadPoolExecutor
+
+from worker.metrics import LATE_RUNS, SCHEDULER_LAG
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATE_THRESHOLD = 30.0
+# Dispatch lag, in seconds, above which a run is counted as late and logged
+late_threshold = DEFAULT_LATE_THRESHOLD
+
+
+def set_late_threshold(seconds: float):
+    """
+    Set the dispatch lag above which a run is late.
+
+    Args:
+    ----
+        seconds (float): The threshold, in seconds.
+
+    """
+    global late_threshold
+    if seconds <= 0:
+        raise ValueError("the late run threshold must be greater than 0")
+    late_threshold = seconds
+
+
+class InstrumentedThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    APScheduler thread pool executor reporting the dispatch lag of each job.
+
+    The lag is measured when a pool thread actually picks the job up, which includes
+    the time spent waiting for a free thread. Jobs are labelled with their name, the
+    policy name. Runs starting more than `late_threshold` seconds late are counted and
+    logged.
+    """
+
+    def _do_submit_job(self, job, run_times):
+        policy = job.name
+        logger_name = self._logger.name
+
+        def execute():
+            lag = (datetime.now(timezone.utc) - run_times[0]).total_seconds()
+            # A run past its misfire grace time is dropped by run_job, not started
+            grace = job.misfire_grace_time
+            if grace is None or lag <= grace:
+                SCHEDULER_LAG.labels(policy).observe(max(lag, 0.0))
+                if lag > late_threshold:
+                    LATE_RUNS.labels(policy).inc()
+                    logger.warning(
+                        f"Policy {policy}: Job {job.id} started {lag:.1f}s after its scheduled "
+                        f"time, the executor may be undersized"
+                    )
+            return run_job(job, job._jobstore_alias, run_times, logger_name)
+
+        def callback(f):
+            exc = f.exception()
+            if exc:
+                self._run_job_error(job.id, exc, exc.__traceback__)
+            else:
+                self._run_job_success(job.id, f.result())
+
+        f = self._pool.submit(execute)
+        f.add_done_callback(callback)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""Orb Worker run ledger."""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from worker.policy.process import peak_rss_bytes
+
+DEFAULT_LEDGER_SIZE = 1000
+
+# Fields the runs can be sorted by, the largest first
+SORT_FIELDS = ("started", "wall_seconds", "cpu_seconds", "peak_rss_delta", "entities")
+
+
+class RunRecord:
+    """
+    Resource usage and outcome of a run.
+
+    The record is created in the thread starting the run, and measures the CPU time of
+    that thread. The CPU time of an async run is not measured, the event loop
+    interleaving the runs of every policy.
+    """
+
+    __slots__ = (
+        "policy",
+        "package",
+        "isolation",
+        "started",
+        "wall_seconds",
+        "cpu_seconds",
+        "peak_rss_delta",
+        "entities",
+        "ingested",
+        "chunks",
+        "ingest_seconds",
+        "error",
+        "_start",
+        "_cpu",
+        "_peak",
+    )
+
+    def __init__(self, policy: str, package: str, isolation: str):
+        """
+        Start measuring a run.
+
+        Args:
+        ----
+            policy (str): Policy name.
+            package (str): Package of the backend.
+            isolation (str): Where the backend runs, "thread", "process" or "async".
+
+        """
+        self.policy = policy
+        self.package = package
+        self.isolation = isolation
+        self.started = datetime.now(timezone.utc)
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_delta = None
+        self.entities = 0
+        self.ingested = None
+        self.chunks = 0
+        self.ingest_seconds = 0.0
+        self.error = None
+        self._start = time.perf_counter()
+        self._cpu = time.thread_time() if isolation != "async" else None
+        self._peak = peak_rss_bytes()
+
+    def finish(
+        self,
+        ingested: int | None,
+        error: str | None,
+        usage: dict | None = None,
+    ):
+        """
+        Stop measuring the run.
+
+        Args:
+        ----
+            ingested (int | None): Number of entities ingested, None if the run failed.
+            error (str | None): Error of the run.
+            usage (dict | None): CPU time and peak RSS growth of the backend process,
+                added to those of the worker for an isolated backend.
+
+        """
+        self.wall_seconds = round(time.perf_counter() - self._start, 6)
+        if self._cpu is not None:
+            self.cpu_seconds = time.thread_time() - self._cpu
+        # Peak RSS of the worker, shared by the runs of every policy
+        self.peak_rss_delta = max(peak_rss_bytes() - self._peak, 0)
+        if usage:
+            self.cpu_seconds = (self.cpu_seconds or 0.0) + usage.get("cpu_seconds", 0.0)
+            self.peak_rss_delta = max(self.peak_rss_delta, usage.get("peak_rss_delta", 0))
+        if self.cpu_seconds is not None:
+            self.cpu_seconds = round(self.cpu_seconds, 6)
+        self.ingest_seconds = round(self.ingest_seconds, 6)
+        self.ingested = ingested
+        self.error = error
+
+    def to_dict(self) -> dict:
+        """
+        Return the record as a JSON-compatible dict.
+
+        Returns
+        -------
+            dict: Policy, package, isolation, start time, wall and CPU time, peak RSS
+                  growth, entities produced and ingested, chunks, time spent
+                  ingesting and error of the run.
+
+        """
+        return {
+            "policy": self.policy,
+            "package": self.package,
+            "isolation": self.isolation,
+            "started": self.started.isoformat(),
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_delta": self.peak_rss_delta,
+            "entities": self.entities,
+            "ingested": self.ingested,
+            "chunks": self.chunks,
+            "ingest_seconds": self.ingest_seconds,
+            "error": self.error,
+        }
+
+
+class RunLedger:
+    """Most recent runs of every policy, the oldest being dropped once full."""
+
+    def __init__(self, size: int = DEFAULT_LEDGER_SIZE):
+        """
+        Initialize the ledger.
+
+        Args:
+        ----
+            size (int): Maximum number of runs kept.
+
+        """
+        if size < 1:
+            raise ValueError("size must be greater than 0")
+        self.size = size
+        self._records = deque[RunRecord](maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, record: RunRecord):
+        """
+        Add a finished run.
+
+        Args:
+        ----
+            record (RunRecord): The run.
+
+        """
+        with self._lock:
+            self._records.append(record)
+
+    def query(
+        self,
+        policy: str | None = None,
+        package: str | None = None,
+        failed: bool | None = None,
+        sort: str = "started",
+        limit: int = 100,
+    ) -> list[dict]:
+        """
+        Return the runs matching the filters.
+
+        Args:
+        ----
+            policy (str | None): Only the runs of this policy.
+            package (str | None): Only the runs of this package.
+            failed (bool | None): Only the failed runs if True, the successful ones if
+                False.
+            sort (str): Field the runs are sorted by, the largest first.
+            limit (int): Maximum number of runs.
+
+        Returns:
+        -------
+            list[dict]: The runs, the most recent first when sorted by start time.
+
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"cannot sort by '{sort}', expected one of {SORT_FIELDS}")
+        with self._lock:
+            records = list(self._records)
+        records.reverse()
+        records = [
+            r
+            for r in records
+            if (policy is None or r.policy == policy)
+            and (package is None or r.package == package)
+            and (failed is None or (r.error is not None) == failed)
+        ]
+        if sort != "started":
+            # Unmeasured values come last, the order of the runs being kept for ties
+            records.sort(
+                key=lambda r: (
+                    getattr(r, sort) is not None,
+                    getattr(r, sort) or 0,
+                ),
+                reverse=True,
+            )
+        return [r.to_dict() for r in records[:limit]]
+
+    def __len__(self) -> int:
+        """Return the number of runs kept."""
+        with self._lock:
+            return len(self._records)
+
+
+_ledger = RunLedger()
+
+
+def configure_run_ledger(size: int = DEFAULT_LEDGER_SIZE):
+    """
+    Replace the ledger, keeping up to `size` runs.
+
+    Args:
+    ----
+        size (int): Maximum number of runs kept.
+
+    """
+    global _ledger
+    _ledger = RunLedger(size)
+
+
+def get_run_ledger() -> RunLedger:
+    """Return the ledger shared by the policies."""
+    return _ledger
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""Orb Worker event loop for async backends."""
+
+import asyncio
+import concurrent.futures
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads running the blocking calls of async runs, such as the Diode ingestion
+DEFAULT_BLOCKING_WORKERS = 4
+
+
+class EventLoopThread:
+    """
+    Event loop running in a dedicated thread.
+
+    Async backends of every policy run on this loop, and their blocking calls on a
+    small thread pool, so hundreds of runs waiting on I/O share a handful of threads.
+    """
+
+    def __init__(self, blocking_workers: int = DEFAULT_BLOCKING_WORKERS):
+        """
+        Initialize the loop, its thread is started on first use.
+
+        Args:
+        ----
+            blocking_workers (int): Number of threads running blocking calls.
+
+        """
+        self.blocking_workers = blocking_workers
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(
+                    ThreadPoolExecutor(
+                        self.blocking_workers, thread_name_prefix="orb-worker-blocking"
+                    )
+                )
+                self._thread = threading.Thread(
+                    target=loop.run_forever, name="orb-worker-loop", daemon=True
+                )
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coroutine: Coroutine) -> concurrent.futures.Future:
+        """
+        Run a coroutine on the loop.
+
+        Args:
+        ----
+            coroutine (Coroutine): The coroutine.
+
+        Returns:
+        -------
+            concurrent.futures.Future: Its future, cancelling it cancels the coroutine.
+
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._start())
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Cancel the running coroutines and stop the loop.
+
+        Args:
+        ----
+            timeout (float): Seconds to wait for the coroutines to finish cancelling.
+
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def cancel():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_default_executor()
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel(), loop).result(timeout)
+        except (concurrent.futures.TimeoutError, RuntimeError):
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+
+
+_event_loop = EventLoopThread()
+
+
+def get_event_loop() -> EventLoopThread:
+    """Return the event loop shared by the async backends."""
+    return _event_loop
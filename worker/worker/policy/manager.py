@@ -2,12 +2,22 @@
 # Copyright 2025 NetBox Labs Inc
 """Orb Worker Policy Manager."""
 
+import json
 import logging
 import os
+import threading
+from bisect import bisect_left, bisect_right
 
 import yaml
+from apscheduler.schedulers.background import BackgroundScheduler
 
+from worker.metrics import forget_package, forget_policy
 from worker.models import DiodeConfig, Policy, PolicyRequest
+from worker.policy.digests import get_digest_store
+from worker.policy.executor import InstrumentedThreadPoolExecutor
+from worker.policy.ledger import get_run_ledger
+from worker.policy.loop import get_event_loop
+from worker.policy.process import DEFAULT_MAX_PROCESSES, DEFAULT_MAX_RUNS, ProcessPool
 from worker.policy.runner import PolicyRunner
 
 # Set up logging
@@ -38,29 +48,138 @@ def resolve_env_vars(config):
     return config
 
 
+class PolicyLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+    """
+    Safe YAML loader resolving `${VAR}` values while the document is constructed.
+
+    Mapping keys are left as written. Uses the libyaml parser when PyYAML was built
+    with it.
+    """
+
+    def construct_mapping(self, node: yaml.MappingNode, deep: bool = False) -> dict:
+        """Construct a mapping, its string keys not resolving environment variables."""
+        self.flatten_mapping(node)
+        for key_node, _ in node.value:
+            if key_node.tag == "tag:yaml.org,2002:str":
+                self.constructed_objects.setdefault(key_node, self.construct_scalar(key_node))
+        return super().construct_mapping(node, deep)
+
+
+def _construct_str(loader: PolicyLoader, node: yaml.ScalarNode) -> str:
+    value = loader.construct_scalar(node)
+    if value.startswith("${") and value.endswith("}"):
+        return os.getenv(value[2:-1], value)
+    return value
+
+
+PolicyLoader.add_constructor("tag:yaml.org,2002:str", _construct_str)
+
+
+DEFAULT_MAX_WORKERS = 10
+
+
 class PolicyManager:
     """Policy Manager class."""
 
     def __init__(self):
         """Initialize the PolicyManager instance with an empty list of policies."""
         self.runners = dict[str, PolicyRunner]()
+        # Sorted policy names, replaced rather than modified so readers need no lock
+        self.policy_names = list[str]()
         self.config = None
         self.loaded_modules = set()
+        self.max_workers = DEFAULT_MAX_WORKERS
+        self.splay = 0.0
+        # Scheduler shared by every policy, started with the first one
+        self.scheduler = None
+        self._scheduler_lock = threading.Lock()
+        # Packages whose backends run in the process pool, unless a policy says otherwise
+        self.isolated_packages = set[str]()
+        self.max_processes = DEFAULT_MAX_PROCESSES
+        self.max_process_runs = DEFAULT_MAX_RUNS
+        self.max_process_rss = None
+        self.process_pool = None
 
     def get_loaded_modules(self):
         """Return the loaded modules."""
         return self.loaded_modules
 
-    def setup(self, config: DiodeConfig):
+    def setup(
+        self,
+        config: DiodeConfig,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        splay: float = 0.0,
+        isolated_packages: list[str] | None = None,
+        max_processes: int = DEFAULT_MAX_PROCESSES,
+        max_process_runs: int = DEFAULT_MAX_RUNS,
+        max_process_rss: int | None = None,
+    ):
         """
         Set up the Policy Manager.
 
         Args:
         ----
             config(DiodeConfig): The Diode configuration.
+            max_workers(int): Maximum number of policies running concurrently.
+            splay(float): Window, in seconds, over which policies sharing a schedule
+                          are spread.
+            isolated_packages(list[str] | None): Packages whose backends run in the
+                          process pool by default.
+            max_processes(int): Maximum number of backend processes.
+            max_process_runs(int): Number of runs after which a process is replaced.
+            max_process_rss(int | None): RSS, in bytes, above which a process is replaced.
 
         """
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+        if max_processes < 1 or max_process_runs < 1:
+            raise ValueError("max_processes and max_process_runs must be greater than 0")
         self.config = config
+        self.max_workers = max_workers
+        self.splay = splay
+        self.isolated_packages = set(isolated_packages or [])
+        self.max_processes = max_processes
+        self.max_process_runs = max_process_runs
+        self.max_process_rss = max_process_rss
+
+    def get_scheduler(self) -> BackgroundScheduler:
+        """Return the scheduler shared by the policies, starting it on first use."""
+        with self._scheduler_lock:
+            if self.scheduler is None:
+                # Runs waiting for a free thread are delayed, never dropped as misfired
+                self.scheduler = BackgroundScheduler(
+                    executors={
+                        "default": InstrumentedThreadPoolExecutor(self.max_workers)
+                    },
+                    job_defaults={"misfire_grace_time": None, "coalesce": True},
+                )
+                self.scheduler.start()
+            return self.scheduler
+
+    def get_process_pool(self, policy: Policy) -> ProcessPool | None:
+        """
+        Return the process pool if the backend of the policy runs in a process.
+
+        Args:
+        ----
+            policy(Policy): Policy configuration.
+
+        Returns:
+        -------
+            ProcessPool | None: The pool, started on first use, or None for a thread.
+
+        """
+        isolation = policy.config.isolation
+        if isolation is None and policy.config.package in self.isolated_packages:
+            isolation = "process"
+        if isolation != "process":
+            return None
+        with self._scheduler_lock:
+            if self.process_pool is None:
+                self.process_pool = ProcessPool(
+                    self.max_processes, self.max_process_runs, self.max_process_rss
+                )
+            return self.process_pool
 
     def start_policy(self, name: str, policy: Policy):
         """
@@ -74,27 +193,113 @@ class PolicyManager:
         """
         if self.policy_exists(name):
             raise ValueError(f"policy '{name}' already exists")
+        self._add_runner(name, policy, self._setup_runner(name, policy))
+
+    def upsert_policy(self, name: str, policy: Policy) -> dict:
+        """
+        Start a policy, or restart it if a different version is running.
+
+        Args:
+        ----
+            name: Policy name
+            policy: Policy configuration
 
-        runner = PolicyRunner()
-        runner.setup(name, self.config, policy)
+        Returns:
+        -------
+            dict: "status", one of "started", "updated" or "unchanged".
+
+        """
+        return self.upsert_policies({name: policy})[name]
+
+    def upsert_policies(self, policies: dict[str, Policy]) -> dict:
+        """
+        Start or restart the policies whose version differs from the running one.
+
+        Every new version is set up before any is swapped in, so when one fails the
+        running policies are left untouched.
+
+        Args:
+        ----
+            policies: Policy configurations, by name.
+
+        Returns:
+        -------
+            dict: By name, "status", one of "started", "updated" or "unchanged".
+
+        """
+        results = {}
+        ready = dict[str, PolicyRunner]()
+        try:
+            for name, policy in policies.items():
+                current = self.runners.get(name)
+                if current is not None and current.policy == policy:
+                    results[name] = {"status": "unchanged"}
+                    continue
+                ready[name] = self._setup_runner(name, policy)
+                results[name] = {"status": "started" if current is None else "updated"}
+        except Exception:
+            for runner in ready.values():
+                runner.stop()
+            raise
+        for name, runner in ready.items():
+            previous = self.runners.get(name)
+            self._add_runner(name, policies[name], runner)
+            if previous is not None:
+                previous.stop()
+                self._delete_digests(name)
+                if previous.policy.config.package != runner.policy.config.package:
+                    forget_package(name, previous.policy.config.package)
+        return results
+
+    def _setup_runner(self, name: str, policy: Policy) -> PolicyRunner:
+        runner = PolicyRunner(self.get_scheduler())
+        runner.setup(
+            name,
+            self.config,
+            policy,
+            self.splay,
+            process_pool=self.get_process_pool(policy),
+        )
+        return runner
+
+    def _add_runner(self, name: str, policy: Policy, runner: PolicyRunner):
         self.loaded_modules.add(policy.config.package)
         self.runners[name] = runner
-
-    def parse_policy(self, config_data: bytes) -> PolicyRequest:
+        names = list(self.policy_names)
+        index = bisect_left(names, name)
+        if names[index : index + 1] != [name]:
+            names.insert(index, name)
+            self.policy_names = names
+
+    @staticmethod
+    def _delete_digests(name: str):
+        # The next version of the policy starts with a full run
+        digests = get_digest_store()
+        if digests is not None:
+            digests.delete(name)
+
+    def parse_policy(
+        self, config_data: bytes, content_type: str = "application/x-yaml"
+    ) -> PolicyRequest:
         """
-        Parse the YAML configuration data into a Policy object.
+        Parse the YAML or JSON configuration data into a Policy object.
 
         Args:
         ----
-            config_data (str): The YAML configuration data as a string.
+            config_data (bytes): The configuration data.
+            content_type (str): "application/x-yaml" or "application/json".
 
         Returns:
         -------
             Config: The configuration object.
 
         """
-        config = yaml.safe_load(config_data)
-        config = resolve_env_vars(config)
+        if content_type == "application/json":
+            if b"${" not in config_data:
+                return PolicyRequest.model_validate_json(config_data)
+            config = resolve_env_vars(json.loads(config_data))
+        else:
+            config = yaml.load(config_data, Loader=PolicyLoader)
         return PolicyRequest(**config)
 
     def policy_exists(self, name: str) -> bool:
@@ -123,8 +328,84 @@ class PolicyManager:
         """
         if not self.policy_exists(name):
             raise ValueError(f"policy '{name}' not found")
-        self.runners[name].stop()
-        del self.runners[name]
+        runner = self.runners.pop(name)
+        runner.stop()
+        self._delete_digests(name)
+        forget_policy(name, runner.policy.config.package)
+        names = list(self.policy_names)
+        index = bisect_left(names, name)
+        if names[index : index + 1] == [name]:
+            del names[index]
+        self.policy_names = names
+
+    def list_policies(self, cursor: str | None = None, limit: int = 100) -> dict:
+        """
+        List the policies, sorted by name.
+
+        Args:
+        ----
+            cursor: Last policy name of the previous page, None for the first page.
+            limit: Maximum number of policies.
+
+        Returns:
+        -------
+            dict: The summary of each policy of the page, and the next page cursor.
+
+        """
+        names = self.policy_names
+        start = bisect_right(names, cursor) if cursor is not None else 0
+        page = names[start : start + limit]
+        policies = []
+        for name in page:
+            runner = self.runners.get(name)
+            if runner is not None:
+                policies.append(runner.summary())
+        next_cursor = page[-1] if page and start + limit < len(names) else None
+        return {"policies": policies, "next_cursor": next_cursor}
+
+    def get_policy(self, name: str) -> dict:
+        """
+        Describe a policy and the outcome of its last run.
+
+        Args:
+        ----
+            name: Policy name.
+
+        Returns:
+        -------
+            dict: The policy summary.
+
+        """
+        runner = self.runners.get(name)
+        if runner is None:
+            raise ValueError(f"policy '{name}' not found")
+        return runner.summary()
+
+    def list_runs(
+        self,
+        policy: str | None = None,
+        package: str | None = None,
+        failed: bool | None = None,
+        sort: str = "started",
+        limit: int = 100,
+    ) -> dict:
+        """
+        List the recent runs recorded in the run ledger.
+
+        Args:
+        ----
+            policy: Only the runs of this policy.
+            package: Only the runs of this package.
+            failed: Only the failed runs if True, the successful ones if False.
+            sort: Field the runs are sorted by, the largest first.
+            limit: Maximum number of runs.
+
+        Returns:
+        -------
+            dict: The resource usage and outcome of each run.
+
+        """
+        return {"runs": get_run_ledger().query(policy, package, failed, sort, limit)}
 
     def stop(self):
         """Stop all running policies."""
@@ -132,3 +413,11 @@ class PolicyManager:
             logger.info(f"Stopping policy '{name}'")
             runner.stop()
         self.runners = []
+        self.policy_names = []
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+            self.scheduler = None
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+            self.process_pool = None
+        get_event_loop().stop()
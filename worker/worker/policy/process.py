@@ -0,0 +1,444 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""Orb Worker process-isolated backend pool."""
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import resource
+import signal
+import sys
+import threading
+from collections.abc import Iterator
+from multiprocessing.connection import Connection
+
+from netboxlabs.diode.sdk.diode.v1.ingester_pb2 import IngestRequest
+
+from worker.backend import (
+    AsyncBackend,
+    Backend,
+    BackendRegistry,
+    RunContext,
+    call_run,
+    get_backend_registry,
+)
+from worker.models import Metadata, Policy
+from worker.policy.chunks import achunked, chunked
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PROCESSES = 4
+DEFAULT_MAX_RUNS = 100
+
+# Requests sent to the worker processes
+_RUN = 0
+_METADATA = 1
+
+# Messages sent by the worker processes
+_CHUNK = 0
+_DONE = 1
+_ERROR = 2
+_PROGRESS = 3
+
+# Longest wait for a message before checking whether the run was cancelled
+_POLL_INTERVAL = 0.5
+
+
+def rss_bytes() -> int:
+    """
+    Return the resident set size of the current process.
+
+    Returns
+    -------
+        int: The current RSS, or the peak RSS where the current one is not available.
+
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """
+    Return the peak resident set size of the current process.
+
+    Returns
+    -------
+        int: The highest RSS reached since the process started.
+
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _usage(before: resource.struct_rusage, peak: int) -> tuple[int, float, int]:
+    """Return the RSS, and the CPU time and peak RSS growth since the start of a run."""
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime
+    return rss_bytes(), cpu, max(peak_rss_bytes() - peak, 0)
+
+
+async def _stream_async(
+    conn: Connection,
+    backend: AsyncBackend,
+    name: str,
+    policy: Policy,
+    context: RunContext,
+    *limits: int,
+):
+    entities = call_run(backend, name, policy, context)
+    if inspect.isawaitable(entities):
+        entities = await entities
+    async for chunk, size in achunked(entities, *limits):
+        conn.send((_CHUNK, IngestRequest(entities=chunk).SerializeToString(), size))
+
+
+def _release(registry: BackendRegistry, backends: dict[str, tuple[Backend, Metadata]]):
+    """Tear down the backends set up by the process."""
+    for package, (backend, _) in backends.items():
+        try:
+            registry.release(package, backend)
+        except Exception as e:
+            logger.error(f"Backend '{package}' teardown failed: {e}")
+
+
+def _acquire(
+    registry: BackendRegistry, backends: dict[str, tuple[Backend, Metadata]], package: str
+) -> tuple[Backend, Metadata]:
+    entry = backends.get(package)
+    if entry is None:
+        entry = backends[package] = registry.acquire(package)
+    return entry
+
+
+def _run(
+    conn: Connection,
+    registry: BackendRegistry,
+    backends: dict[str, tuple[Backend, Metadata]],
+    package: str,
+    name: str,
+    policy_json: str,
+    max_entities: int,
+    max_bytes: int,
+    timeout: float | None,
+):
+    context = RunContext(timeout, on_report=lambda progress: conn.send((_PROGRESS, progress, 0)))
+    before, peak = resource.getrusage(resource.RUSAGE_SELF), peak_rss_bytes()
+    try:
+        backend, _ = _acquire(registry, backends, package)
+        policy = Policy.model_validate_json(policy_json)
+        if isinstance(backend, AsyncBackend):
+            asyncio.run(
+                _stream_async(conn, backend, name, policy, context, max_entities, max_bytes)
+            )
+        else:
+            for chunk, size in chunked(
+                call_run(backend, name, policy, context), max_entities, max_bytes
+            ):
+                data = IngestRequest(entities=chunk).SerializeToString()
+                conn.send((_CHUNK, data, size))
+                del chunk, data
+    except Exception as e:
+        conn.send((_ERROR, str(e), _usage(before, peak)))
+    else:
+        conn.send((_DONE, None, _usage(before, peak)))
+
+
+def _serve(conn: Connection):
+    """Serve the requests of the parent, streaming back the chunks of the runs."""
+    # Interrupts are handled by the parent, which stops its processes
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    registry = get_backend_registry()
+    # Every backend is set up once per process, and torn down when it stops
+    backends = {}
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            request = None
+        if request is None:
+            _release(registry, backends)
+            return
+        kind, package, *args = request
+        if kind == _RUN:
+            _run(conn, registry, backends, package, *args)
+            continue
+        try:
+            _, metadata = _acquire(registry, backends, package)
+        except Exception as e:
+            conn.send((_ERROR, str(e), None))
+        else:
+            conn.send((_DONE, metadata, None))
+
+
+class _Process:
+    """A worker process and the connection to it."""
+
+    __slots__ = ("process", "conn", "runs")
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child,), name="orb-worker-backend", daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.runs = 0
+
+    def stop(self, timeout: float = 5.0):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ProcessPool:
+    """
+    Pool of long-lived processes running `Backend.run`.
+
+    A CPU-bound backend running in a process does not hold the GIL of the worker, and
+    the memory it leaks is returned when the process is recycled, after `max_runs` runs
+    or once its RSS exceeds `max_rss`. Each process imports and sets up the backends it
+    runs once. The entities are chunked in the process and every chunk is sent back as
+    a serialized protobuf message; the process blocks while the pipe is full, so it
+    never gets more than a chunk ahead of the ingestion.
+    """
+
+    def __init__(
+        self,
+        max_processes: int = DEFAULT_MAX_PROCESSES,
+        max_runs: int = DEFAULT_MAX_RUNS,
+        max_rss: int | None = None,
+    ):
+        """
+        Initialize the pool, processes are started on demand.
+
+        Args:
+        ----
+            max_processes (int): Maximum number of processes, and of concurrent runs.
+            max_runs (int): Number of runs after which a process is replaced.
+            max_rss (int | None): RSS, in bytes, above which a process is replaced.
+
+        """
+        if max_processes < 1 or max_runs < 1:
+            raise ValueError("max_processes and max_runs must be greater than 0")
+        self.max_processes = max_processes
+        self.max_runs = max_runs
+        self.max_rss = max_rss
+        self.recycled = 0
+        # Spawned processes do not inherit the locks and threads of the worker
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = list[_Process]()
+        self._busy = set[_Process]()
+        self._starting = 0
+        self._condition = threading.Condition()
+        self._shutdown = False
+
+    def _acquire(self) -> _Process:
+        with self._condition:
+            while not self._idle and len(self._busy) + self._starting >= self.max_processes:
+                if self._shutdown:
+                    raise RuntimeError("the process pool was shut down")
+                self._condition.wait()
+            if self._shutdown:
+                raise RuntimeError("the process pool was shut down")
+            if self._idle:
+                process = self._idle.pop()
+                self._busy.add(process)
+                return process
+            self._starting += 1
+        try:
+            process = _Process(self._context)
+        except BaseException:
+            with self._condition:
+                self._starting -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._starting -= 1
+            self._busy.add(process)
+        return process
+
+    def _release(self, process: _Process, state: str):
+        with self._condition:
+            self._busy.discard(process)
+            if state == "idle" and not self._shutdown:
+                self._idle.append(process)
+                process = None
+            self._condition.notify()
+        if process is None:
+            return
+        if state == "abandoned":
+            # The process is still streaming the entities of the run
+            process.kill()
+        else:
+            process.stop()
+
+    def run(
+        self,
+        package: str,
+        name: str,
+        policy: Policy,
+        max_entities: int,
+        max_bytes: int,
+        context: RunContext | None = None,
+        usage: dict | None = None,
+    ) -> Iterator[tuple[list, int]]:
+        """
+        Run a backend in a process of the pool.
+
+        The process is killed if the run is cancelled or reaches its deadline.
+
+        Args:
+        ----
+            package (str): The package of the backend.
+            name (str): Policy name.
+            policy (Policy): Policy configuration.
+            max_entities (int): Maximum number of entities in a chunk.
+            max_bytes (int): Maximum estimated size of a chunk, in bytes.
+            context (RunContext | None): Context of the run, its progress reports
+                being forwarded from the process.
+            usage (dict | None): Filled with the CPU time, "cpu_seconds", and peak RSS
+                growth, "peak_rss_delta", of the process during the run once it ends.
+
+        Returns:
+        -------
+            Iterator[tuple[list, int]]: Each chunk of entities, with its estimated size.
+
+        Raises:
+        ------
+            RunCancelled: If the run was cancelled or timed out.
+
+        """
+        context = context or RunContext()
+        process = self._acquire()
+        state = "abandoned"
+        try:
+            process.conn.send(
+                (
+                    _RUN,
+                    package,
+                    name,
+                    policy.model_dump_json(),
+                    max_entities,
+                    max_bytes,
+                    context.remaining(),
+                )
+            )
+            while True:
+                remaining = context.remaining()
+                while not process.conn.poll(
+                    _POLL_INTERVAL if remaining is None else min(_POLL_INTERVAL, remaining)
+                ):
+                    context.check()
+                    remaining = context.remaining()
+                context.check()
+                try:
+                    kind, payload, value = process.conn.recv()
+                except EOFError:
+                    state = "exited"
+                    process.process.join(5)
+                    raise RuntimeError(
+                        f"backend process exited with code {process.process.exitcode}"
+                    )
+                if kind == _CHUNK:
+                    request = IngestRequest()
+                    request.ParseFromString(payload)
+                    del payload
+                    yield list(request.entities), value
+                    continue
+                if kind == _PROGRESS:
+                    context.report(**payload)
+                    continue
+                rss, cpu, peak = value
+                if usage is not None:
+                    usage["cpu_seconds"] = cpu
+                    usage["peak_rss_delta"] = peak
+                process.runs += 1
+                if process.runs < self.max_runs and (
+                    self.max_rss is None or rss <= self.max_rss
+                ):
+                    state = "idle"
+                else:
+                    state = "recycled"
+                    logger.info(
+                        f"Recycling backend process {process.process.pid} after "
+                        f"{process.runs} runs, RSS {rss} bytes"
+                    )
+                if kind == _ERROR:
+                    raise RuntimeError(payload)
+                return
+        finally:
+            if state != "idle":
+                self.recycled += 1
+            self._release(process, state)
+
+    def metadata(self, package: str) -> Metadata:
+        """
+        Set up a backend in a process of the pool, returning its metadata.
+
+        The backend is neither imported nor set up by the worker itself; the process
+        keeps it set up for the runs it serves.
+
+        Args:
+        ----
+            package (str): The package of the backend.
+
+        Returns:
+        -------
+            Metadata: The metadata returned by the setup of the backend.
+
+        """
+        process = self._acquire()
+        state = "exited"
+        try:
+            process.conn.send((_METADATA, package))
+            try:
+                kind, payload, _ = process.conn.recv()
+            except EOFError:
+                process.process.join(5)
+                raise RuntimeError(
+                    f"backend process exited with code {process.process.exitcode}"
+                )
+            state = "idle"
+            if kind == _ERROR:
+                raise RuntimeError(payload)
+            return payload
+        finally:
+            if state != "idle":
+                self.recycled += 1
+            self._release(process, state)
+
+    def processes(self) -> int:
+        """Return the number of running processes."""
+        with self._condition:
+            return len(self._idle) + len(self._busy)
+
+    def shutdown(self):
+        """Stop the idle processes and kill the busy ones."""
+        with self._condition:
+            self._shutdown = True
+            idle, busy = self._idle, list(self._busy)
+            self._idle = []
+            self._condition.notify_all()
+        for process in idle:
+            process.stop()
+        for process in busy:
+            process.kill()
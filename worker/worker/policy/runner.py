@@ -2,16 +2,53 @@
 # Copyright 2025 NetBox Labs Inc
 """Orb Worker Policy Runner."""
 
+import asyncio
+import inspect
 import logging
+import threading
+import time
+from collections.abc import Iterable
 from datetime import datetime, timedelta
 
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from netboxlabs.diode.sdk import DiodeClient
 
-from worker.backend import Backend, load_class
+from worker.backend import (
+    AsyncBackend,
+    Backend,
+    RunCancelled,
+    RunContext,
+    RunTimedOut,
+    call_run,
+    get_backend_registry,
+)
+from worker.metrics import (
+    ENTITIES,
+    INGEST_ERRORS,
+    INGEST_LATENCY,
+    RUN_CPU,
+    RUN_DURATION,
+    RUN_ERRORS,
+    RUN_PEAK_RSS_DELTA,
+    TIMED_OUT_RUNS,
+    UNCHANGED_ENTITIES,
+)
 from worker.models import DiodeConfig, Policy, Status
+from worker.policy.chunks import (
+    DEFAULT_CHUNK_BYTES,
+    DEFAULT_CHUNK_ENTITIES,
+    achunked,
+    chunked,
+)
+from worker.policy.clients import get_client_pool
+from worker.policy.digests import DeltaRun, get_digest_store
+from worker.policy.ledger import RunRecord, get_run_ledger
+from worker.policy.loop import get_event_loop
+from worker.policy.process import ProcessPool
+from worker.policy.splay import SplayedTrigger, splay_offset
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -21,14 +58,49 @@ logger = logging.getLogger(__name__)
 class PolicyRunner:
     """Policy Runner class."""
 
-    def __init__(self):
-        """Initialize the PolicyRunner."""
+    def __init__(self, scheduler: BackgroundScheduler | None = None):
+        """
+        Initialize the PolicyRunner.
+
+        Args:
+        ----
+            scheduler: Scheduler shared by the policies, owned by the PolicyManager.
+
+        """
         self.name = ""
         self.policy = None
         self.status = Status.NEW
-        self.scheduler = BackgroundScheduler()
+        self.scheduler = scheduler
+        # Ids of the jobs of the policy in the shared scheduler
+        self.job_ids = list[str]()
+        self.runs = 0
+        self.last_run = None
+        self.duration = None
+        self.entities = None
+        self.last_error = None
+        self.chunk_entities = DEFAULT_CHUNK_ENTITIES
+        self.chunk_bytes = DEFAULT_CHUNK_BYTES
+        self.process_pool = None
+        # Future of the run of an async backend in progress
+        self.task = None
+        self.client = None
+        self.backend = None
+        # Context of the last run
+        self.context = None
+        # Runs in progress, the client and backend being released once they return
+        # after a stop
+        self._running = 0
+        self._stopped = False
+        self._lock = threading.Lock()
 
-    def setup(self, name: str, diode_config: DiodeConfig, policy: Policy):
+    def setup(
+        self,
+        name: str,
+        diode_config: DiodeConfig,
+        policy: Policy,
+        splay: float = 0.0,
+        process_pool: ProcessPool | None = None,
+    ):
         """
         Set up the policy runner.
 
@@ -37,74 +109,410 @@ class PolicyRunner:
             name: Policy name.
             diode_config: Diode configuration data.
             policy: Policy configuration data.
+            splay: Window, in seconds, over which scheduled runs are delayed by a fixed
+                   offset derived from the policy name.
+            process_pool: Pool running the backend in a separate process, if isolated.
 
         """
         self.name = name.replace("\r\n", "").replace("\n", "")
         policy.config.package = policy.config.package.replace("\r\n", "").replace(
             "\n", ""
         )
-        backend_class = load_class(policy.config.package)
-        backend = backend_class()
-
-        metadata = backend.setup()
-        client = DiodeClient(
-            target=diode_config.target,
-            app_name=(
-                f"{diode_config.prefix}/{metadata.app_name}"
-                if diode_config.prefix
-                else metadata.app_name
-            ),
-            app_version=metadata.app_version,
-            api_key=diode_config.api_key,
-        )
-
         self.policy = policy
-
-        self.scheduler.start()
+        self.process_pool = process_pool
+        backend = None
+        if process_pool is not None:
+            # The backend is only imported and set up by the processes of the pool
+            metadata = process_pool.metadata(policy.config.package)
+        else:
+            backend, metadata = get_backend_registry().acquire(policy.config.package)
+            self.backend = backend
+        try:
+            client = get_client_pool().acquire(
+                diode_config.target,
+                (
+                    f"{diode_config.prefix}/{metadata.app_name}"
+                    if diode_config.prefix
+                    else metadata.app_name
+                ),
+                metadata.app_version,
+                diode_config.api_key,
+            )
+        except Exception:
+            self.stop()
+            raise
+        self.client = client
 
         if self.policy.config.schedule is not None:
             logger.info(
                 f"Policy {self.name}, Package {self.policy.config.package}: Scheduled to run with '{self.policy.config.schedule}'"
             )
             trigger = CronTrigger.from_crontab(self.policy.config.schedule)
+            offset = splay_offset(self.name, splay)
+            if offset:
+                trigger = SplayedTrigger(trigger, offset)
         else:
             logger.info(
                 f"Policy {self.name}, Package {self.policy.config.package}: One-time run"
             )
             trigger = DateTrigger(run_date=datetime.now() + timedelta(seconds=1))
 
-        self.scheduler.add_job(
+        job = self.scheduler.add_job(
             self.run,
+            name=self.name,
             trigger=trigger,
             args=[client, backend, self.policy],
         )
+        self.job_ids.append(job.id)
 
         self.status = Status.RUNNING
 
-    def run(self, client: DiodeClient, backend: Backend, policy: Policy):
+    def run(self, client: DiodeClient, backend: Backend | None, policy: Policy):
         """
         Run the custom backend code for the specified scope.
 
+        The entities are pulled from the backend and ingested in chunks bounded by
+        count and size, the backend being paused while a chunk is ingested. An
+        isolated backend runs in the process pool, which streams back the chunks. An
+        async backend is handed to the event loop, not holding the scheduler thread.
+
+        A run past the timeout of the policy, or cancelled by `stop`, is interrupted:
+        an isolated backend is killed, an async one cancelled, and any other backend
+        stops being consumed at the next chunk. A run starting after `stop` is skipped.
+
+        When the worker keeps entity digests, only the entities new or changed since
+        the last successful run are ingested, apart from the periodic full runs.
+
+        The wall time, CPU time and peak RSS growth of every run are recorded in the
+        metrics and the run ledger.
+
         Args:
         ----
             client: Diode client.
-            backend: Backend class.
+            backend: Backend class, None for an isolated policy.
             policy: Policy configuration.
 
         """
+        if self.process_pool is None and isinstance(backend, AsyncBackend):
+            if self.task is not None and not self.task.done():
+                logger.warning(f"Policy {self.name}: Previous run still in progress, skipped")
+                return
+            self.task = get_event_loop().submit(self.run_async(client, backend, policy))
+            return
+        if not self._enter():
+            return
+        record = RunRecord(
+            self.name,
+            policy.config.package,
+            "thread" if self.process_pool is None else "process",
+        )
+        usage = {}
+        count = None
+        error = None
+        entities = None
+        chunks = None
+        context = RunContext(policy.config.timeout)
+        self.context = context
         try:
-            entities = backend.run(self.name, policy)
-            response = client.ingest(entities)
-            if response.errors:
-                logger.error(
-                    f"ERROR ingestion failed for {self.name} : {response.errors}"
+            delta = self._begin_delta(policy)
+            if self.process_pool is not None:
+                chunks = self.process_pool.run(
+                    policy.config.package,
+                    self.name,
+                    policy,
+                    self.chunk_entities,
+                    self.chunk_bytes,
+                    context,
+                    usage,
                 )
             else:
-                logger.info(f"Policy {self.name}: Successful ingestion")
+                entities = call_run(backend, self.name, policy, context)
+                chunks = chunked(entities, self.chunk_entities, self.chunk_bytes)
+            count, error = self._ingest_chunks(client, chunks, context, delta, record)
+        except RunCancelled as e:
+            error = self._cancelled(e)
         except Exception as e:
+            error = str(e)
             logger.error(f"Policy {self.name}: {e}")
+        finally:
+            # Release the generators stopped before their end
+            for iterable in (chunks, entities):
+                close = getattr(iterable, "close", None)
+                if callable(close):
+                    close()
+            self._exit()
+        self._record(record, count, error, usage)
+
+    async def run_async(self, client: DiodeClient, backend: AsyncBackend, policy: Policy):
+        """
+        Run an async backend on the event loop, ingesting in a blocking-call thread.
+
+        Args:
+        ----
+            client: Diode client.
+            backend: Async backend class.
+            policy: Policy configuration.
+
+        """
+        record = RunRecord(self.name, policy.config.package, "async")
+        if not self._enter():
+            # Stopped before the run started
+            logger.info(f"Policy {self.name}: Run cancelled")
+            self._record(record, None, "run cancelled")
+            return
+        count = None
+        error = None
+        context = RunContext(policy.config.timeout)
+        self.context = context
+        try:
+            delta = self._begin_delta(policy)
+            count, error = await asyncio.wait_for(
+                self._ingest_async(client, backend, policy, context, delta, record),
+                context.remaining(),
+            )
+        except asyncio.TimeoutError:
+            error = self._cancelled(RunTimedOut(f"run timed out after {context.timeout}s"))
+        except asyncio.CancelledError:
+            logger.info(f"Policy {self.name}: Run cancelled")
+            self._record(record, count, "run cancelled")
+            raise
+        except RunCancelled as e:
+            error = self._cancelled(e)
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Policy {self.name}: {e}")
+        finally:
+            self._exit()
+        self._record(record, count, error)
+
+    async def _ingest_async(
+        self,
+        client: DiodeClient,
+        backend: AsyncBackend,
+        policy: Policy,
+        context: RunContext,
+        delta: DeltaRun | None,
+        record: RunRecord,
+    ) -> tuple[int, str | None]:
+        entities = None
+        chunks = None
+        try:
+            entities = call_run(backend, self.name, policy, context)
+            if inspect.isawaitable(entities):
+                entities = await entities
+            chunks = achunked(entities, self.chunk_entities, self.chunk_bytes)
+            loop = asyncio.get_running_loop()
+            ingested = 0
+            number = 0
+            async for chunk, size in chunks:
+                number += 1
+                ingest = loop.run_in_executor(
+                    None, self._ingest_chunk, record, client, delta, chunk, size, number, ingested
+                )
+                try:
+                    ingested, error = await asyncio.shield(ingest)
+                except asyncio.CancelledError:
+                    # The blocking call cannot be interrupted, and holds the client
+                    await asyncio.wait([ingest])
+                    raise
+                if error is not None:
+                    return ingested, error
+            self._commit_delta(delta)
+            return ingested, None
+        finally:
+            # Release the async generators stopped before their end
+            for iterable in (chunks, entities):
+                close = getattr(iterable, "aclose", None)
+                if callable(close):
+                    await close()
+
+    def _ingest_chunks(
+        self,
+        client: DiodeClient,
+        chunks: Iterable[tuple[list, int]],
+        context: RunContext,
+        delta: DeltaRun | None,
+        record: RunRecord,
+    ) -> tuple[int, str | None]:
+        ingested = 0
+        for number, (chunk, size) in enumerate(chunks, 1):
+            context.check()
+            ingested, error = self._ingest_chunk(
+                record, client, delta, chunk, size, number, ingested
+            )
+            if error is not None:
+                return ingested, error
+        self._commit_delta(delta)
+        return ingested, None
+
+    def _ingest_chunk(
+        self,
+        record: RunRecord,
+        client: DiodeClient,
+        delta: DeltaRun | None,
+        chunk: list,
+        size: int,
+        number: int,
+        ingested: int,
+    ) -> tuple[int, str | None]:
+        record.entities += len(chunk)
+        if delta is not None:
+            chunk, size = self._select(delta, chunk, size)
+            if not chunk:
+                return ingested, None
+        response = self._ingest(record, client, chunk)
+        if response.errors:
+            logger.error(f"ERROR ingestion failed for {self.name} : {response.errors}")
+            return ingested, f"ingestion failed: {response.errors}"
+        ingested += len(chunk)
+        logger.info(
+            f"Policy {self.name}: Ingested chunk {number} ({len(chunk)} entities, "
+            f"{size} bytes, {ingested} in total)"
+        )
+        return ingested, None
+
+    def _ingest(self, record: RunRecord, client: DiodeClient, chunk: list):
+        labels = INGEST_LATENCY.labels(record.policy, record.package)
+        start = time.perf_counter()
+        try:
+            response = client.ingest(chunk)
+        except Exception:
+            INGEST_ERRORS.labels(record.policy, record.package).inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            labels.observe(elapsed)
+            record.ingest_seconds += elapsed
+            record.chunks += 1
+        if response.errors:
+            INGEST_ERRORS.labels(record.policy, record.package).inc()
+        return response
+
+    def _enter(self) -> bool:
+        with self._lock:
+            if self._stopped:
+                return False
+            self._running += 1
+            return True
+
+    def _exit(self):
+        with self._lock:
+            self._running -= 1
+            release = self._stopped and not self._running
+        if release:
+            self._release()
+
+    def _release(self):
+        client, self.client = self.client, None
+        if client is not None:
+            get_client_pool().release(client)
+        backend, self.backend = self.backend, None
+        if backend is not None:
+            try:
+                get_backend_registry().release(self.policy.config.package, backend)
+            except Exception as e:
+                logger.error(f"Policy {self.name}: Backend teardown failed: {e}")
+
+    def _begin_delta(self, policy: Policy) -> DeltaRun | None:
+        store = get_digest_store()
+        if store is None or not policy.config.delta:
+            return None
+        delta = store.begin(self.name)
+        if delta.full:
+            logger.info(f"Policy {self.name}: Full run, ingesting every entity")
+        return delta
+
+    @staticmethod
+    def _select(delta: DeltaRun, chunk: list, size: int) -> tuple[list, int]:
+        selected = delta.select(chunk)
+        if len(selected) == len(chunk):
+            return chunk, size
+        return selected, sum(e.ByteSize() for e in selected)
+
+    def _commit_delta(self, delta: DeltaRun | None):
+        if delta is not None:
+            delta.commit()
+            if delta.unchanged:
+                UNCHANGED_ENTITIES.labels(self.name).inc(delta.unchanged)
+                logger.info(f"Policy {self.name}: Skipped {delta.unchanged} unchanged entities")
+        logger.info(f"Policy {self.name}: Successful ingestion")
+
+    def _cancelled(self, e: RunCancelled) -> str:
+        if isinstance(e, RunTimedOut):
+            TIMED_OUT_RUNS.labels(self.name).inc()
+            logger.error(f"Policy {self.name}: {e}")
+        else:
+            logger.info(f"Policy {self.name}: {e}")
+        return str(e)
+
+    def _record(
+        self,
+        record: RunRecord,
+        count: int | None,
+        error: str | None,
+        usage: dict | None = None,
+    ):
+        record.finish(count, error, usage)
+        self.runs += 1
+        self.last_run = record.started
+        self.duration = record.wall_seconds
+        self.entities = count
+        self.last_error = error
+        labels = (record.policy, record.package)
+        RUN_DURATION.labels(*labels).observe(record.wall_seconds)
+        if record.cpu_seconds is not None:
+            RUN_CPU.labels(*labels).observe(record.cpu_seconds)
+        RUN_PEAK_RSS_DELTA.labels(*labels).observe(record.peak_rss_delta)
+        if record.entities:
+            ENTITIES.labels(*labels).inc(record.entities)
+        if error is not None:
+            RUN_ERRORS.labels(*labels).inc()
+        get_run_ledger().add(record)
+
+    def summary(self) -> dict:
+        """
+        Summarize the policy and the outcome of its last run.
+
+        Returns
+        -------
+            dict: Name, package, status, schedule, number of runs, and time, duration,
+                  entity count and error of the last run.
+
+        """
+        return {
+            "name": self.name,
+            "package": self.policy.config.package if self.policy else None,
+            "status": self.status.value,
+            "schedule": self.policy.config.schedule if self.policy else None,
+            "runs": self.runs,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "duration_seconds": self.duration,
+            "entities": self.entities,
+            "last_error": self.last_error,
+            "progress": self.context.progress if self.context else None,
+        }
 
     def stop(self):
-        """Stop the policy runner."""
-        self.scheduler.shutdown()
+        """
+        Stop the policy runner, removing its jobs from the shared scheduler.
+
+        A run in progress is cancelled, the Diode client and the backend being released
+        once it returns.
+        """
+        for job_id in self.job_ids:
+            try:
+                self.scheduler.remove_job(job_id)
+            except JobLookupError:
+                pass
+        self.job_ids = []
+        if self.context is not None:
+            self.context.cancel()
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        with self._lock:
+            self._stopped = True
+            release = not self._running
+        if release:
+            self._release()
         self.status = Status.FINISHED
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# Copyright 2025 NetBox Labs Inc
+"""Orb Worker start-time splay."""
+
+import hashlib
+from datetime import timedelta
+
+from apscheduler.triggers.base import BaseTrigger
+
+
+def splay_offset(name: str, splay: float) -> timedelta:
+    """
+    Return the fixed delay of a policy, spread over the splay window.
+
+    The delay is derived from the policy name, so a policy keeps the same delay across
+    restarts while policies sharing a schedule are spread over the window.
+
+    Args:
+    ----
+        name (str): Policy name.
+        splay (float): Width of the window, in seconds.
+
+    Returns:
+    -------
+        timedelta: A delay between 0 and `splay` seconds.
+
+    """
+    if splay <= 0:
+        return timedelta(0)
+    digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+    fraction = int.from_bytes(digest, "big") / 2**64
+    return timedelta(seconds=round(fraction * splay, 3))
+
+
+class SplayedTrigger(BaseTrigger):
+    """Trigger firing a fixed delay after each fire time of another trigger."""
+
+    __slots__ = ("trigger", "offset")
+
+    def __init__(self, trigger: BaseTrigger, offset: timedelta):
+        """
+        Initialize the trigger.
+
+        Args:
+        ----
+            trigger (BaseTrigger): The trigger to delay, usually a `CronTrigger`.
+            offset (timedelta): The delay.
+
+        """
+        self.trigger = trigger
+        self.offset = offset
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        """Return the next fire time of the wrapped trigger, delayed by the offset."""
+        if previous_fire_time is not None:
+            previous_fire_time -= self.offset
+        next_fire_time = self.trigger.get_next_fire_time(
+            previous_fire_time, now - self.offset
+        )
+        return next_fire_time + self.offset if next_fire_time is not None else None
+
+    def __str__(self):
+        """Describe the trigger."""
+        return f"{self.trigger} + {self.offset.total_seconds()}s"
+
+    def __repr__(self):
+        """Represent the trigger."""
+        return f"<{self.__class__.__name__} ({self.trigger!r}, offset={self.offset!r})>"
@@ -3,14 +3,18 @@
 """Orb Worker Server."""
 
 
+import json
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 import yaml
-from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import ValidationError
 
+from worker import metrics
 from worker.models import PolicyRequest
+from worker.policy.ledger import SORT_FIELDS
 from worker.policy.manager import PolicyManager
 from worker.version import version_semver
 
@@ -37,9 +41,14 @@ async def lifespan(app: FastAPI):
 app = FastAPI(lifespan=lifespan)
 
 
+POLICY_CONTENT_TYPES = ("application/x-yaml", "application/json")
+
+
 async def parse_yaml_body(request: Request) -> PolicyRequest:
     """
-    Parse the YAML body of the request.
+    Parse the YAML or JSON body of the request.
+
+    Parsing runs in the thread pool, large policies would otherwise block the event loop.
 
     Args:
     ----
@@ -50,17 +59,22 @@ async def parse_yaml_body(request: Request) -> PolicyRequest:
         PolicyRequest: The policy request object.
 
     """
-    if request.headers.get("content-type") != "application/x-yaml":
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in POLICY_CONTENT_TYPES:
         raise HTTPException(
             status_code=400,
-            detail="invalid Content-Type. Only 'application/x-yaml' is supported",
+            detail="invalid Content-Type. Only 'application/x-yaml' and 'application/json' are supported",
         )
     body = await request.body()
     try:
-        return manager.parse_policy(body)
+        return await run_in_threadpool(manager.parse_policy, body, content_type)
     except yaml.YAMLError as e:
         raise HTTPException(status_code=400, detail="Invalid YAML format") from e
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail="Invalid JSON format") from e
     except ValidationError as e:
+        if any(error["type"] == "json_invalid" for error in e.errors()):
+            raise HTTPException(status_code=400, detail="Invalid JSON format") from e
         errors = []
         for error in e.errors():
             field_path = ".".join(str(part) for part in error["loc"])
@@ -103,6 +117,87 @@ def read_capabilities():
     return {"loaded_modules": manager.get_loaded_modules()}
 
 
+@app.get("/metrics")
+def read_metrics():
+    """
+    Get the Prometheus metrics.
+
+    Returns
+    -------
+        Response: The metrics in the Prometheus text format.
+
+    """
+    content, content_type = metrics.latest()
+    return Response(content=content, media_type=content_type)
+
+
+@app.get("/api/v1/policies")
+def list_policies(
+    cursor: str | None = None, limit: int = Query(default=100, ge=1, le=1000)
+):
+    """
+    List the policies, sorted by name.
+
+    Args:
+    ----
+        cursor (str | None): The `next_cursor` of the previous page.
+        limit (int): Maximum number of policies.
+
+    Returns:
+    -------
+        dict: The summary of each policy of the page, and the next page cursor.
+
+    """
+    return manager.list_policies(cursor, limit)
+
+
+@app.get("/api/v1/runs")
+def list_runs(
+    policy: str | None = None,
+    package: str | None = None,
+    failed: bool | None = None,
+    sort: str = Query(default="started", pattern=f"^({'|'.join(SORT_FIELDS)})$"),
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """
+    List the recent runs with their resource usage, the largest first.
+
+    Args:
+    ----
+        policy (str | None): Only the runs of this policy.
+        package (str | None): Only the runs of this package.
+        failed (bool | None): Only the failed runs if True, the successful ones if False.
+        sort (str): Field the runs are sorted by, their start time by default.
+        limit (int): Maximum number of runs.
+
+    Returns:
+    -------
+        dict: The resource usage and outcome of each run.
+
+    """
+    return manager.list_runs(policy, package, failed, sort, limit)
+
+
+@app.get("/api/v1/policies/{policy_name}")
+def read_policy(policy_name: str):
+    """
+    Describe a policy and the outcome of its last run.
+
+    Args:
+    ----
+        policy_name (str): The policy name.
+
+    Returns:
+    -------
+        dict: The policy summary.
+
+    """
+    try:
+        return manager.get_policy(policy_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @app.post("/api/v1/policies", status_code=201)
 async def write_policy(request: PolicyRequest = Depends(parse_yaml_body)):
     """
@@ -138,6 +233,37 @@ async def write_policy(request: PolicyRequest = Depends(parse_yaml_body)):
     return {"detail": f"policies {started_policies} were started"}
 
 
+@app.put("/api/v1/policies", status_code=200)
+async def upsert_policy(request: PolicyRequest = Depends(parse_yaml_body)):
+    """
+    Create or update policies, leaving unchanged policies untouched.
+
+    The policies are applied together: when one fails to start, none is changed.
+
+    Args:
+    ----
+        request (PolicyRequest): The policy request object.
+
+    Returns:
+    -------
+        dict: The result of the policy write, per policy.
+
+    """
+    try:
+        results = manager.upsert_policies(request.policies)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if not results:
+        raise HTTPException(status_code=400, detail="no policies found in request")
+
+    if len(results) == 1:
+        name, result = next(iter(results.items()))
+        verb = "is" if result["status"] == "unchanged" else "was"
+        return {"detail": f"policy '{name}' {verb} {result['status']}", "policies": results}
+    return {"detail": f"policies {list(results)} were applied", "policies": results}
+
+
 @app.delete("/api/v1/policies/{policy_name}", status_code=200)
 def delete_policy(policy_name: str):
     """